@@ -0,0 +1,243 @@
+"""
+Single file asset pack with pre-decoded textures and sounds.
+
+Loading the loose files means opening a dozen PNGs and WAVs, decoding
+them and copying the pixels and samples around. The pack holds all of
+that in one file:
+
+    header   magic, version, offset and size of the index
+    data     raw RGBA pixels of every texture and the WAV file of every
+             sound, each block aligned to DATA_ALIGNMENT bytes
+    index    JSON: per texture offset, size, baked scale and hit box,
+             per sound offset, size and file name
+
+The game memory-maps the pack (see assets.py). Textures are PIL images
+directly on top of the mapped pages, so no image is decoded or copied at
+startup and the operating system can share and drop the pages like any
+other file cache. The sounds are small, pyglet reads them from the
+mapped WAV bytes through its public loader.
+
+Build it with "python build_assets.py --pack". Compare the start of the
+game with and without it with "python asset_pack.py --measure".
+"""
+
+import argparse
+import io
+import json
+import math
+import mmap
+import os
+import struct
+import subprocess
+import sys
+import time
+
+import arcade
+from PIL import Image
+from pyglet import media
+
+PACK_FILE = "assets.pack"
+MAGIC = b"TSAP"
+VERSION = 2
+# magic, version, index offset, index size
+HEADER = struct.Struct("<4sIQQ")
+DATA_ALIGNMENT = 64
+
+
+def write_pack(path, textures, sounds, hit_box_settings):
+    """
+    Write a pack. textures is name -> (RGBA image, baked scale, hit box),
+    sounds is name -> (file name, content of the WAV file).
+    """
+    index = {"hit_box_settings": list(hit_box_settings), "textures": {}, "sounds": {}}
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, 0, 0))
+
+        def write_block(data):
+            file.write(b"\0" * (-file.tell() % DATA_ALIGNMENT))
+            offset = file.tell()
+            file.write(data)
+            return offset
+
+        for name, (image, scale, hit_box) in textures.items():
+            image = image.convert("RGBA")
+            index["textures"][name] = {
+                "offset": write_block(image.tobytes()),
+                "width": image.width,
+                "height": image.height,
+                "scale": scale,
+                "hit_box": [list(point) for point in hit_box],
+            }
+        for name, (file_name, data) in sounds.items():
+            index["sounds"][name] = {
+                "offset": write_block(data),
+                "size": len(data),
+                # pyglet picks the decoder by its extension
+                "file": file_name,
+            }
+
+        index_bytes = json.dumps(index).encode()
+        index_offset = write_block(index_bytes)
+        file.seek(0)
+        file.write(HEADER.pack(MAGIC, VERSION, index_offset, len(index_bytes)))
+    os.replace(temp_path, path)
+
+
+class PackSound:
+    """
+    Sound from the pack. arcade.Sound can only be made from a file name,
+    so this is no arcade.Sound, but it plays the same way: play(), stop()
+    and get_length() like arcade.Sound, so arcade.play_sound and the
+    sound manager take it too.
+    """
+
+    # players that are still playing, pyglet would drop them otherwise
+    playing = set()
+
+    def __init__(self, file_name, source):
+        self.file_name = file_name
+        self.source = source
+
+    def play(self, volume=1.0, pan=0.0, loop=False, speed=1.0):
+        """ Play the sound on a new pyglet player and return it. """
+        player = media.Player()
+        player.volume = volume
+        # panning with 3D audio, like arcade does it
+        player.position = (pan, 0.0, math.sqrt(1 - pan * pan))
+        player.pitch = speed
+        player.loop = loop
+        player.queue(self.source)
+        player.play()
+        PackSound.playing.add(player)
+
+        @player.event
+        def on_player_eos():
+            PackSound.playing.discard(player)
+        return player
+
+    def stop(self, player):
+        """ Stop a player started by play(). """
+        player.pause()
+        player.delete()
+        PackSound.playing.discard(player)
+
+    def get_length(self):
+        """ Length of the sound in seconds. """
+        return self.source.duration
+
+
+class AssetPack:
+    """ A memory-mapped pack, hands out textures and sounds on top of the mapping. """
+
+    def __init__(self, path=PACK_FILE):
+        self.path = path
+        with open(path, "rb") as file:
+            # the mapping stays valid after the file is closed
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, index_offset, index_size = HEADER.unpack_from(self.map)
+        if magic != MAGIC or version != VERSION:
+            self.map.close()
+            raise ValueError(f"{path} is not a Trump Smasher asset pack of version {VERSION}")
+        self.view = memoryview(self.map)
+        index = json.loads(bytes(self.view[index_offset:index_offset + index_size]))
+        self.hit_box_settings = tuple(index["hit_box_settings"])
+        self.textures = index["textures"]
+        self.sounds = index["sounds"]
+
+    def texture(self, name):
+        """ arcade texture whose pixels are the mapped bytes, with its hit box. """
+        entry = self.textures[name]
+        size = entry["width"], entry["height"]
+        start = entry["offset"]
+        pixels = self.view[start:start + size[0] * size[1] * 4]
+        # with the raw decoder and these arguments PIL uses the buffer as is
+        image = Image.frombuffer("RGBA", size, pixels, "raw", "RGBA", 0, 1)
+        texture = arcade.Texture(f"pack:{name}", image=image,
+                                 hit_box_algorithm=self.hit_box_settings[0],
+                                 hit_box_detail=self.hit_box_settings[1])
+        # arcade has no setter for it, the property only calculates it once
+        texture._hit_box_points = tuple(tuple(point) for point in entry["hit_box"])
+        return texture
+
+    def scale(self, name):
+        return self.textures[name]["scale"]
+
+    def sound(self, name):
+        """ PackSound loaded from the mapped WAV file. """
+        entry = self.sounds[name]
+        data = self.view[entry["offset"]:entry["offset"] + entry["size"]]
+        source = media.load(entry["file"], file=io.BytesIO(data), streaming=False)
+        return PackSound(f"{self.path}:{name}", source)
+
+
+def resident_memory():
+    """ Resident memory of this process in bytes, None where it can't be read. """
+    try:
+        with open("/proc/self/status") as file:
+            for line in file:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    # peak instead of current, in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def load_once(use_pack):
+    """ Load every asset like the game does, returns seconds and resident memory. """
+    start = time.perf_counter()
+    from assets import assets
+    if not use_pack:
+        assets.pack_file = None
+    assets.load()
+    seconds = time.perf_counter() - start
+    return {"pack": assets.pack is not None, "seconds": seconds, "rss": resident_memory()}
+
+
+def measure(runs):
+    """ Start fresh processes that load with and without the pack, print the medians. """
+    results = {}
+    for use_pack in (False, True):
+        samples = []
+        for i in range(runs):
+            output = subprocess.run([sys.executable, os.path.abspath(__file__), "--load",
+                                     "pack" if use_pack else "files"],
+                                    capture_output=True, text=True, check=True).stdout
+            samples.append(json.loads(output.strip().splitlines()[-1]))
+        if use_pack and not samples[0]["pack"]:
+            raise SystemExit(f"{PACK_FILE} not found, run python build_assets.py --pack first")
+        samples.sort(key=lambda sample: sample["seconds"])
+        median = samples[len(samples) // 2]
+        results["pack" if use_pack else "files"] = median
+        rss = f"{median['rss'] / 2 ** 20:.1f} MiB" if median["rss"] else "unknown"
+        print(f"{'pack' if use_pack else 'loose files'}: {median['seconds'] * 1000:.1f} ms, "
+              f"resident memory {rss}")
+    return results
+
+
+def main():
+    """ Main method """
+    parser = argparse.ArgumentParser(description="Compare loading with and without the pack")
+    parser.add_argument("--measure", action="store_true", help="time both ways of loading")
+    parser.add_argument("--runs", type=int, default=5, help="processes per way of loading")
+    parser.add_argument("--load", choices=("pack", "files"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # The game loads its files relative to this folder
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    if args.load:
+        print(json.dumps(load_once(args.load == "pack")))
+    elif args.measure:
+        measure(args.runs)
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
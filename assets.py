@@ -0,0 +1,241 @@
+"""
+Central registry for all textures and sounds of Trump Smasher.
+
+Everything is loaded once (textures including their hit boxes, sounds
+fully decoded) and afterwards handed out as shared objects, so starting a
+new game or splitting an asteroid does not touch the disk anymore.
+The background music is not in here, it is streamed by music.py.
+
+If build_assets.py has been run, textures are loaded from its pre-scaled
+copies instead of the original files. Sprites then have to be created
+with assets.sprite_scale(name, scale) instead of the plain scale. A copy
+whose original image changed since is left out with a warning.
+
+Hit boxes come from the persistent cache in hitbox_cache.py, so the pixels
+of an image are only scanned again when the image changed.
+
+If "python build_assets.py --pack" has been run, everything comes from
+the memory-mapped asset pack instead (see asset_pack.py), already decoded
+and with the hit boxes inside. Assets missing in the pack are loaded
+from their files as before.
+
+Usage:
+    from assets import assets
+    assets.load()
+    sprite = arcade.Sprite(texture=assets.texture("fake"),
+                           scale=assets.sprite_scale("fake", 0.75))
+    arcade.play_sound(assets.sound("laser"), 0.03)
+
+The intro screen uses assets.start_preloading() instead of load(), which
+loads everything on a worker thread while the player reads the intro.
+"""
+
+import json
+import os
+import threading
+
+import arcade
+from arcade.resources import resolve_resource_path
+
+from asset_pack import PACK_FILE, AssetPack
+from hitbox_cache import HitBoxCache, file_hash, simplify
+
+# name -> file of every texture used in the game
+TEXTURE_FILES = {
+    "ship": ":resources:images/space_shooter/playerShip2_orange.png",
+    "life": ":resources:images/space_shooter/playerLife1_orange.png",
+    "laser": ":resources:images/space_shooter/laserBlue01.png",
+    "vote": "Images/vote.png",
+    "flag": "Images/Flag.png",
+    "trump": "Images/Trump_sprite.png",
+    "twitter": "Images/twitter.png",
+    "fake": "Images/fake.png",
+    "intro": "Images/Intro.png",
+    "game_over": "Images/GameOverTrump.png",
+    "winner": "Images/Winner.png",
+}
+
+# Drawn over the whole screen, nothing ever collides with them
+SCREEN_TEXTURES = ("intro", "game_over", "winner")
+
+# name -> file of every sound used in the game
+SOUND_FILES = {
+    "laser": ":resources:sounds/hurt5.wav",
+    "laser2": ":resources:sounds/fall1.wav",
+    "hit1": ":resources:sounds/explosion1.wav",
+    "hit2": ":resources:sounds/explosion2.wav",
+    "hit3": ":resources:sounds/hit1.wav",
+    "hit4": ":resources:sounds/hit2.wav",
+}
+
+# How the hit boxes are calculated, see arcade.load_texture
+HIT_BOX_ALGORITHM = "Simple"
+HIT_BOX_DETAIL = 4.5
+# Most corners a hit box may have, None keeps the polygon of arcade
+HIT_BOX_VERTEX_BUDGET = None
+
+# written by build_assets.py, the game also runs without it
+MANIFEST_FILE = "Images/scaled/manifest.json"
+
+
+class AssetRegistry:
+    """ Loads all game assets once and hands out the shared handles. """
+
+    def __init__(self):
+        self.textures = {}
+        self.sounds = {}
+        # name -> scale its pre-scaled copy was made at
+        self.baked_scales = {}
+        self.manifest = None
+        # None: not opened yet, False: there is no usable pack
+        self.pack = None
+        self.pack_file = PACK_FILE
+        self.hit_boxes = None
+        self.vertex_budget = HIT_BOX_VERTEX_BUDGET
+        self.preload_thread = None
+        self.preload_error = None
+
+    def load_manifest(self):
+        """ Read the manifest of build_assets.py once, empty if there is none. """
+        if self.manifest is None:
+            manifest = {}
+            if os.path.exists(MANIFEST_FILE):
+                with open(MANIFEST_FILE) as file:
+                    manifest = json.load(file)["textures"]
+            self.manifest = manifest
+        return self.manifest
+
+    def load_pack(self):
+        """ Map the asset pack once, None if there is none or it can't be used. """
+        if self.pack is None:
+            self.pack = False
+            if self.pack_file and os.path.exists(self.pack_file):
+                try:
+                    pack = AssetPack(self.pack_file)
+                except ValueError as error:
+                    print(f"{error}, loading the single files")
+                else:
+                    # hit boxes made with other settings are of no use
+                    settings = (HIT_BOX_ALGORITHM, HIT_BOX_DETAIL, self.vertex_budget)
+                    if pack.hit_box_settings == settings:
+                        self.pack = pack
+        return self.pack or None
+
+    def load_texture(self, name):
+        """ Load a single texture and compute its hit box right away. """
+        if name not in self.textures:
+            pack = self.load_pack()
+            if pack and name in pack.textures:
+                self.textures[name] = pack.texture(name)
+                self.baked_scales[name] = pack.scale(name)
+                return self.textures[name]
+            path = TEXTURE_FILES[name]
+            entry = self.load_manifest().get(name)
+            if entry and os.path.exists(entry["file"]) and self.scaled_copy_current(entry):
+                path = entry["file"]
+                self.baked_scales[name] = entry["scale"]
+            if name in SCREEN_TEXTURES:
+                # the hit box is just the frame of the image, no pixel is looked at
+                texture = arcade.load_texture(path, hit_box_algorithm="None")
+            else:
+                texture = arcade.load_texture(path, hit_box_algorithm=HIT_BOX_ALGORITHM,
+                                              hit_box_detail=HIT_BOX_DETAIL)
+                self.load_hit_box(texture, path)
+            self.textures[name] = texture
+        return self.textures[name]
+
+    def scaled_copy_current(self, entry):
+        """ False if the original image changed after build_assets.py scaled it. """
+        if file_hash(resolve_resource_path(entry["source"])) == entry["source_hash"]:
+            return True
+        print(f"{entry['file']} is outdated, loading {entry['source']} instead. "
+              f"Run build_assets.py again.")
+        return False
+
+    def load_hit_box(self, texture, path):
+        """
+        Give the texture its hit box from the cache, or calculate it now
+        instead of when the first sprite collides and add it to the cache.
+        load() saves the cache when all textures are there.
+        """
+        if self.hit_boxes is None:
+            self.hit_boxes = HitBoxCache()
+        file_path = str(resolve_resource_path(path))
+        points = self.hit_boxes.get(file_path, HIT_BOX_ALGORITHM, HIT_BOX_DETAIL,
+                                    self.vertex_budget)
+        if points is None:
+            points = texture.hit_box_points
+            if self.vertex_budget:
+                points = simplify(points, self.vertex_budget)
+            self.hit_boxes.put(file_path, HIT_BOX_ALGORITHM, HIT_BOX_DETAIL,
+                               self.vertex_budget, points)
+        # arcade has no setter for it, the property only calculates it once
+        texture._hit_box_points = points
+
+    def load_sound(self, name):
+        """ Load and decode a single sound. """
+        if name not in self.sounds:
+            pack = self.load_pack()
+            if pack and name in pack.sounds:
+                self.sounds[name] = pack.sound(name)
+            else:
+                self.sounds[name] = arcade.load_sound(SOUND_FILES[name])
+        return self.sounds[name]
+
+    def load(self, sounds=True):
+        """
+        Load every texture and (unless sounds is False) every sound.
+
+        Calling this again only loads what is still missing.
+        Headless runs pass sounds=False, as they never play anything.
+        """
+        for name in TEXTURE_FILES:
+            self.load_texture(name)
+        if self.hit_boxes is not None:
+            # once for all new hit boxes, only written if there are some
+            self.hit_boxes.save()
+        if sounds:
+            for name in SOUND_FILES:
+                self.load_sound(name)
+
+    def start_preloading(self, sounds=True):
+        """ Start load() on a worker thread, does nothing if it already runs. """
+        if self.preload_thread is None:
+            self.preload_thread = threading.Thread(target=self._preload, args=(sounds,),
+                                                   name="asset-preload", daemon=True)
+            self.preload_thread.start()
+
+    def _preload(self, sounds):
+        try:
+            self.load(sounds)
+        except Exception as error:
+            # handed to the main thread by preload_done()
+            self.preload_error = error
+
+    def progress(self):
+        """ Share of all assets that are loaded, between 0.0 and 1.0. """
+        total = len(TEXTURE_FILES) + len(SOUND_FILES)
+        return (len(self.textures) + len(self.sounds)) / total
+
+    def preload_done(self):
+        """ True when the worker thread has finished, raises its error if it failed. """
+        if self.preload_error is not None:
+            raise self.preload_error
+        return self.preload_thread is not None and not self.preload_thread.is_alive()
+
+    def sprite_scale(self, name, scale):
+        """ Scale for a sprite that should look like the original texture at scale. """
+        self.texture(name)
+        return scale / self.baked_scales.get(name, 1.0)
+
+    def texture(self, name):
+        """ Shared texture, loaded on first use if load() was not called. """
+        return self.textures.get(name) or self.load_texture(name)
+
+    def sound(self, name):
+        """ Shared sound, loaded on first use if load() was not called. """
+        return self.sounds.get(name) or self.load_sound(name)
+
+
+# The one registry the whole game uses
+assets = AssetRegistry()
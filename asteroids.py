@@ -9,9 +9,27 @@ python -m arcade.examples.asteroid_smasher
 import random
 import math
 import arcade
+import argparse
 import os
+import time
 from typing import cast
 
+from assets import assets
+from atlas import LayeredSpriteList, LogicSpriteList, game_atlas
+from collision import SpatialGrid
+from culling import ViewportCuller
+from hud import Hud
+from motion import MotionEngine
+from music import music
+from profiler import profiler
+from quality import (FOCUS_RADIUS, MAX_SMALL_FRAGMENTS, MERGE_FRAGMENTS, PLAIN_ITEMS,
+                     STILL_FRAGMENTS, QualityGovernor)
+from pool import BULLET_POOL_CAPACITY, FRAGMENT_POOL_CAPACITY, SpritePool, release
+from recorder import Recorder, new_replay_path
+from snapshot import SnapshotRing, capture, restore
+from sound_manager import sound_manager
+from telemetry import telemetry
+
 #define scaling
 STARTING_ASTEROID_COUNT = 3
 SCALE = 0.5
@@ -28,6 +46,71 @@ RIGHT_LIMIT = SCREEN_WIDTH + OFFSCREEN_SPACE
 BOTTOM_LIMIT = -OFFSCREEN_SPACE
 TOP_LIMIT = SCREEN_HEIGHT + OFFSCREEN_SPACE
 
+#fixed timestep: default ticks per second, set with "python asteroids.py --tick-rate 120"
+TICK_RATE = 60
+MAX_CATCH_UP_TICKS = 5
+INTERPOLATE = True
+
+#speeds in pixels or degrees per second, thrust in pixels per second squared,
+#every tick moves the sprites by tick_time of them
+ITEM_SPEED = 60
+ASTEROID_SPEED = 60
+FRAGMENT_SPEEDS = {3: 75, 2: 90, 1: 105}
+ASTEROID_TURN_SPEED = 60
+LASER_SPEED = 3000
+VOTE_SPEED = 180
+SHIP_MAX_SPEED = 300
+SHIP_THRUST = 540
+SHIP_REVERSE_THRUST = -720
+SHIP_TURN_SPEED = 180
+#seconds the ship can't be hit after it crashed
+RESPAWN_TIME = 4.2
+
+#draw all gameplay sprites from one texture atlas with one draw call
+BATCH_DRAW = True
+
+#only submit sprites that intersect the viewport when drawing (see culling.py)
+CULLING = True
+
+#lower the quality step by step when frames take too long (see quality.py)
+ADAPTIVE_QUALITY = True
+
+#rewind (BACKSPACE): a snapshot every REWIND_INTERVAL seconds, the last REWIND_SNAPSHOTS are kept
+REWIND_INTERVAL = 0.5
+REWIND_SNAPSHOTS = 20
+
+#folder for replays of every game, set with "python asteroids.py --record <folder>"
+RECORD_DIR = None
+
+#simulate on a worker thread (see threaded.py), set with "python asteroids.py --threaded"
+THREADED = False
+
+
+def show_new_game(window):
+    """ Start a new game in the window, with its simulation on a thread if THREADED. """
+    if THREADED:
+        # threaded.py builds on the views of this module
+        from threaded import ThreadedGameView
+        game_view = ThreadedGameView()
+    else:
+        game_view = GameView()
+    game_view.start_new_game()
+    window.show_view(game_view)
+
+
+#Stand-in for the window when running without a display
+class HeadlessWindow:
+    """ Minimal window replacement used by GameView in headless mode. """
+
+    def __init__(self):
+        self.current_view = None
+
+    def set_mouse_visible(self, visible=True):
+        pass
+
+    def show_view(self, new_view):
+        self.current_view = new_view
+
 
 #Instruction view
 class InstructionView(arcade.View):
@@ -36,39 +119,67 @@ class InstructionView(arcade.View):
     def __init__(self):
         """ This is run once when we switch to this view """
         super().__init__()
-        self.texture = arcade.load_texture("Images/Intro.png")
+        # Only the intro is loaded up front, so it shows up right away
+        self.texture = assets.texture("intro")
+        self.start_requested = False
 
         # Reset the viewport, necessary if we have a scrolling game and we need
         # to reset the viewport back to the start so we can see what we draw.
         arcade.set_viewport(0, SCREEN_WIDTH - 1, 0, SCREEN_HEIGHT - 1)
 
+    def on_show(self):
+        """ Load everything else while the player reads the intro """
+        assets.start_preloading()
+
     def on_draw(self):
         """ Draw this view """
         arcade.start_render()
         self.texture.draw_sized(SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2,
                                 SCREEN_WIDTH, SCREEN_HEIGHT)
 
+        # loading bar at the bottom until all assets are there
+        progress = assets.progress()
+        if progress < 1:
+            arcade.draw_lrtb_rectangle_outline(SCREEN_WIDTH / 4, SCREEN_WIDTH * 3 / 4, 30, 15,
+                                               arcade.color.BLACK)
+            arcade.draw_lrtb_rectangle_filled(SCREEN_WIDTH / 4,
+                                              SCREEN_WIDTH / 4 + SCREEN_WIDTH / 2 * progress,
+                                              30, 15, arcade.color.BLACK)
+
+    def on_update(self, delta_time):
+        """ Start the game as soon as ENTER was pressed and loading is done """
+        if self.start_requested and assets.preload_done():
+            self.start_game()
+
     def on_key_press(self, symbol, modifiers):
         """ If the user presses ENTER, start the game. """
         if symbol == arcade.key.ENTER:
-            game_view = GameView()
-            game_view.start_new_game()
-            self.window.show_view(game_view)
+            # If the assets are still loading, on_update starts the game later
+            self.start_requested = True
+            if assets.preload_done():
+                self.start_game()
+
+    def start_game(self):
+        self.start_requested = False
+        show_new_game(self.window)
 
 
 #for collecting items
 class Item(arcade.Sprite):
     """ This class represents the items on our screen. """
 
+    # GameView hands every item the random generator of its game
+    rng = random
+
     def reset_pos(self):
         # Reset the item to a random spot above the screen
-        self.center_y = random.randrange(SCREEN_HEIGHT + 20,
-                                         SCREEN_HEIGHT + 100)
-        self.center_x = random.randrange(SCREEN_WIDTH)
+        self.center_y = self.rng.randrange(SCREEN_HEIGHT + 20,
+                                           SCREEN_HEIGHT + 100)
+        self.center_x = self.rng.randrange(SCREEN_WIDTH)
 
     def update(self):
-        # Move the item
-        self.center_y -= 1
+        # Move the item, GameView.new_item sets how far it falls per tick
+        self.center_y += self.change_y
 
         # See if the item has fallen off the bottom of the screen.
         # If so, reset it.
@@ -83,24 +194,34 @@ class TurningSprite(arcade.Sprite):
         self.angle = math.degrees(math.atan2(self.change_y, self.change_x))
 
 
+def respawn_alpha(respawning, respawn_ticks):
+    """ Alpha of a ship that respawned that many ticks ago, it fades in. """
+    return min(respawning * 250 // respawn_ticks, 250) if respawning else 255
+
+
 class ShipSprite(arcade.Sprite):
     """
     Sprite that represents our space ship.
 
     Derives from arcade.Sprite.
     """
-    def __init__(self, filename, scale):
+    def __init__(self, texture, scale, tick_time=1 / TICK_RATE):
         """ Set up the space ship. """
 
         # Call the parent Sprite constructor
-        super().__init__(filename, scale)
+        super().__init__(texture=texture, scale=scale)
+
+        # Seconds per tick of the game, the speeds below are per second
+        self.tick_time = tick_time
 
         # Info on where we are going.
         # Angle comes in automatically from the parent class.
         self.thrust = 0
         self.speed = 0
-        self.max_speed = 5
+        self.max_speed = SHIP_MAX_SPEED
         self.drag = 0.0
+        # ticks of RESPAWN_TIME at this tick rate
+        self.respawn_ticks = max(1, round(RESPAWN_TIME / tick_time))
         self.respawning = 0
 
         # Mark that we are respawning.
@@ -110,7 +231,7 @@ class ShipSprite(arcade.Sprite):
     def respawn(self):
         """
         Called when we die and need to make a new ship.
-        'respawning' is an invulnerability timer.
+        'respawning' is an invulnerability timer, it counts ticks.
         """
         # If we are in the middle of respawning, this is non-zero.
         self.respawning = 1
@@ -124,28 +245,30 @@ class ShipSprite(arcade.Sprite):
         """
         if self.respawning:
             self.respawning += 1
-            self.alpha = self.respawning
-            if self.respawning > 250:
+            self.alpha = respawn_alpha(self.respawning, self.respawn_ticks)
+            if self.respawning > self.respawn_ticks:
                 self.respawning = 0
                 self.alpha = 255
         if self.speed > 0:
-            self.speed -= self.drag
+            self.speed -= self.drag * self.tick_time
             if self.speed < 0:
                 self.speed = 0
 
         if self.speed < 0:
-            self.speed += self.drag
+            self.speed += self.drag * self.tick_time
             if self.speed > 0:
                 self.speed = 0
 
-        self.speed += self.thrust
+        self.speed += self.thrust * self.tick_time
         if self.speed > self.max_speed:
             self.speed = self.max_speed
         if self.speed < -self.max_speed:
             self.speed = -self.max_speed
 
-        self.change_x = -math.sin(math.radians(self.angle)) * self.speed
-        self.change_y = math.cos(math.radians(self.angle)) * self.speed
+        # how far the ship moves in this tick
+        step = self.speed * self.tick_time
+        self.change_x = -math.sin(math.radians(self.angle)) * step
+        self.change_y = math.cos(math.radians(self.angle)) * step
 
         self.center_x += self.change_x
         self.center_y += self.change_y
@@ -170,13 +293,16 @@ class ShipSprite(arcade.Sprite):
 class AsteroidSprite(arcade.Sprite):
     """ Sprite that represents an asteroid. """
 
-    def __init__(self, image_file_name, scale):
-        super().__init__(image_file_name, scale=scale)
+    def __init__(self, texture, scale):
+        super().__init__(texture=texture, scale=scale)
         self.size = 0
 
-    def update(self):
-        """ Move the asteroid around. """
-        super().update()
+    def update(self, turn=True):
+        """ Move the asteroid around, without turning it if turn is False. """
+        if turn:
+            super().update()
+        else:
+            self.position = (self.center_x + self.change_x, self.center_y + self.change_y)
         if self.center_x < LEFT_LIMIT:
             self.center_x = RIGHT_LIMIT
         if self.center_x > RIGHT_LIMIT:
@@ -191,20 +317,73 @@ class AsteroidSprite(arcade.Sprite):
 class GameView(arcade.View):
     """ Our custom Window Class"""
 
-    def __init__(self):
+    def __init__(self, headless=False, numpy_motion=False, tick_rate=None,
+                 adaptive_quality=ADAPTIVE_QUALITY, play_music=True):
         """ Initializer """
-        # Call the parent class initializer
-        super().__init__()
+        # Headless mode runs the simulation without window, drawing or audio
+        self.headless = headless
+        # Move asteroids, bullets and items with the NumPy engine (needs numpy)
+        self.numpy_motion = numpy_motion
+        self.motion = None
+
+        # Call the parent class initializer. arcade.View needs a real window
+        # for its section manager, so headless mode only sets what we use.
+        if headless:
+            self.window = HeadlessWindow()
+            self.key = None
+        else:
+            super().__init__()
+
+        # Broadphase for all collision checks, rebuilt once per tick
+        self.collision_grid = SpatialGrid()
+
+        # Fixed timestep, on_update collects real time and runs whole ticks.
+        # Speeds and timers are per second and scaled by tick_time, so the
+        # tick rate only changes how smooth the game runs, not how fast.
+        self.tick_time = 1 / (tick_rate or TICK_RATE)
+        self.rewind_interval = max(1, round(REWIND_INTERVAL / self.tick_time))
+        self.time_accumulator = 0.0
+        # sprite -> (x, y, angle) before the last tick, for interpolation
+        self.previous_state = {}
+
+        # performance overlay (F3), hidden in a new game, so stop profiling
+        # unless the whole session is recorded
+        self.show_profiler = False
+        profiler.show_overlay(False)
+        # leaves the sprites outside of the screen out of drawing
+        self.culler = ViewportCuller()
+        # lowers the quality when frames take too long, never when headless.
+        # Benchmarks switch it off, they have to measure the same work every run.
+        self.governor = None
+        if adaptive_quality and not headless:
+            self.governor = QualityGovernor(self.tick_time)
+
+        # Sprites that died during the current tick, removed at its end.
+        # A dict keeps the order of removal the same in every run.
+        self.kill_set = {}
+
+        # Score, asteroid count, level and lives (needs a window for the fonts)
+        self.hud = None if headless else Hud()
 
         self.frame_count = 0
         self.game_over = False
 
+        # All randomness of a game comes from here, so a seed repeats it
+        self.seed = None
+        self.rng = random.Random()
+        self.recorder = None
+
+        # Snapshots for rewinding and of the start of the current level
+        self.rewind = None if headless else SnapshotRing(REWIND_SNAPSHOTS)
+        self.checkpoint = None
+        self.checkpoint_level = 0
+
         # Sprite lists
-        self.player_sprite_list = arcade.SpriteList()
-        self.asteroid_list = arcade.SpriteList()
-        self.bullet_list = arcade.SpriteList()
-        self.ship_life_list = arcade.SpriteList()
-        self.item_list = arcade.SpriteList()
+        self.player_sprite_list = self.new_sprite_list()
+        self.asteroid_list = self.new_sprite_list()
+        self.bullet_list = self.new_sprite_list()
+        self.ship_life_list = self.new_sprite_list()
+        self.item_list = self.new_sprite_list()
 #        self.level_list = arcade.SpriteList()
 
         # Set up the player
@@ -215,16 +394,34 @@ class GameView(arcade.View):
 
         self.item_list = None
 
-        # Sounds
-        Background_Music = arcade.load_sound("Sound/Trump.mp3")
-        arcade.play_sound(Background_Music, 0.05)
-
-        self.laser_sound = arcade.load_sound(":resources:sounds/hurt5.wav")
-        self.laser2_sound= arcade.load_sound(":resources:sounds/fall1.wav")
-        self.hit_sound1 = arcade.load_sound(":resources:sounds/explosion1.wav")
-        self.hit_sound2 = arcade.load_sound(":resources:sounds/explosion2.wav")
-        self.hit_sound3 = arcade.load_sound(":resources:sounds/hit1.wav")
-        self.hit_sound4 = arcade.load_sound(":resources:sounds/hit2.wav")
+        # Only loads something if main() did not preload the assets already
+        assets.load(sounds=not headless)
+
+        if play_music and not headless:
+            # keeps playing if it already runs from the last game
+            music.play()
+
+        # Pools for the bullets and fragments that come and go all the time
+        self.laser_pool = SpritePool(
+            lambda: TurningSprite(texture=assets.texture("laser"),
+                                  scale=assets.sprite_scale("laser", SCALE)),
+            BULLET_POOL_CAPACITY)
+        self.vote_pool = SpritePool(
+            lambda: TurningSprite(texture=assets.texture("vote"),
+                                  scale=assets.sprite_scale("vote", SCALE_VOTE)),
+            BULLET_POOL_CAPACITY)
+        # one pool per fragment size
+        self.fragment_pools = {
+            3: SpritePool(lambda: AsteroidSprite(assets.texture("twitter"),
+                                                 assets.sprite_scale("twitter", SCALE * 1.5)),
+                          FRAGMENT_POOL_CAPACITY),
+            2: SpritePool(lambda: AsteroidSprite(assets.texture("twitter"),
+                                                 assets.sprite_scale("twitter", SCALE * 1.5)),
+                          FRAGMENT_POOL_CAPACITY),
+            1: SpritePool(lambda: AsteroidSprite(assets.texture("fake"),
+                                                 assets.sprite_scale("fake", SCALE * 1.5)),
+                          FRAGMENT_POOL_CAPACITY),
+        }
 
         #change Mouse Invisible /JD for the Introduction View
         #self.set_mouse_visible(False)
@@ -232,262 +429,615 @@ class GameView(arcade.View):
 
         #Background
         self.background = None
-        arcade.set_background_color(arcade.color.LIGHT_BLUE)
+        if not headless:
+            arcade.set_background_color(arcade.color.LIGHT_BLUE)
 
-    def start_new_game(self):
-        """ Set up the game and initialize the variables. """
+    def new_sprite_list(self):
+        """ List of one kind of sprite, only uploaded to the GPU if it is drawn itself. """
+        if self.headless or BATCH_DRAW:
+            # draw_batch draws the sprites, or nothing is drawn at all
+            return LogicSpriteList()
+        return arcade.SpriteList()
+
+    def start_new_game(self, seed=None):
+        """
+        Set up the game and initialize the variables.
+
+        The same seed together with the same key events gives the same game.
+        """
 
         self.frame_count = 0
         self.game_over = False
 
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        self.seed = seed
+        self.rng = random.Random(seed)
+
+        if RECORD_DIR and not self.headless:
+            self.recorder = Recorder(new_replay_path(RECORD_DIR), seed,
+                                     round(1 / self.tick_time))
+
         # Sprite lists
-        self.player_sprite_list = arcade.SpriteList()
-        self.asteroid_list = arcade.SpriteList()
-        self.bullet_list = arcade.SpriteList()
-        self.ship_life_list = arcade.SpriteList()
-        self.item_list = arcade.SpriteList()
+        self.player_sprite_list = self.new_sprite_list()
+        self.asteroid_list = self.new_sprite_list()
+        self.bullet_list = self.new_sprite_list()
+        self.ship_life_list = self.new_sprite_list()
+        self.item_list = self.new_sprite_list()
 #        self.level_list = arcade.SpriteList()
+        # Every sprite of the lists above again, sorted by layer for drawing
+        self.draw_batch = None
+        if BATCH_DRAW and not self.headless:
+            self.draw_batch = LayeredSpriteList(atlas=game_atlas())
+        if self.numpy_motion:
+            self.motion = MotionEngine((SCREEN_WIDTH, SCREEN_HEIGHT),
+                                       (LEFT_LIMIT, RIGHT_LIMIT, BOTTOM_LIMIT, TOP_LIMIT))
 
         # Set up the player
         self.score = 0
-        self.player_sprite = ShipSprite(":resources:images/space_shooter/playerShip2_orange.png", SCALE)
+        self.player_sprite = ShipSprite(assets.texture("ship"), assets.sprite_scale("ship", SCALE),
+                                        self.tick_time)
         self.player_sprite_list.append(self.player_sprite)
+        if self.draw_batch is not None:
+            self.draw_batch.add(self.player_sprite, "player")
         self.lives = 3
-
-        # icons that represent the player livesand are positioned:
-        #x-axis is equal to cursor position and width of the sprite
-        #y-Axis is equal to life height
-        #+= Adds the value of a numeric expression to the value of a numeric variable or property and assigns the result to the variable or property
-        cur_pos = 8
-        for i in range(self.lives):
-            life = arcade.Sprite(":resources:images/space_shooter/playerLife1_orange.png", SCALE_LIVES)
-            life.center_x = cur_pos + life.width
-            life.center_y = life.height
-            cur_pos += life.width
-            self.ship_life_list.append(life)
+        self.show_lives()
 
         # Create the items
         for i in range(ITEM_COUNT):
 
             # Create the item instance
-            item = Item("Images/Flag.png", SCALE_ITEM)
+            item = self.new_item()
 
             # Position the item
-            item.center_x = random.randrange(SCREEN_WIDTH)
-            item.center_y = random.randrange(SCREEN_HEIGHT)
+            item.center_x = self.rng.randrange(SCREEN_WIDTH)
+            item.center_y = self.rng.randrange(SCREEN_HEIGHT)
 
             # Add the item to the lists
-            self.item_list.append(item)
+            self.add_sprite(item, "items")
 
 
         # Make the asteroids
-        image_list = ("Images/Trump_sprite.png",
-                      "Images/Trump_sprite.png",
-                      "Images/Trump_sprite.png",
-                      "Images/Trump_sprite.png")
+        image_list = ("trump",
+                      "trump",
+                      "trump",
+                      "trump")
 
         for i in range(STARTING_ASTEROID_COUNT):
-            image_no = random.randrange(4)
-            enemy_sprite = AsteroidSprite(image_list[image_no], SCALE)
-            enemy_sprite.guid = "Asteroid"
+            image_no = self.rng.randrange(4)
+            enemy_sprite = self.new_asteroid(4, image_list[image_no])
+
+            enemy_sprite.center_y = self.rng.randrange(BOTTOM_LIMIT, TOP_LIMIT)
+            enemy_sprite.center_x = self.rng.randrange(LEFT_LIMIT, RIGHT_LIMIT)
 
-            enemy_sprite.center_y = random.randrange(BOTTOM_LIMIT, TOP_LIMIT)
-            enemy_sprite.center_x = random.randrange(LEFT_LIMIT, RIGHT_LIMIT)
+            self.launch_asteroid(enemy_sprite, ASTEROID_SPEED)
+            self.add_sprite(enemy_sprite, "asteroids")
 
-            enemy_sprite.change_x = random.random() * 2 - 1
-            enemy_sprite.change_y = random.random() * 2 - 1
+        self.level = 1
+        self.save_checkpoint()
+        telemetry.game_started(self)
+
+    def show_lives(self):
+        """ Show as many life icons as the player has lives left. """
+        while len(self.ship_life_list) > max(self.lives, 0):
+            self.ship_life_list.pop().remove_from_sprite_lists()
+
+        # icons that represent the player livesand are positioned:
+        #x-axis is equal to cursor position and width of the sprite
+        #y-Axis is equal to life height
+        #+= Adds the value of a numeric expression to the value of a numeric variable or property and assigns the result to the variable or property
+        while len(self.ship_life_list) < self.lives:
+            life = arcade.Sprite(texture=assets.texture("life"),
+                                 scale=assets.sprite_scale("life", SCALE_LIVES))
+            cur_pos = 8 + len(self.ship_life_list) * life.width
+            life.center_x = cur_pos + life.width
+            life.center_y = life.height
+            self.ship_life_list.append(life)
+            if self.draw_batch is not None:
+                self.draw_batch.add(life, "lives")
+
+    def sprite_counts(self):
+        """ Sprites in every list and free ones in every pool, for the memory telemetry. """
+        counts = {
+            "player": len(self.player_sprite_list),
+            "asteroids": len(self.asteroid_list),
+            "bullets": len(self.bullet_list),
+            "items": len(self.item_list),
+            "lives": len(self.ship_life_list),
+            "laser_pool": len(self.laser_pool.free),
+            "vote_pool": len(self.vote_pool.free),
+        }
+        for size, pool in self.fragment_pools.items():
+            counts[f"fragment_pool_{size}"] = len(pool.free)
+        if self.draw_batch is not None:
+            counts["draw_batch"] = len(self.draw_batch)
+        return counts
+
+    def new_item(self):
+        """ A new item that takes its random positions from this game. """
+        item = Item(texture=assets.texture("flag"),
+                    scale=assets.sprite_scale("flag", SCALE_ITEM))
+        item.rng = self.rng
+        item.change_y = -ITEM_SPEED * self.tick_time
+        return item
+
+    def new_asteroid(self, size, image="trump"):
+        """ An asteroid of the given size, the smaller ones come from their pools. """
+        if size == 4:
+            asteroid = AsteroidSprite(assets.texture(image), assets.sprite_scale(image, SCALE))
+            asteroid.guid = "Asteroid"
+        else:
+            asteroid = self.fragment_pools[size].acquire()
+        asteroid.size = size
+        return asteroid
+
+    def launch_asteroid(self, asteroid, speed, rng=None):
+        """
+        Give an asteroid a random flight, up to speed pixels per second on
+        each axis, and a random turn. rng defaults to the one of the game.
+        """
+        rng = rng or self.rng
+        step = speed * self.tick_time
+        asteroid.change_x = (rng.random() * 2 - 1) * step
+        asteroid.change_y = (rng.random() * 2 - 1) * step
+        asteroid.change_angle = (rng.random() * 2 - 1) * ASTEROID_TURN_SPEED * self.tick_time
+
+    def bullet_pools(self):
+        """ The pools of both weapons, in the order snapshots use. """
+        return (self.laser_pool, self.vote_pool)
+
+    def snapshot(self):
+        """ The whole state of the game as compact bytes, only between two ticks. """
+        return capture(self)
+
+    def restore_snapshot(self, data):
+        """ Continue the game from a snapshot made by snapshot(). """
+        restore(self, data)
+
+    def save_checkpoint(self):
+        """ Remember the current state for retry_from_checkpoint(). """
+        self.checkpoint = self.snapshot()
+        self.checkpoint_level = self.level
+        if self.rewind is not None:
+            self.rewind.clear()
+
+    def retry_from_checkpoint(self):
+        """ Go back to the start of the current level, e.g. after game over. """
+        self.stop_recording()
+        self.restore_snapshot(self.checkpoint)
+        if self.rewind is not None:
+            self.rewind.clear()
+
+    def rewind_step(self):
+        """ Go back to the newest rewind snapshot, about half a second. """
+        data = self.rewind.pop() if self.rewind is not None else None
+        if data is not None:
+            self.stop_recording()
+            self.restore_snapshot(data)
+
+    def stop_recording(self):
+        # A replay can only repeat a game that never jumped back in time
+        if self.recorder:
+            self.recorder.close()
+            self.recorder = None
+
+    def add_sprite(self, sprite, kind):
+        """ Add an asteroid, bullet or item to its list and to the engines. """
+        if kind == "asteroids":
+            self.asteroid_list.append(sprite)
+            self.collision_grid.add(sprite, kind)
+        elif kind == "bullets":
+            self.bullet_list.append(sprite)
+        else:
+            self.item_list.append(sprite)
+        if self.motion:
+            self.motion.add(sprite, kind)
+        if self.draw_batch is not None:
+            self.draw_batch.add(sprite, kind)
+
+    def remove_sprite(self, sprite):
+        """
+        Mark a sprite as dead. It is taken out of the collision grid right
+        away, so nothing can hit it anymore, but stays in its sprite list
+        until flush_removals() at the end of the tick.
+        """
+        if sprite not in self.kill_set:
+            self.kill_set[sprite] = None
+            self.collision_grid.remove(sprite)
+
+    def flush_removals(self):
+        """ Remove all sprites marked during this tick in one pass. """
+        if not self.kill_set:
+            return
+        dead = self.kill_set
+        self.kill_set = {}
+        for sprite in dead:
+            if self.motion:
+                self.motion.remove(sprite)
+            # takes it out of all its sprite lists and gives it back to its pool
+            release(sprite)
+
+    def play_sound(self, name, volume):
+        """
+        Play a sound effect, unless we are running headless. The sound
+        manager limits how many effects play at once.
+        """
+        if not self.headless:
+            sound_manager.play(name, volume)
+
+    def quality(self):
+        """ Quality level of the governor, 0 is full quality. """
+        return self.governor.level if self.governor else 0
+
+    def moving_lists(self):
+        """ All sprite lists whose sprites move (and are interpolated) during a tick. """
+        if self.quality() >= PLAIN_ITEMS:
+            # items only fall one pixel per tick, they can do without
+            return (self.asteroid_list, self.bullet_list, self.player_sprite_list)
+        return (self.asteroid_list, self.bullet_list, self.player_sprite_list, self.item_list)
+
+    def focus_points(self):
+        """ Where the ships are, fragments near them keep turning at low quality. """
+        return [ship.position for ship in self.player_sprite_list]
+
+    def move_asteroids(self):
+        """ Move every asteroid, at low quality only the ones in focus turn. """
+        if self.quality() < STILL_FRAGMENTS:
+            self.asteroid_list.update()
+            return
+        focus = self.focus_points()
+        radius = FOCUS_RADIUS * FOCUS_RADIUS
+        for asteroid in self.asteroid_list:
+            x, y = asteroid.position
+            asteroid.update(asteroid.size == 4 or any(
+                (x - focus_x) ** 2 + (y - focus_y) ** 2 <= radius for focus_x, focus_y in focus))
+
+    def merge_fragments(self):
+        """
+        Keep at most MAX_SMALL_FRAGMENTS of the smallest fragments, the
+        oldest ones above that are merged into their nearest neighbour.
+        """
+        small = [asteroid for asteroid in self.asteroid_list
+                 if asteroid.size == 1 and asteroid not in self.kill_set]
+        extra = len(small) - MAX_SMALL_FRAGMENTS
+        if extra <= 0:
+            return
+        kept = small[extra:]
+        for fragment in small[:extra]:
+            x, y = fragment.position
+            nearest = min(kept, key=lambda other: (other.center_x - x) ** 2
+                          + (other.center_y - y) ** 2)
+            # the merged fragment takes the place in between
+            nearest.position = ((nearest.center_x + x) / 2, (nearest.center_y + y) / 2)
+            if self.motion:
+                self.motion.remove(nearest)
+                self.motion.add(nearest, "asteroids")
+            self.remove_sprite(fragment)
+
+    def save_previous_state(self):
+        """ Remember where every moving sprite is before the next tick. """
+        self.previous_state = {sprite: (sprite.center_x, sprite.center_y, sprite.angle)
+                               for sprite_list in self.moving_lists()
+                               for sprite in sprite_list}
+
+    def interpolate(self, blend):
+        """
+        Move the sprites between their last two ticks for drawing.
 
-            enemy_sprite.change_angle = (random.random() - 0.5) * 2
-            enemy_sprite.size = 4
-            self.asteroid_list.append(enemy_sprite)
+        Returns the real state so restore_state() can put it back afterwards.
+        """
+        real_state = []
+        for sprite_list in self.moving_lists():
+            for sprite in sprite_list:
+                previous = self.previous_state.get(sprite)
+                if previous is None:
+                    # spawned during the last tick
+                    continue
+                x, y, angle = sprite.center_x, sprite.center_y, sprite.angle
+                old_x, old_y, old_angle = previous
+                # Don't slide across the screen when something wrapped around
+                if abs(x - old_x) > SCREEN_WIDTH / 2 or abs(y - old_y) > SCREEN_HEIGHT / 2:
+                    continue
+                real_state.append((sprite, x, y, angle))
+                sprite.position = (old_x + (x - old_x) * blend, old_y + (y - old_y) * blend)
+                sprite.angle = old_angle + (angle - old_angle) * blend
+        return real_state
+
+    def restore_state(self, real_state):
+        """ Undo interpolate() after drawing. """
+        for sprite, x, y, angle in real_state:
+            sprite.position = (x, y)
+            sprite.angle = angle
 
     def on_draw(self):
         """
         Render the screen.
         """
 
+        draw_start = time.perf_counter()
+
         # This command has to happen before we start drawing
         arcade.start_render()
 
         # Draw the background texture
         #arcade.draw_lrwh_rectangle_textured(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT, self.background)
 
+        # Draw the sprites where they are between the last two ticks
+        real_state = []
+        if INTERPOLATE:
+            real_state = self.interpolate(self.time_accumulator / self.tick_time)
+
+        # Draw all the sprites, including the lives.
+        draw = self.culler.draw_visible if CULLING else arcade.SpriteList.draw
+        if self.draw_batch is not None:
+            with profiler.phase("draw_sprites"):
+                draw(self.draw_batch)
+        else:
+            with profiler.phase("draw_asteroids"):
+                draw(self.asteroid_list)
+            with profiler.phase("draw_bullets"):
+                draw(self.bullet_list)
+            with profiler.phase("draw_player"):
+                draw(self.player_sprite_list)
+            with profiler.phase("draw_items"):
+                draw(self.item_list)
+#            self.level_list.draw()
+            draw(self.ship_life_list)
+
+        self.restore_state(real_state)
+
+
+        # Put the text on the screen. The HUD only lays out a text again
+        # when its value changed.
+        with profiler.phase("draw_hud"):
+            self.hud.set("score", self.score)
+            self.hud.set("asteroids", len(self.asteroid_list))
+            self.hud.set("level", self.level)
+            self.hud.draw()
+
+        # Performance overlay, switched on and off with F3
+        if self.show_profiler:
+            lines = profiler.overlay_lines()
+            if self.governor:
+                lines.insert(0, self.governor.stats_line())
+            y = SCREEN_HEIGHT - 20
+            for line in lines:
+                arcade.draw_text(line, 10, y, arcade.color.BLACK, 11)
+                y -= 16
+
+        self.end_profiler_frame()
+        self.culler.end_frame()
+
+        if self.governor:
+            self.governor.add_work(time.perf_counter() - draw_start)
+            if self.governor.end_frame() and self.governor.level >= STILL_FRAGMENTS:
+                # the game no longer goes exactly like a replay of its keys would
+                self.stop_recording()
+
+    def end_profiler_frame(self):
+        """ Tell the profiler that a frame is done, with the entity counts. """
+        profiler.end_frame(asteroids=len(self.asteroid_list),
+                           bullets=len(self.bullet_list),
+                           items=len(self.item_list),
+                           quality=self.quality(),
+                           drawn=self.culler.drawn,
+                           culled=self.culler.culled)
 
-        # Draw all the sprites.
-        self.asteroid_list.draw()
-        self.ship_life_list.draw()
-        self.bullet_list.draw()
-        self.player_sprite_list.draw()
-        self.item_list.draw()
-#        self.level_list.draw()
-
-
-        # Put the text on the screen. #coordinates of the score/ASteroids/Level and the Color
-        output = f"Score: {self.score}"
-        arcade.draw_text(output, 10, 110, arcade.color.BLACK, 13)
+    def on_key_press(self, symbol, modifiers):
+        """ Called whenever a key is pressed. """
+        if self.recorder:
+            self.recorder.record(self.frame_count, "press", symbol)
 
-        output = f"Asteroid Count: {len(self.asteroid_list)}"
-        arcade.draw_text(output, 10, 80, arcade.color.BLACK, 13)
+        self.ship_key_press(self.player_sprite, symbol)
 
-        output = f"Level: {self.level}"
-        arcade.draw_text(output, 10, 50, arcade.color.BLACK, 13)
+        if symbol == arcade.key.F3:
+            self.show_profiler = not self.show_profiler
+            profiler.show_overlay(self.show_profiler)
+        elif symbol == arcade.key.BACKSPACE:
+            self.rewind_step()
+        elif symbol == arcade.key.P and not self.headless:
+                # pass self, the current view, to preserve this view's state
+            pause = PauseView(self)
+            self.window.show_view(pause)
 
     # Weapon 1
-    def on_key_press(self, symbol, modifiers):
-        """ Called whenever a key is pressed. """
+    def ship_key_press(self, ship, symbol):
+        """ Fire or steer a ship, the keys of the player or of a network player. """
         # keyboard controls
-        if not self.player_sprite.respawning and symbol == arcade.key.A:
+        if not ship.respawning and symbol == arcade.key.A:
             # look
-            bullet_sprite = TurningSprite(":resources:images/space_shooter/laserBlue01.png", SCALE)
-            # speed
-            bullet_speed = 50
+            bullet_sprite = self.laser_pool.acquire()
+            # distance per tick
+            bullet_speed = LASER_SPEED * self.tick_time
             # in which direction the bullet flies
             bullet_sprite.change_y = \
-                math.cos(math.radians(self.player_sprite.angle)) * bullet_speed
+                math.cos(math.radians(ship.angle)) * bullet_speed
             bullet_sprite.change_x = \
-                -math.sin(math.radians(self.player_sprite.angle)) \
+                -math.sin(math.radians(ship.angle)) \
                 * bullet_speed
             # where the bullet starts
-            bullet_sprite.center_x = self.player_sprite.center_x
-            bullet_sprite.center_y = self.player_sprite.center_y
+            bullet_sprite.center_x = ship.center_x
+            bullet_sprite.center_y = ship.center_y
             bullet_sprite.update()
             # add bulltet to bullet_list
-            self.bullet_list.append(bullet_sprite)
+            self.add_sprite(bullet_sprite, "bullets")
             # sound
-            arcade.play_sound(self.laser_sound, 0.03)
+            self.play_sound("laser", 0.03)
 
         # Weapon 2
         # keyboard controls
-        if not self.player_sprite.respawning and symbol == arcade.key.D:
+        if not ship.respawning and symbol == arcade.key.D:
             # look
-            bullet_sprite = TurningSprite("Images/vote.png", SCALE_VOTE)
-            # speed
-            bullet_speed = 3
+            bullet_sprite = self.vote_pool.acquire()
+            # distance per tick
+            bullet_speed = VOTE_SPEED * self.tick_time
             # in which direction the bullet flies
             bullet_sprite.change_y = \
-                math.cos(math.radians(self.player_sprite.angle)) * -bullet_speed
+                math.cos(math.radians(ship.angle)) * -bullet_speed
             bullet_sprite.change_x = \
-                -math.sin(math.radians(self.player_sprite.angle)) \
+                -math.sin(math.radians(ship.angle)) \
                 * -bullet_speed
             # where the bullet starts
-            bullet_sprite.center_x = self.player_sprite.center_x
-            bullet_sprite.center_y = self.player_sprite.center_y
+            bullet_sprite.center_x = ship.center_x
+            bullet_sprite.center_y = ship.center_y
             bullet_sprite.update()
             # add bulltet to bullet_list
-            self.bullet_list.append(bullet_sprite)
+            self.add_sprite(bullet_sprite, "bullets")
             # sound
-            arcade.play_sound(self.laser2_sound, 0.02)
+            self.play_sound("laser2", 0.02)
 
         if symbol == arcade.key.LEFT:
-            self.player_sprite.change_angle = 3
+            ship.change_angle = SHIP_TURN_SPEED * ship.tick_time
         elif symbol == arcade.key.RIGHT:
-            self.player_sprite.change_angle = -3
+            ship.change_angle = -SHIP_TURN_SPEED * ship.tick_time
         elif symbol == arcade.key.UP:
-            self.player_sprite.thrust = 0.15
+            ship.thrust = SHIP_THRUST
         elif symbol == arcade.key.DOWN:
-            self.player_sprite.thrust = -.2
-        elif symbol == arcade.key.P:
-                # pass self, the current view, to preserve this view's state
-            pause = PauseView(self)
-            self.window.show_view(pause)
+            ship.thrust = SHIP_REVERSE_THRUST
 
     def on_key_release(self, symbol, modifiers):
         """ Called whenever a key is released. """
+        if self.recorder:
+            self.recorder.record(self.frame_count, "release", symbol)
+
+        self.ship_key_release(self.player_sprite, symbol)
+
+    def ship_key_release(self, ship, symbol):
+        """ Stop steering a ship. """
         if symbol == arcade.key.LEFT:
-            self.player_sprite.change_angle = 0
+            ship.change_angle = 0
         elif symbol == arcade.key.RIGHT:
-            self.player_sprite.change_angle = 0
+            ship.change_angle = 0
         elif symbol == arcade.key.UP:
-            self.player_sprite.thrust = 0
+            ship.thrust = 0
         elif symbol == arcade.key.DOWN:
-            self.player_sprite.thrust = 0
+            ship.thrust = 0
 
 #One Point for the destruction of each Asteroid
     def split_asteroid(self, asteroid: AsteroidSprite):
         """ Split an asteroid into chunks. """
+        with profiler.phase("split_asteroid"):
+            self._split_asteroid(asteroid)
+
+    def _split_asteroid(self, asteroid: AsteroidSprite):
         x = asteroid.center_x
         y = asteroid.center_y
         self.score += 1
 
         if asteroid.size == 4:
             for i in range(3):
-                image_no = random.randrange(2)
-                image_list = ["Images/twitter.png",
-                              "Images/twitter.png"]
-
-                enemy_sprite = AsteroidSprite(image_list[image_no],
-                                              SCALE * 1.5)
+                enemy_sprite = self.fragment_pools[3].acquire()
 
                 enemy_sprite.center_y = y
                 enemy_sprite.center_x = x
 
-                enemy_sprite.change_x = random.random() * 2.5 - 1.25
-                enemy_sprite.change_y = random.random() * 2.5 - 1.25
-
-                enemy_sprite.change_angle = (random.random() - 0.5) * 2
+                self.launch_asteroid(enemy_sprite, FRAGMENT_SPEEDS[3])
                 enemy_sprite.size = 3
 
-                self.asteroid_list.append(enemy_sprite)
+                self.add_sprite(enemy_sprite, "asteroids")
 
         elif asteroid.size == 3:
             for i in range(3):
-                image_no = random.randrange(2)
-                image_list = ["Images/twitter.png",
-                              "Images/twitter.png"]
-
-                enemy_sprite = AsteroidSprite(image_list[image_no],
-                                              SCALE * 1.5)
+                enemy_sprite = self.fragment_pools[2].acquire()
 
                 enemy_sprite.center_y = y
                 enemy_sprite.center_x = x
 
-                enemy_sprite.change_x = random.random() * 3 - 1.5
-                enemy_sprite.change_y = random.random() * 3 - 1.5
-
-                enemy_sprite.change_angle = (random.random() - 0.5) * 2
+                self.launch_asteroid(enemy_sprite, FRAGMENT_SPEEDS[2])
                 enemy_sprite.size = 2
 
-                self.asteroid_list.append(enemy_sprite)
-                self.hit_sound2.play(0.01)
+                self.add_sprite(enemy_sprite, "asteroids")
+                self.play_sound("hit2", 0.01)
 
         elif asteroid.size == 2:
             for i in range(3):
-                image_no = random.randrange(2)
-                image_list = ["Images/fake.png",
-                              "Images/fake.png"]
-
-                enemy_sprite = AsteroidSprite(image_list[image_no],
-                                              SCALE * 1.5)
+                enemy_sprite = self.fragment_pools[1].acquire()
 
                 enemy_sprite.center_y = y
                 enemy_sprite.center_x = x
 
-                enemy_sprite.change_x = random.random() * 3.5 - 1.75
-                enemy_sprite.change_y = random.random() * 3.5 - 1.75
-
-                enemy_sprite.change_angle = (random.random() - 0.5) * 2
+                self.launch_asteroid(enemy_sprite, FRAGMENT_SPEEDS[1])
                 enemy_sprite.size = 1
 
-                self.asteroid_list.append(enemy_sprite)
-                self.hit_sound3.play(0.01)
+                self.add_sprite(enemy_sprite, "asteroids")
+                self.play_sound("hit3", 0.01)
 
         elif asteroid.size == 1:
             pass
 
-    def on_update(self, x):
-        """ Move everything """
+    def on_update(self, delta_time):
+        """
+        Run the simulation with a fixed timestep.
+
+        The real time is collected and as many whole ticks are run as fit
+        into it, at most MAX_CATCH_UP_TICKS per frame. A slow frame
+        therefore doesn't slow the game down, and a fast display doesn't
+        run extra ticks.
+        """
+        update_start = time.perf_counter()
+        self.time_accumulator += delta_time
+        ticks = min(int(self.time_accumulator / self.tick_time), MAX_CATCH_UP_TICKS)
+        for i in range(ticks):
+            # Only the state before the last tick is needed for drawing
+            if INTERPOLATE and i == ticks - 1:
+                self.save_previous_state()
+            self.tick()
+            self.time_accumulator -= self.tick_time
+            # The tick may have switched to the game over or winner view
+            if self.game_over or self.level == 3:
+                break
+
+        # Too far behind to catch up, drop the rest instead of spiralling
+        if self.time_accumulator >= self.tick_time:
+            self.time_accumulator %= self.tick_time
+
+        if self.governor:
+            self.governor.add_work(time.perf_counter() - update_start)
+
+    def tick(self):
+        """ Move everything by one fixed timestep """
 
         # for collecting items
-        self.item_list.update()
+        with profiler.phase("item_update"):
+            if self.motion:
+                self.motion.step_items()
+            else:
+                self.item_list.update()
     #    self.level_list.update()
 
-        # Generate a list of all sprites that collided with the player.
-        hit_list = arcade.check_for_collision_with_list(self.player_sprite, self.item_list)
-
-        # Loop through each colliding sprite, remove it, and add to the score.
-        for item in hit_list:
-            item.remove_from_sprite_lists()
-            self.score += 1
+        with profiler.phase("movement"):
+            if not self.game_over:
+                if self.motion:
+                    if self.quality() >= STILL_FRAGMENTS:
+                        self.motion.step_asteroids(self.focus_points(), FOCUS_RADIUS)
+                    else:
+                        self.motion.step_asteroids()
+                    for bullet in self.motion.step_bullets():
+                        self.remove_sprite(bullet)
+                else:
+                    self.move_asteroids()
+                    self.bullet_list.update()
+                self.player_sprite_list.update()
+
+            # The engine only moved its arrays, hand the result to the sprites
+            if self.motion:
+                self.motion.sync()
+
+        # Everything has moved and wrapped around the screen, so build the
+        # broadphase that all collision checks of this tick share
+        with profiler.phase("broadphase"):
+            self.collision_grid.rebuild(asteroids=self.asteroid_list, items=self.item_list)
+
+        with profiler.phase("item_pickup"):
+            # every ship, the network game has more than one
+            for ship in self.player_sprite_list:
+                # Generate a list of all sprites that collided with the player.
+                hit_list = self.collision_grid.check_for_collision(ship, "items")
+
+                # Loop through each colliding sprite, remove it, and add to the score.
+                for item in hit_list:
+                    self.remove_sprite(item)
+                    self.score += 1
 
         # Create levels
         if self.score == 10:
@@ -496,7 +1046,9 @@ class GameView(arcade.View):
             self.level = 3
 
         # Show the Winner View
-        if self.level == 3:
+        if self.level == 3 and not self.headless:
+            if self.recorder:
+                self.recorder.close()
             view = WinnerView()
             self.window.show_view(view)
 
@@ -504,54 +1056,85 @@ class GameView(arcade.View):
         self.frame_count += 1
 
         if not self.game_over:
-            self.asteroid_list.update()
-            self.bullet_list.update()
-            self.player_sprite_list.update()
-
-            for bullet in self.bullet_list:
-                asteroids = arcade.check_for_collision_with_list(bullet, self.asteroid_list)
-
-                for asteroid in asteroids:
-                    self.split_asteroid(cast(AsteroidSprite, asteroid))  # expected AsteroidSprite, got Sprite instead
-                    asteroid.remove_from_sprite_lists()
-                    bullet.remove_from_sprite_lists()
-
-                # Remove bullet if it goes off-screen
-                size = max(bullet.width, bullet.height)
-                if bullet.center_x < 0 - size:
-                    bullet.remove_from_sprite_lists()
-                if bullet.center_x > SCREEN_WIDTH + size:
-                    bullet.remove_from_sprite_lists()
-                if bullet.center_y < 0 - size:
-                    bullet.remove_from_sprite_lists()
-                if bullet.center_y > SCREEN_HEIGHT + size:
-                    bullet.remove_from_sprite_lists()
-
-            if not self.player_sprite.respawning:
-                asteroids = arcade.check_for_collision_with_list(self.player_sprite, self.asteroid_list)
-                if len(asteroids) > 0:
-                    if self.lives > 0:
-                        self.lives -= 1
-                        self.player_sprite.respawn()
-                        self.split_asteroid(cast(AsteroidSprite, asteroids[0]))
-                        asteroids[0].remove_from_sprite_lists()
-                        self.ship_life_list.pop().remove_from_sprite_lists()
-                        print("Du Lappen hast einen Unfall gebaut!")
-                    else:
-                        self.game_over = True
-                        print("Du Lappen hast zu viele Unfälle gebaut... Game Over")
+            with profiler.phase("bullet_collisions"):
+                for bullet in self.bullet_list:
+                    # hit something already, or removed by the motion engine
+                    if bullet in self.kill_set:
+                        continue
+
+                    asteroids = self.collision_grid.check_for_collision(bullet, "asteroids")
+
+                    for asteroid in asteroids:
+                        self.split_asteroid(cast(AsteroidSprite, asteroid))  # expected AsteroidSprite, got Sprite instead
+                        self.remove_sprite(asteroid)
+                        self.remove_sprite(bullet)
+
+                    # Remove bullet if it goes off-screen
+                    size = max(bullet.width, bullet.height)
+                    if (bullet.center_x < 0 - size or bullet.center_x > SCREEN_WIDTH + size or
+                            bullet.center_y < 0 - size or bullet.center_y > SCREEN_HEIGHT + size):
+                        self.remove_sprite(bullet)
+
+            with profiler.phase("player_collision"):
+                for ship in self.player_sprite_list:
+                    if ship.respawning or self.game_over:
+                        continue
+                    asteroids = self.collision_grid.check_for_collision(ship, "asteroids")
+                    if len(asteroids) > 0:
+                        if self.lives > 0:
+                            self.lives -= 1
+                            ship.respawn()
+                            self.split_asteroid(cast(AsteroidSprite, asteroids[0]))
+                            self.remove_sprite(asteroids[0])
+                            self.ship_life_list.pop().remove_from_sprite_lists()
+                            print("Du Lappen hast einen Unfall gebaut!")
+                        else:
+                            self.game_over = True
+                            print("Du Lappen hast zu viele Unfälle gebaut... Game Over")
 
             #for Game Over View
-            if self.game_over:
-                view = GameOverView()
+            if self.game_over and not self.headless:
+                if self.recorder:
+                    self.recorder.close()
+                view = GameOverView(self)
                 self.window.show_view(view)
 
+        if self.quality() >= MERGE_FRAGMENTS:
+            with profiler.phase("merge_fragments"):
+                self.merge_fragments()
+
+        # Everything that died in this tick leaves its sprite lists now
+        with profiler.phase("removals"):
+            self.flush_removals()
+
+        # A new level is where a retry after game over starts
+        if self.level > self.checkpoint_level and not self.game_over:
+            self.save_checkpoint()
+        elif self.rewind is not None and self.frame_count % self.rewind_interval == 0:
+            self.rewind.push(self.snapshot())
+
+        # Without drawing every tick is a frame of its own
+        if self.headless:
+            self.end_profiler_frame()
+
+        telemetry.tick(self)
+
 
 class PauseView(arcade.View):
     def __init__(self, game_view): #initialize new Objekt
         super().__init__() #Superclass (class on "top level")
         self.game_view = game_view #Define View
 
+        # The texts never change, so build them once instead of every frame
+        self.title_text = arcade.Text("PAUSED", SCREEN_WIDTH/2, SCREEN_HEIGHT/2+50,
+                                      arcade.color.BLACK, font_size=50, anchor_x="center")
+        self.tip_text = arcade.Text("Press Esc. to return",
+                                    SCREEN_WIDTH/2,
+                                    SCREEN_HEIGHT/2,
+                                    arcade.color.BLACK,
+                                    font_size=20,
+                                    anchor_x="center")
+
     def on_show(self):
         arcade.set_background_color(arcade.color.LIGHT_BLUE) #Show the background
 
@@ -571,16 +1154,10 @@ class PauseView(arcade.View):
                                           bottom=player_sprite.bottom,
                                           color=arcade.color.LIGHT_BLUE + (200,))
 
-        arcade.draw_text("PAUSED", SCREEN_WIDTH/2, SCREEN_HEIGHT/2+50,
-                         arcade.color.BLACK, font_size=50, anchor_x="center") #Text in Pause View
+        self.title_text.draw() #Text in Pause View
 
         # Show tip to return or reset
-        arcade.draw_text("Press Esc. to return",
-                         SCREEN_WIDTH/2,
-                         SCREEN_HEIGHT/2,
-                         arcade.color.BLACK,
-                         font_size=20,
-                         anchor_x="center")
+        self.tip_text.draw()
         """arcade.draw_text("Press Enter to reset",
                          SCREEN_WIDTH/2,
                          SCREEN_HEIGHT/2-30,
@@ -599,10 +1176,12 @@ class PauseView(arcade.View):
 class GameOverView(arcade.View):
     """ View to show when game is over """
 
-    def __init__(self):
+    def __init__(self, game_view=None):
         """ This is run once when we switch to this view """
         super().__init__()
-        self.texture = arcade.load_texture("Images/GameOverTrump.png")
+        self.texture = assets.texture("game_over")
+        # the game that was lost, C continues it from its last checkpoint
+        self.game_view = game_view
 
         # Reset the viewport, necessary if we have a scrolling game and we need
         # to reset the viewport back to the start so we can see what we draw.
@@ -615,11 +1194,13 @@ class GameOverView(arcade.View):
                                 SCREEN_WIDTH, SCREEN_HEIGHT)
 
     def on_key_press(self, symbol, modifiers):
-        """ If the user presses ENTER, start the game. """
+        """ If the user presses ENTER, start the game, with C retry the level. """
         if symbol == arcade.key.ENTER:
-            game_view = GameView()
-            game_view.start_new_game()
-            self.window.show_view(game_view)
+            show_new_game(self.window)
+        elif symbol == arcade.key.C and self.game_view is not None:
+            # no new view and nothing to load, the old one just goes back
+            self.game_view.retry_from_checkpoint()
+            self.window.show_view(self.game_view)
 
 #Winner View
 class WinnerView(arcade.View):
@@ -628,7 +1209,7 @@ class WinnerView(arcade.View):
     def __init__(self):
         """ This is run once when we switch to this view """
         super().__init__()
-        self.texture = arcade.load_texture("Images/Winner.png")
+        self.texture = assets.texture("winner")
 
         # Reset the viewport, necessary if we have a scrolling game and we need
         # to reset the viewport back to the start so we can see what we draw.
@@ -643,17 +1224,45 @@ class WinnerView(arcade.View):
     def on_key_press(self, symbol, modifiers):
         """ If the user presses ENTER, start the game. """
         if symbol == arcade.key.ENTER:
-            game_view = GameView()
-            game_view.start_new_game()
-            self.window.show_view(game_view)
+            show_new_game(self.window)
 
 
 def main():
     """ Main method """
+    global RECORD_DIR, THREADED, TICK_RATE
+    parser = argparse.ArgumentParser(description=SCREEN_TITLE)
+    parser.add_argument("--record", metavar="FOLDER",
+                        help="save a replay of every game into this folder")
+    parser.add_argument("--profile", metavar="FILE",
+                        help="time every frame and write it to a .csv or .json file at the end")
+    parser.add_argument("--memory", metavar="FILE",
+                        help="record memory telemetry and write it to a .json file at the end")
+    parser.add_argument("--memory-interval", type=int, default=600, metavar="TICKS",
+                        help="ticks between two memory snapshots (default 600)")
+    parser.add_argument("--threaded", action="store_true",
+                        help="run the simulation on a worker thread, the main thread only draws")
+    parser.add_argument("--tick-rate", type=int, default=TICK_RATE,
+                        help=f"simulation ticks per second (default {TICK_RATE})")
+    args = parser.parse_args()
+    TICK_RATE = args.tick_rate
+    RECORD_DIR = args.record
+    THREADED = args.threaded
+    if args.profile:
+        profiler.start_session()
+    if args.memory:
+        telemetry.start(args.memory_interval)
+
     window = arcade.Window(SCREEN_WIDTH, SCREEN_HEIGHT, SCREEN_TITLE, fullscreen= True)
+    # All other textures and sounds are loaded once in the background while
+    # the intro is shown, every new game reuses them
     start_view = InstructionView()
     window.show_view(start_view)
     arcade.run()
 
+    if args.profile:
+        profiler.export(args.profile)
+    if args.memory:
+        telemetry.export(args.memory)
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,97 @@
+"""
+Texture atlas and layered batch drawing for the gameplay sprites.
+
+All textures that sprites use in a game (ship, lives, bullets, items and
+asteroids) are packed into one atlas when the first game starts. The atlas
+is sized for all of them up front, so it never has to grow or be rebuilt
+during a game.
+
+LayeredSpriteList holds every gameplay sprite in one SpriteList that uses
+this atlas. It keeps the sprites sorted by layer, so drawing the whole
+screen is a single draw call with a single texture bind, in the same
+order the separate lists were drawn in before.
+
+The lists of one kind of sprite (asteroids, bullets, ...) are then only
+used for updates and collisions. They are LogicSpriteLists, which never
+create GPU buffers or add textures to an atlas.
+
+Usage:
+    batch = LayeredSpriteList(DRAW_LAYERS, atlas=game_atlas())
+    batch.add(sprite, "asteroids")
+    batch.draw()
+"""
+
+import arcade
+
+from assets import assets
+
+# Textures of everything drawn by sprite lists, the full screen images of
+# the intro and end screens are drawn on their own and stay out
+ATLAS_TEXTURES = ("ship", "life", "laser", "vote", "flag", "trump", "twitter", "fake")
+
+# Drawing order of the gameplay layers, bottom to top
+DRAW_LAYERS = ("asteroids", "bullets", "player", "items", "lives")
+
+_atlas = None
+
+
+def atlas_size(textures, border=1):
+    """ Smallest square power of two that should fit all textures. """
+    area = sum((texture.width + 2 * border) * (texture.height + 2 * border)
+               for texture in textures)
+    widest = max(max(texture.width, texture.height) + 2 * border for texture in textures)
+    size = 64
+    # leave some room, the rows of the atlas are never filled completely
+    while size * size < area * 1.5 or size < widest:
+        size *= 2
+    return size, size
+
+
+def game_atlas():
+    """ The atlas with all gameplay textures, built on first use (needs a window). """
+    global _atlas
+    if _atlas is None:
+        textures = [assets.texture(name) for name in ATLAS_TEXTURES]
+        _atlas = arcade.TextureAtlas(atlas_size(textures), textures=textures)
+    return _atlas
+
+
+class LayeredSpriteList(arcade.SpriteList):
+    """ One SpriteList for all layers, drawn bottom layer first. """
+
+    def __init__(self, layers=DRAW_LAYERS, **kwargs):
+        super().__init__(**kwargs)
+        self.layers = list(layers)
+        # number of sprites in every layer and the layer of every sprite
+        self.layer_counts = [0] * len(self.layers)
+        self.sprite_layer = {}
+
+    def add(self, sprite, layer):
+        """ Add a sprite on top of all other sprites of its layer. """
+        layer_no = self.layers.index(layer)
+        index = sum(self.layer_counts[:layer_no + 1])
+        if index == len(self.sprite_list):
+            self.append(sprite)
+        else:
+            self.insert(index, sprite)
+            # unlike append, insert of arcade 2.6 doesn't flag the new order
+            self._sprite_index_changed = True
+        self.layer_counts[layer_no] += 1
+        self.sprite_layer[sprite] = layer_no
+
+    def remove(self, sprite):
+        """ Also called by sprite.remove_from_sprite_lists() and pop(). """
+        super().remove(sprite)
+        self.layer_counts[self.sprite_layer.pop(sprite)] -= 1
+
+
+class LogicSpriteList(arcade.SpriteList):
+    """ A SpriteList that is never drawn, so it never touches the GPU. """
+
+    def __init__(self, **kwargs):
+        super().__init__(lazy=True, **kwargs)
+
+    def remove(self, sprite):
+        super().remove(sprite)
+        # a lazy list keeps its sprites for the first draw, which never comes
+        self._deferred_sprites.discard(sprite)
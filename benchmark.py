@@ -0,0 +1,256 @@
+"""
+Stress benchmarks for Trump Smasher.
+
+Every scenario fills a GameView with far more entities than a normal game
+and then measures update (GameView.tick) and draw (GameView.on_draw) time
+separately. The scenarios run in up to three modes:
+
+    headless   no window at all, only the update is measured
+    offscreen  hidden window, update and draw (GPU work included)
+    windowed   visible window, update and draw
+
+The results are written into a JSON file, so two commits can be compared.
+
+Examples:
+python benchmark.py
+python benchmark.py --modes headless --scale 0.5 --output before.json
+python benchmark.py --scenarios item_flood split_cascade --ticks 600
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import time
+
+import arcade
+
+from asteroids import ITEM_COUNT, SCREEN_HEIGHT, SCREEN_TITLE, SCREEN_WIDTH, GameView
+from assets import assets
+from profiler import percentile
+
+MODES = ("headless", "offscreen", "windowed")
+SEED = 1918
+
+
+def make_asteroid(view, size, x, y, rng):
+    """ Add an asteroid of the given size (1 to 4) to the game. """
+    asteroid = view.new_asteroid(size)
+    asteroid.center_x = x
+    asteroid.center_y = y
+    view.launch_asteroid(asteroid, 90, rng)
+    view.add_sprite(asteroid, "asteroids")
+
+
+def fire(view, key, angle):
+    """ Shoot like the player would, even while the ship is respawning. """
+    ship = view.player_sprite
+    respawning = ship.respawning
+    ship.angle = angle
+    ship.respawning = 0
+    view.on_key_press(key, 0)
+    ship.respawning = respawning
+
+
+def keep_running(view):
+    """ Keep the ship invulnerable and the game from ending. """
+    view.player_sprite.respawning = 1
+    view.score = 0
+    view.level = 1
+
+
+# ----- scenarios: setup(view, rng, scale) and step(view, tick, rng) -----
+
+def setup_asteroid_field(view, rng, scale):
+    for i in range(int(3000 * scale)):
+        make_asteroid(view, rng.randrange(1, 5), rng.randrange(SCREEN_WIDTH),
+                      rng.randrange(SCREEN_HEIGHT), rng)
+
+
+def step_asteroid_field(view, tick, rng):
+    # keep splitting some of them
+    if tick % 2 == 0:
+        fire(view, arcade.key.A, tick * 7 % 360)
+
+
+def setup_bullet_storm(view, rng, scale):
+    for i in range(20):
+        make_asteroid(view, 4, rng.randrange(SCREEN_WIDTH), rng.randrange(SCREEN_HEIGHT), rng)
+    # vote bullets are slow, so they stay on screen for a long time
+    for i in range(int(500 * scale)):
+        view.player_sprite.center_x = rng.randrange(SCREEN_WIDTH)
+        view.player_sprite.center_y = rng.randrange(SCREEN_HEIGHT)
+        fire(view, arcade.key.D, rng.randrange(360))
+    view.player_sprite.respawn()
+
+
+def step_bullet_storm(view, tick, rng):
+    fire(view, arcade.key.D, rng.randrange(360))
+    fire(view, arcade.key.A, rng.randrange(360))
+
+
+def setup_item_flood(view, rng, scale):
+    for i in range(int(20000 * scale) - ITEM_COUNT):
+        item = view.new_item()
+        item.center_x = rng.randrange(SCREEN_WIDTH)
+        item.center_y = rng.randrange(SCREEN_HEIGHT)
+        view.add_sprite(item, "items")
+
+
+def step_item_flood(view, tick, rng):
+    pass
+
+
+def setup_split_cascade(view, rng, scale):
+    # big asteroids around the ship, every shot starts a cascade
+    for i in range(int(60 * scale)):
+        make_asteroid(view, 4, SCREEN_WIDTH / 2 + rng.randrange(-300, 300),
+                      SCREEN_HEIGHT / 2 + rng.randrange(-300, 300), rng)
+
+
+def step_split_cascade(view, tick, rng):
+    fire(view, arcade.key.A, tick * 15 % 360)
+    fire(view, arcade.key.D, tick * 15 % 360)
+
+
+# name -> (description, setup, step)
+SCENARIOS = {
+    "asteroid_field": ("thousands of asteroids of all sizes, some splitting",
+                       setup_asteroid_field, step_asteroid_field),
+    "bullet_storm": ("hundreds of bullets in flight",
+                     setup_bullet_storm, step_bullet_storm),
+    "item_flood": ("tens of thousands of falling flags",
+                   setup_item_flood, step_item_flood),
+    "split_cascade": ("sustained fire into big asteroids",
+                      setup_split_cascade, step_split_cascade),
+}
+
+
+def timing(values):
+    """ mean, p50, p99 and max of a list of seconds, in milliseconds. """
+    if not values:
+        return None
+    return {
+        "mean_ms": sum(values) / len(values) * 1000,
+        "p50_ms": percentile(values, 50) * 1000,
+        "p99_ms": percentile(values, 99) * 1000,
+        "max_ms": max(values) * 1000,
+    }
+
+
+def run_scenario(name, mode, ticks, warmup, scale, numpy_motion, window=None):
+    """ Run one scenario in one mode and return its result dict. """
+    description, setup, step = SCENARIOS[name]
+    rng = random.Random(SEED)
+
+    # no music and a fixed quality, every run has to do the same work
+    view = GameView(headless=(mode == "headless"), numpy_motion=numpy_motion,
+                    adaptive_quality=False, play_music=False)
+    view.start_new_game(SEED)
+    setup(view, rng, scale)
+    if window is not None:
+        window.show_view(view)
+
+    update_times = []
+    draw_times = []
+    for tick in range(warmup + ticks):
+        step(view, tick, rng)
+        keep_running(view)
+
+        start = time.perf_counter()
+        view.tick()
+        update_time = time.perf_counter() - start
+
+        if window is not None:
+            window.dispatch_events()
+            start = time.perf_counter()
+            view.on_draw()
+            # wait for the GPU, otherwise only the submission is measured
+            window.ctx.finish()
+            draw_time = time.perf_counter() - start
+            window.flip()
+        if tick >= warmup:
+            update_times.append(update_time)
+            if window is not None:
+                draw_times.append(draw_time)
+
+    return {
+        "scenario": name,
+        "description": description,
+        "mode": mode,
+        "ticks": ticks,
+        "asteroids": len(view.asteroid_list),
+        "bullets": len(view.bullet_list),
+        "items": len(view.item_list),
+        "update": timing(update_times),
+        "draw": timing(draw_times),
+    }
+
+
+def git_commit():
+    """ Commit the benchmark runs on, if this is a git checkout. """
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    """ Main method """
+    parser = argparse.ArgumentParser(description="Stress benchmarks for Trump Smasher")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--ticks", type=int, default=300, help="measured ticks per scenario")
+    parser.add_argument("--warmup", type=int, default=30, help="ticks before measuring")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplies all entity counts")
+    parser.add_argument("--numpy", action="store_true", help="use the NumPy motion engine")
+    parser.add_argument("--output", default="bench_results.json", help="JSON file for the results")
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output)
+    # The game loads its images relative to this folder
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    results = []
+    for mode in args.modes:
+        window = None
+        if mode != "headless":
+            try:
+                window = arcade.Window(SCREEN_WIDTH, SCREEN_HEIGHT, SCREEN_TITLE + " - Benchmark",
+                                       visible=(mode == "windowed"), vsync=False)
+            except Exception as error:
+                # e.g. a CI container without a display
+                print(f"{mode}: skipped, no window ({error})")
+                results.append({"mode": mode, "error": str(error)})
+                continue
+        assets.load(sounds=False)
+
+        for name in args.scenarios:
+            result = run_scenario(name, mode, args.ticks, args.warmup, args.scale,
+                                  args.numpy, window)
+            results.append(result)
+            draw = f"{result['draw']['p50_ms']:8.3f} ms" if result["draw"] else "     n/a"
+            print(f"{mode:9} {name:15} update p50 {result['update']['p50_ms']:8.3f} ms"
+                  f"  p99 {result['update']['p99_ms']:8.3f} ms  draw p50 {draw}")
+
+        if window is not None:
+            window.close()
+
+    with open(output, "w") as file:
+        json.dump({
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "arcade": arcade.__version__,
+            "platform": platform.platform(),
+            "scale": args.scale,
+            "numpy_motion": args.numpy,
+            "results": results,
+        }, file, indent=1)
+    print(f"results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Offline asset pipeline for Trump Smasher.
+
+Most images are drawn much smaller than they are stored, e.g. Flag.png
+(180 x 180 pixels) is drawn at SCALE_ITEM = 0.1. This script writes a copy
+of every such texture that is already resized to the scale the game draws
+it at, and shrinks the full screen images to the size of the screen. The
+game loads the copies through the manifest in Images/scaled/manifest.json
+(see assets.py) and uses the original files for everything missing there.
+
+Run it again after changing an image or a SCALE constant. Images whose
+source and size did not change are not written again.
+
+With --pack it then also writes assets.pack (see asset_pack.py): all
+textures (the pre-scaled ones where there are some) as raw pixels with
+their hit boxes and all sounds as WAV files, in one file the game
+memory-maps instead of loading the single files. Build the pack again
+after changing any asset or a HIT_BOX setting.
+
+Examples:
+python build_assets.py
+python build_assets.py --resolution 1920x1080
+python build_assets.py --pack
+"""
+
+import argparse
+import json
+import os
+
+from PIL import Image
+from arcade.resources import resolve_resource_path
+
+from asset_pack import PACK_FILE, write_pack
+from asteroids import SCALE, SCALE_ITEM, SCALE_LIVES, SCALE_VOTE, SCREEN_HEIGHT, SCREEN_WIDTH
+from assets import (HIT_BOX_ALGORITHM, HIT_BOX_DETAIL, MANIFEST_FILE, SCREEN_TEXTURES,
+                    SOUND_FILES, TEXTURE_FILES, AssetRegistry)
+from hitbox_cache import file_hash
+
+# Pillow 9.1 moved the filters into Image.Resampling
+LANCZOS = getattr(Image, "Resampling", Image).LANCZOS
+
+# name -> scale the game draws the texture at
+SPRITE_SCALES = {
+    "ship": SCALE,
+    "life": SCALE_LIVES,
+    "laser": SCALE,
+    "vote": SCALE_VOTE,
+    "flag": SCALE_ITEM,
+    "trump": SCALE,
+    "twitter": SCALE * 1.5,
+    "fake": SCALE * 1.5,
+}
+
+
+def build(resolution, output_dir):
+    """ Write all resized images and return the manifest. """
+    os.makedirs(output_dir, exist_ok=True)
+    old_manifest = {}
+    manifest_path = os.path.join(output_dir, os.path.basename(MANIFEST_FILE))
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as file:
+            old_manifest = json.load(file)["textures"]
+
+    textures = {}
+    for name, source in TEXTURE_FILES.items():
+        source_path = str(resolve_resource_path(source))
+        with Image.open(source_path) as image:
+            source_size = image.size
+        if name in SCREEN_TEXTURES:
+            if source_size[0] <= resolution[0] and source_size[1] <= resolution[1]:
+                # enlarging is done just as well by the GPU
+                continue
+            size = resolution
+        elif SPRITE_SCALES.get(name, 1.0) < 1.0:
+            scale = SPRITE_SCALES[name]
+            size = (max(1, round(source_size[0] * scale)), max(1, round(source_size[1] * scale)))
+        else:
+            # drawn at full size or larger, the original is best
+            continue
+        if size == source_size:
+            continue
+
+        entry = {
+            "file": os.path.join(output_dir, name + ".png").replace(os.sep, "/"),
+            "source": source,
+            "source_hash": file_hash(source_path),
+            "size": list(size),
+            # sprites are drawn with their scale divided by this
+            "scale": size[0] / source_size[0],
+        }
+        textures[name] = entry
+        if old_manifest.get(name) == entry and os.path.exists(entry["file"]):
+            print(f"{name}: up to date")
+            continue
+
+        with Image.open(source_path) as image:
+            image.convert("RGBA").resize(size, LANCZOS).save(entry["file"], optimize=True)
+        print(f"{name}: {source_size[0]}x{source_size[1]} -> {size[0]}x{size[1]}")
+
+    manifest = {"resolution": list(resolution), "textures": textures}
+    with open(manifest_path, "w") as file:
+        json.dump(manifest, file, indent=1)
+    return manifest
+
+
+def build_pack(path):
+    """ Decode every texture the way the game loads it and write the pack. """
+    registry = AssetRegistry()
+    # the old pack must not be the source of the new one
+    registry.pack_file = None
+    registry.load(sounds=False)
+    textures = {}
+    for name in TEXTURE_FILES:
+        texture = registry.texture(name)
+        textures[name] = (texture.image, registry.baked_scales.get(name, 1.0),
+                          texture.hit_box_points)
+    sounds = {}
+    for name, source in SOUND_FILES.items():
+        # the pack keeps the file, pyglet decodes it from there
+        sound_path = resolve_resource_path(source)
+        with open(sound_path, "rb") as file:
+            sounds[name] = (os.path.basename(sound_path), file.read())
+    write_pack(path, textures, sounds,
+               (HIT_BOX_ALGORITHM, HIT_BOX_DETAIL, registry.vertex_budget))
+    print(f"{len(textures)} textures and {len(sounds)} sounds packed into {path} "
+          f"({os.path.getsize(path) / 2 ** 20:.1f} MiB)")
+
+
+def main():
+    """ Main method """
+    parser = argparse.ArgumentParser(description="Write pre-scaled copies of the game images")
+    parser.add_argument("--resolution", default=f"{SCREEN_WIDTH}x{SCREEN_HEIGHT}",
+                        help="size of the full screen images, WIDTHxHEIGHT of the screen")
+    parser.add_argument("--pack", action="store_true",
+                        help=f"also write all decoded assets into {PACK_FILE}")
+    args = parser.parse_args()
+    resolution = tuple(int(value) for value in args.resolution.lower().split("x"))
+
+    # The game loads its images relative to this folder
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    build(resolution, os.path.dirname(MANIFEST_FILE))
+    print(f"manifest written to {MANIFEST_FILE}")
+    if args.pack:
+        build_pack(PACK_FILE)
+
+
+if __name__ == "__main__":
+    main()
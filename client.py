@@ -0,0 +1,394 @@
+"""
+Client of the two player mode, connects to a server started with server.py.
+
+The client sends its keys every tick and draws what the server sends.
+Asteroids, bullets, items and the other ship are drawn a few ticks in the
+past, interpolated between two states from the server, so they move
+smoothly even if a packet is late. The own ship is predicted: the client
+moves it right away with the same ShipSprite.update the server uses and
+corrects it whenever a state from the server arrives, replaying the keys
+the server has not seen yet.
+
+Examples:
+python client.py
+python client.py --host 192.168.0.10 --port 50007
+"""
+
+import argparse
+import os
+import socket
+import time
+
+import arcade
+
+from asteroids import (SCALE, SCALE_ITEM, SCALE_VOTE, SCREEN_HEIGHT, SCREEN_TITLE, SCREEN_WIDTH,
+                       SHIP_REVERSE_THRUST, SHIP_THRUST, SHIP_TURN_SPEED, TICK_RATE, ShipSprite,
+                       respawn_alpha)
+from assets import assets
+from netcode import (HELD_DOWN, HELD_LEFT, HELD_RIGHT, HELD_UP, HELLO, HELLO_PACKET,
+                     HISTORY_TICKS, INPUT, INPUT_PACKET, KIND_ITEM, KIND_LASER, KIND_VOTE,
+                     NO_BASELINE, STATE, WELCOME, WELCOME_PACKET, decode_records,
+                     decode_state_header, dequantize)
+from server import DEFAULT_PORT
+
+# ticks the other entities are drawn behind the newest state
+INTERPOLATION_TICKS = 3
+
+# kind -> (texture, scale)
+KIND_TEXTURES = {
+    1: ("trump", SCALE),
+    2: ("twitter", SCALE * 1.5),
+    3: ("twitter", SCALE * 1.5),
+    4: ("fake", SCALE * 1.5),
+    KIND_LASER: ("laser", SCALE),
+    KIND_VOTE: ("vote", SCALE_VOTE),
+    KIND_ITEM: ("flag", SCALE_ITEM),
+}
+
+# arcade key -> held key bit
+HELD_BITS = {arcade.key.LEFT: HELD_LEFT, arcade.key.RIGHT: HELD_RIGHT,
+             arcade.key.UP: HELD_UP, arcade.key.DOWN: HELD_DOWN}
+
+
+def steer(ship, previous, held):
+    """
+    Steer a ship with the keys that went down or up from one INPUT to the
+    next, like the server does: it presses and releases them in the order
+    of server.HELD_KEYS through GameView.ship_key_press/release. So the
+    key pressed last wins, and releasing a key stops turning or thrust.
+    """
+    turn = SHIP_TURN_SPEED * ship.tick_time
+    pressed = held & ~previous
+    released = previous & ~held
+    for bit, name, value in ((HELD_LEFT, "change_angle", turn),
+                             (HELD_RIGHT, "change_angle", -turn),
+                             (HELD_UP, "thrust", SHIP_THRUST),
+                             (HELD_DOWN, "thrust", SHIP_REVERSE_THRUST)):
+        if pressed & bit:
+            setattr(ship, name, value)
+        elif released & bit:
+            setattr(ship, name, 0)
+
+
+class NetClient:
+    """ Connection of one player to the server, without any drawing. """
+
+    def __init__(self, host="localhost", port=DEFAULT_PORT):
+        self.address = (host, port)
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.setblocking(False)
+        self.player = None
+        self.seed = None
+        # of the server, WELCOME tells it
+        self.tick_rate = TICK_RATE
+
+        # tick -> complete entity state, id -> (kind, x, y, angle)
+        self.states = {}
+        # tick -> [state being built, parts received, number of parts]
+        self.partial = {}
+        self.latest_tick = None
+        # of the latest state
+        self.ships = []
+        self.score = 0
+        self.lives = 0
+        self.level = 1
+        self.game_over = False
+
+        # keys
+        self.input_seq = 0
+        self.held = 0
+        # held keys of the last INPUT
+        self.sent_held = 0
+        self.lasers = 0
+        self.votes = 0
+        # (input sequence, turning, thrust) of every INPUT the server has
+        # not confirmed yet, the steering of the own ship after it
+        self.pending_inputs = []
+        self.predicted_ship = None
+
+        # statistics for the benchmark
+        self.send_times = {}
+        self.round_trips = []
+        self.bytes_received = 0
+        self.packets_received = 0
+        # (tick, bytes of all its datagrams, number of asteroids)
+        self.tick_sizes = []
+        self.tick_bytes = {}
+
+    def connect(self, timeout=5.0):
+        """ Say hello until the server answers, returns the player number. """
+        end = time.perf_counter() + timeout
+        while time.perf_counter() < end:
+            self.socket.sendto(HELLO_PACKET.pack(HELLO, 0), self.address)
+            deadline = time.perf_counter() + 0.2
+            while time.perf_counter() < deadline:
+                self.receive()
+                if self.player is not None:
+                    self.predicted_ship = ShipSprite(assets.texture("ship"),
+                                                     assets.sprite_scale("ship", SCALE),
+                                                     1 / self.tick_rate)
+                    return self.player
+                time.sleep(0.005)
+        raise ConnectionError(f"no answer from the server at {self.address[0]}:{self.address[1]}")
+
+    def press(self, key):
+        """ A key of the player went down. """
+        if key in HELD_BITS:
+            self.held |= HELD_BITS[key]
+        elif key == arcade.key.A:
+            self.lasers = (self.lasers + 1) % 65536
+        elif key == arcade.key.D:
+            self.votes = (self.votes + 1) % 65536
+
+    def release(self, key):
+        """ A key of the player went up. """
+        if key in HELD_BITS:
+            self.held &= ~HELD_BITS[key]
+
+    def tick(self):
+        """ Send the keys of this tick and move the own ship ahead. """
+        self.input_seq += 1
+        ack = self.latest_tick if self.latest_tick is not None else NO_BASELINE
+        self.socket.sendto(INPUT_PACKET.pack(INPUT, self.player, self.input_seq, ack,
+                                             self.held, self.lasers, self.votes), self.address)
+        self.send_times[self.input_seq] = time.perf_counter()
+        ship = self.predicted_ship
+        if ship is not None:
+            steer(ship, self.sent_held, self.held)
+            self.pending_inputs.append((self.input_seq, ship.change_angle, ship.thrust))
+            ship.update()
+        self.sent_held = self.held
+
+    def receive(self):
+        """ Handle everything that arrived from the server. """
+        while True:
+            try:
+                data, address = self.socket.recvfrom(65536)
+            except BlockingIOError:
+                return
+            except ConnectionResetError:
+                # Windows: the server is not (yet) running
+                continue
+            self.bytes_received += len(data)
+            self.packets_received += 1
+            if data[0] == WELCOME:
+                (packet_type, self.player, tick, self.seed,
+                 self.tick_rate) = WELCOME_PACKET.unpack(data)
+            elif data[0] == STATE:
+                self.receive_state(data)
+
+    def receive_state(self, data):
+        header, ships, offset = decode_state_header(data)
+        (packet_type, tick, baseline, input_ack, score, lives, level, game_over,
+         part, parts, count) = header
+        if tick in self.states or (self.latest_tick is not None and tick <= self.latest_tick):
+            # late or repeated
+            return
+        self.tick_bytes[tick] = self.tick_bytes.get(tick, 0) + len(data)
+
+        partial = self.partial.get(tick)
+        if partial is None:
+            if baseline == NO_BASELINE:
+                base = {}
+            elif baseline in self.states:
+                base = self.states[baseline]
+            else:
+                # we don't have that baseline anymore, wait for the next state
+                return
+            partial = self.partial[tick] = [dict(base), set(), parts]
+        if part in partial[1]:
+            return
+        decode_records(data, offset, count, partial[0])
+        partial[1].add(part)
+        if len(partial[1]) < partial[2]:
+            return
+
+        # the state of this tick is complete
+        state = partial[0]
+        del self.partial[tick]
+        self.states[tick] = state
+        self.latest_tick = tick
+        for old_tick in [old for old in self.states if old <= tick - HISTORY_TICKS]:
+            del self.states[old_tick]
+        for old_tick in [old for old in self.partial if old < tick]:
+            del self.partial[old_tick]
+
+        self.ships = ships
+        self.score = score
+        self.lives = lives
+        self.level = level
+        self.game_over = game_over
+        asteroids = sum(1 for entity in state.values() if entity[0] < KIND_LASER)
+        self.tick_sizes.append((tick, self.tick_bytes.pop(tick), asteroids))
+
+        now = time.perf_counter()
+        for seq in [seq for seq in self.send_times if seq <= input_ack]:
+            self.round_trips.append(now - self.send_times.pop(seq))
+        self.reconcile(input_ack)
+
+    def reconcile(self, input_ack):
+        """ Put the own ship where the server has it and replay the newer keys. """
+        self.pending_inputs = [pending for pending in self.pending_inputs
+                               if pending[0] > input_ack]
+        ship = self.predicted_ship
+        if ship is None:
+            return
+        for player, x, y, angle, speed, respawning in self.ships:
+            if player == self.player:
+                steering = ship.change_angle, ship.thrust
+                ship.center_x, ship.center_y, ship.angle = x, y, angle
+                ship.speed = speed
+                ship.respawning = respawning
+                for seq, change_angle, thrust in self.pending_inputs:
+                    ship.change_angle, ship.thrust = change_angle, thrust
+                    ship.update()
+                ship.change_angle, ship.thrust = steering
+
+    def entities_at(self, render_tick):
+        """ All entities interpolated to a (fractional) tick: id -> (kind, x, y, angle). """
+        older = int(render_tick)
+        newer = older + 1
+        state_0 = self.states.get(older)
+        state_1 = self.states.get(newer)
+        if state_0 is None or state_1 is None:
+            # fall back to the newest state we have
+            return {entity_id: (kind, *dequantize(x, y, angle)) for entity_id, (kind, x, y, angle)
+                    in self.states.get(self.latest_tick, {}).items()}
+        blend = render_tick - older
+        entities = {}
+        for entity_id, (kind, x1, y1, angle1) in state_1.items():
+            old = state_0.get(entity_id)
+            if old is None or old[0] != kind:
+                entities[entity_id] = (kind, *dequantize(x1, y1, angle1))
+                continue
+            x0, y0, angle0 = old[1], old[2], old[3]
+            x, y, angle = dequantize(x1, y1, angle1)
+            # Don't slide across the screen when something wrapped around
+            if abs(x1 - x0) < SCREEN_WIDTH * 4 and abs(y1 - y0) < SCREEN_HEIGHT * 4:
+                x0, y0, angle0 = dequantize(x0, y0, angle0)
+                turn = (angle - angle0 + 180) % 360 - 180
+                x = x0 + (x - x0) * blend
+                y = y0 + (y - y0) * blend
+                angle = angle0 + turn * blend
+            entities[entity_id] = (kind, x, y, angle)
+        return entities
+
+    def close(self):
+        self.socket.close()
+
+
+class ClientView(arcade.View):
+    """ Draws the game the server runs and sends the keys to it. """
+
+    def __init__(self, client):
+        super().__init__()
+        self.client = client
+        self.tick_time = 1 / client.tick_rate
+        self.time_accumulator = 0.0
+        self.render_tick = None
+        # entity id -> sprite
+        self.sprites = {}
+        self.sprite_list = arcade.SpriteList()
+        self.ship_list = arcade.SpriteList()
+        self.ship_sprites = {}
+        self.status_text = arcade.Text("", 10, 50, arcade.color.BLACK, 13)
+        arcade.set_background_color(arcade.color.LIGHT_BLUE)
+
+    def on_update(self, delta_time):
+        client = self.client
+        client.receive()
+        self.time_accumulator += min(delta_time, 0.25)
+        while self.time_accumulator >= self.tick_time:
+            self.time_accumulator -= self.tick_time
+            client.tick()
+
+        if client.latest_tick is None:
+            return
+        # follow the server a few ticks behind, catch up if we fell behind
+        target = client.latest_tick - INTERPOLATION_TICKS
+        if self.render_tick is None or abs(self.render_tick - target) > INTERPOLATION_TICKS * 2:
+            self.render_tick = target
+        else:
+            self.render_tick = min(self.render_tick + delta_time * client.tick_rate,
+                                   client.latest_tick)
+
+    def sync_sprites(self):
+        """ Create, move and remove sprites to match the server state. """
+        entities = self.client.entities_at(self.render_tick)
+        for entity_id in [entity_id for entity_id in self.sprites if entity_id not in entities]:
+            self.sprites.pop(entity_id).remove_from_sprite_lists()
+        for entity_id, (kind, x, y, angle) in entities.items():
+            sprite = self.sprites.get(entity_id)
+            if sprite is not None and sprite.kind != kind:
+                self.sprites.pop(entity_id).remove_from_sprite_lists()
+                sprite = None
+            if sprite is None:
+                name, scale = KIND_TEXTURES[kind]
+                sprite = arcade.Sprite(texture=assets.texture(name),
+                                       scale=assets.sprite_scale(name, scale))
+                sprite.kind = kind
+                self.sprites[entity_id] = sprite
+                self.sprite_list.append(sprite)
+            sprite.center_x = x
+            sprite.center_y = y
+            sprite.angle = angle
+
+        client = self.client
+        for player, x, y, angle, speed, respawning in client.ships:
+            ship = self.ship_sprites.get(player)
+            if ship is None:
+                if player == client.player:
+                    ship = client.predicted_ship
+                else:
+                    ship = arcade.Sprite(texture=assets.texture("ship"),
+                                         scale=assets.sprite_scale("ship", SCALE))
+                    ship.color = arcade.color.LIGHT_GREEN
+                self.ship_sprites[player] = ship
+                self.ship_list.append(ship)
+            if player != client.player:
+                ship.center_x, ship.center_y, ship.angle = x, y, angle
+            ship.alpha = respawn_alpha(respawning, client.predicted_ship.respawn_ticks)
+
+    def on_draw(self):
+        arcade.start_render()
+        if self.render_tick is None:
+            return
+        self.sync_sprites()
+        self.sprite_list.draw()
+        self.ship_list.draw()
+        client = self.client
+        text = f"Player {client.player + 1}   Score: {client.score}   Lives: {client.lives}" \
+               f"   Level: {client.level}"
+        if client.game_over:
+            text += "   Game Over"
+        self.status_text.text = text
+        self.status_text.draw()
+
+    def on_key_press(self, symbol, modifiers):
+        self.client.press(symbol)
+
+    def on_key_release(self, symbol, modifiers):
+        self.client.release(symbol)
+
+
+def main():
+    """ Main method """
+    parser = argparse.ArgumentParser(description="Client of the Trump Smasher network game")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+
+    # The game loads its images relative to this folder
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    window = arcade.Window(SCREEN_WIDTH, SCREEN_HEIGHT, SCREEN_TITLE + " - Network")
+    assets.load(sounds=False)
+    client = NetClient(args.host, args.port)
+    client.connect()
+    window.show_view(ClientView(client))
+    arcade.run()
+    client.close()
+
+
+if __name__ == "__main__":
+    main()
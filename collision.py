@@ -0,0 +1,108 @@
+"""
+Broadphase for the collision checks in GameView.
+
+Instead of testing every bullet against every asteroid, the sprites that can
+be hit (asteroids and items) are put into a uniform grid once per tick.
+A query only looks at the cells the sprite overlaps and runs the exact
+polygon test of arcade on those candidates.
+"""
+
+import math
+
+import arcade
+
+# Roughly the size of a big asteroid, so most sprites cover 1 to 4 cells
+CELL_SIZE = 64
+
+
+class SpatialGrid:
+    """ Uniform grid (spatial hash) of sprites, split into named layers. """
+
+    def __init__(self, cell_size=CELL_SIZE):
+        self.cell_size = cell_size
+        # layer name -> {(cell_x, cell_y): [sprites]}
+        self.layers = {}
+        # sprite -> (layer name, list of cells it was put in)
+        self.sprite_cells = {}
+
+    def _cells_for(self, sprite):
+        """ List of all cells the bounding box of a sprite overlaps. """
+        # Half the diagonal of the texture bounds the hit box at any angle.
+        # sprite.left/right/... would work too, but they transform the whole
+        # hit box on every call.
+        radius = math.hypot(sprite.width, sprite.height) / 2
+        x, y = sprite.position
+
+        # Floor division keeps negative coordinates in their own cells, so
+        # sprites that just wrapped around or hang over the edge are found
+        size = self.cell_size
+        min_x = int((x - radius) // size)
+        max_x = int((x + radius) // size)
+        min_y = int((y - radius) // size)
+        max_y = int((y + radius) // size)
+        if min_x == max_x and min_y == max_y:
+            return [(min_x, min_y)]
+        return [(cell_x, cell_y)
+                for cell_x in range(min_x, max_x + 1)
+                for cell_y in range(min_y, max_y + 1)]
+
+    def rebuild(self, **layers):
+        """
+        Throw away the old grid and insert all sprites again.
+
+        Called once per tick after everything has moved (and wrapped around
+        the screen), e.g. rebuild(asteroids=asteroid_list, items=item_list).
+        """
+        self.layers = {}
+        self.sprite_cells = sprite_cells = {}
+        cells_for = self._cells_for
+        for layer, sprites in layers.items():
+            self.layers[layer] = grid = {}
+            for sprite in sprites:
+                cells = cells_for(sprite)
+                for cell in cells:
+                    bucket = grid.get(cell)
+                    if bucket is None:
+                        grid[cell] = [sprite]
+                    else:
+                        bucket.append(sprite)
+                sprite_cells[sprite] = (layer, cells)
+
+    def add(self, sprite, layer):
+        """ Put a single sprite into the grid, e.g. a new asteroid fragment. """
+        cells = self._cells_for(sprite)
+        grid = self.layers.setdefault(layer, {})
+        for cell in cells:
+            grid.setdefault(cell, []).append(sprite)
+        self.sprite_cells[sprite] = (layer, cells)
+
+    def remove(self, sprite):
+        """ Take a sprite out of the grid. Unknown sprites are ignored. """
+        entry = self.sprite_cells.pop(sprite, None)
+        if entry is None:
+            return
+        layer, cells = entry
+        grid = self.layers[layer]
+        for cell in cells:
+            grid[cell].remove(sprite)
+
+    def candidates(self, sprite, layer):
+        """ Sprites of a layer that share at least one cell with the sprite. """
+        grid = self.layers.get(layer)
+        if not grid:
+            return []
+
+        # A dict keeps the order stable (and the game deterministic),
+        # a set would not
+        found = {}
+        for cell in self._cells_for(sprite):
+            bucket = grid.get(cell)
+            if bucket:
+                for other in bucket:
+                    found[other] = None
+        return list(found)
+
+    def check_for_collision(self, sprite, layer):
+        """ Like arcade.check_for_collision_with_list, but only on candidates. """
+        return [other for other in self.candidates(sprite, layer)
+                if other is not sprite and arcade.check_for_collision(sprite, other)]
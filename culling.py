@@ -0,0 +1,122 @@
+"""
+Visibility culling for sprite lists.
+
+SpriteList.draw() sends every sprite of the list to the GPU, also the
+items waiting above the screen after Item.reset_pos, bullets that are
+leaving the screen and asteroids on the wrap boundary. draw_visible()
+only submits the sprites whose bounds intersect the viewport.
+
+A SpriteList already keeps the position and size of every sprite in
+packed arrays, one slot per sprite, and an index buffer with the slots
+in drawing order. Those arrays are the index the culler works on: the
+bounds of all slots are tested against the viewport at once (with NumPy
+if it is installed, in plain Python otherwise; NumPy is only imported on
+the first draw) and only the visible
+slots are written into the index buffer, in the order they had. So the
+layers of a LayeredSpriteList are drawn in the same order as before.
+
+Those arrays are internals of arcade 2.6. With any other version of
+arcade the culler draws the whole list with SpriteList.draw().
+
+Usage:
+    culler = ViewportCuller()
+    culler.draw_visible(sprite_list)
+    print(culler.drawn, culler.culled)  # of this frame so far
+    culler.end_frame()
+"""
+
+from array import array
+
+import arcade
+
+# arcade versions whose sprite list buffers the culler knows
+SUPPORTED = arcade.version.VERSION.startswith("2.6.")
+
+# numpy after the first draw, False if it is not installed
+_numpy_module = None
+
+
+def _numpy():
+    """ numpy, imported on the first call, None if it is not installed. """
+    global _numpy_module
+    if _numpy_module is None:
+        try:
+            import numpy
+        except ImportError:
+            numpy = False
+        _numpy_module = numpy
+    return _numpy_module or None
+
+
+class ViewportCuller:
+    """ Draws sprite lists without the sprites outside of the viewport. """
+
+    def __init__(self):
+        # sprites drawn and culled in the current frame
+        self.drawn = 0
+        self.culled = 0
+
+    def visible_slots(self, sprite_list, viewport):
+        """ Buffer slots of the sprites that intersect the viewport, in drawing order. """
+        left, right, bottom, top = viewport
+        count = sprite_list._sprite_index_slots
+        np = _numpy()
+        if np is not None:
+            slots = np.frombuffer(sprite_list._sprite_index_data, dtype=np.int32, count=count)
+            positions = np.frombuffer(sprite_list._sprite_pos_data, dtype=np.float32)
+            sizes = np.frombuffer(sprite_list._sprite_size_data, dtype=np.float32)
+            x = positions[slots * 2]
+            y = positions[slots * 2 + 1]
+            # half the diagonal bounds the sprite at any angle
+            radius = np.hypot(sizes[slots * 2], sizes[slots * 2 + 1]) / 2
+            visible = ((x + radius >= left) & (x - radius <= right) &
+                       (y + radius >= bottom) & (y - radius <= top))
+            return slots[visible]
+
+        slot_of = sprite_list.sprite_slot
+        slots = array("i")
+        for sprite in sprite_list:
+            x, y = sprite.position
+            radius = (sprite.width ** 2 + sprite.height ** 2) ** 0.5 / 2
+            if x + radius >= left and x - radius <= right and \
+                    y + radius >= bottom and y - radius <= top:
+                slots.append(slot_of[sprite])
+        return slots
+
+    def draw_visible(self, sprite_list, viewport=None):
+        """ Draw the sprites of a list that can be seen, viewport defaults to the window's. """
+        total = len(sprite_list)
+        if not total:
+            return
+        if not SUPPORTED:
+            self.drawn += total
+            sprite_list.draw()
+            return
+        if viewport is None:
+            viewport = arcade.get_viewport()
+        # bring all buffers up to date before the index buffer is replaced
+        sprite_list._init_deferred()
+        sprite_list._write_sprite_buffers_to_gpu()
+
+        slots = self.visible_slots(sprite_list, viewport)
+        visible = len(slots)
+        self.drawn += visible
+        self.culled += total - visible
+        if visible == total:
+            sprite_list.draw()
+            return
+        if visible:
+            index_slots = sprite_list._sprite_index_slots
+            sprite_list._sprite_index_buf.write(slots.tobytes())
+            sprite_list._sprite_index_slots = visible
+            try:
+                sprite_list.draw()
+            finally:
+                sprite_list._sprite_index_slots = index_slots
+        # the full index buffer has to be written again before the next draw
+        sprite_list._sprite_index_changed = True
+
+    def end_frame(self):
+        """ Start counting for the next frame. """
+        self.drawn = 0
+        self.culled = 0
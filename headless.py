@@ -0,0 +1,132 @@
+"""
+Run Trump Smasher without a window, without drawing and without audio.
+
+The whole simulation of GameView (ship, asteroids, bullets, items,
+splitting, lives and levels) is stepped as fast as the CPU allows.
+Input comes from a script file with one key event per line:
+
+    <tick> <press|release> <KEY>
+
+for example "120 press A" or "300 release UP". Key names are the ones
+from arcade.key. Lines starting with # are ignored.
+
+Example:
+python headless.py --ticks 10000 --script soak.txt --seed 42
+"""
+
+import argparse
+import os
+import time
+
+import arcade
+
+from asteroids import GameView
+from profiler import profiler
+
+
+def load_script(path):
+    """ Read a key script and return a dict of tick -> list of (action, key). """
+    script = {}
+    with open(path) as file:
+        for line_no, line in enumerate(file, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            parts = line.split()
+            if len(parts) != 3 or parts[1] not in ("press", "release"):
+                raise ValueError(f"{path}:{line_no}: expected '<tick> <press|release> <KEY>'")
+            key = getattr(arcade.key, parts[2].upper(), None)
+            if key is None:
+                raise ValueError(f"{path}:{line_no}: unknown key {parts[2]!r}")
+            script.setdefault(int(parts[0]), []).append((parts[1], key))
+    return script
+
+
+def feed_input(game_view, events):
+    """ Hand the key events of one tick to the game view. """
+    for action, key in events:
+        if action == "press":
+            game_view.on_key_press(key, 0)
+        else:
+            game_view.on_key_release(key, 0)
+
+
+def run_headless(ticks, script=None, seed=None, stop_at_end=True, numpy_motion=False,
+                 tick_rate=None):
+    """
+    Run the game for a number of ticks and return a dict with the results.
+
+    If stop_at_end is set the run ends early on game over or when level 3
+    is reached, just like the windowed game would switch views.
+    numpy_motion moves the sprites with the NumPy engine from motion.py.
+    tick_rate defaults to TICK_RATE, the script counts in ticks of it.
+    """
+    script = script or {}
+
+    game_view = GameView(headless=True, numpy_motion=numpy_motion, tick_rate=tick_rate)
+    game_view.start_new_game(seed)
+
+    tick = 0
+    start = time.perf_counter()
+    while tick < ticks:
+        events = script.get(tick)
+        if events:
+            feed_input(game_view, events)
+        game_view.tick()
+        tick += 1
+        if stop_at_end and (game_view.game_over or game_view.level == 3):
+            break
+    seconds = time.perf_counter() - start
+
+    return {
+        "ticks": tick,
+        "seconds": seconds,
+        "ticks_per_second": tick / seconds if seconds > 0 else 0.0,
+        "seed": game_view.seed,
+        "score": game_view.score,
+        "level": game_view.level,
+        "lives": game_view.lives,
+        "game_over": game_view.game_over,
+        "asteroids": len(game_view.asteroid_list),
+        "bullets": len(game_view.bullet_list),
+        "items": len(game_view.item_list),
+    }
+
+
+def main():
+    """ Main method """
+    parser = argparse.ArgumentParser(description="Run Trump Smasher headless")
+    parser.add_argument("--ticks", type=int, default=10000, help="number of ticks to simulate")
+    parser.add_argument("--script", help="key script to feed into the game")
+    parser.add_argument("--seed", type=int, help="seed of the game, random if not given")
+    parser.add_argument("--keep-going", action="store_true",
+                        help="do not stop on game over or when the game is won")
+    parser.add_argument("--numpy", action="store_true",
+                        help="move the sprites with the NumPy motion engine")
+    parser.add_argument("--profile", metavar="FILE",
+                        help="time every phase of every tick into a .csv or .json file")
+    parser.add_argument("--tick-rate", type=int, help="simulation ticks per second")
+    args = parser.parse_args()
+
+    script = load_script(args.script) if args.script else None
+    profile_path = os.path.abspath(args.profile) if args.profile else None
+
+    # The game loads its images relative to this folder
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    if profile_path:
+        profiler.start_session()
+    result = run_headless(args.ticks, script, args.seed, not args.keep_going, args.numpy,
+                          args.tick_rate)
+
+    if profile_path:
+        profiler.export(profile_path)
+
+    for name, value in result.items():
+        if isinstance(value, float):
+            value = f"{value:.2f}"
+        print(f"{name}: {value}")
+
+
+if __name__ == "__main__":
+    main()
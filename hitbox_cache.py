@@ -0,0 +1,110 @@
+"""
+Persistent cache for the hit boxes of the game textures.
+
+arcade calculates the hit box polygon of a texture from the alpha channel
+of its pixels. For the irregular images of the game (Trump, twitter, fake,
+vote, flag) this is repeated on every start. The cache stores every hit
+box in a JSON file, keyed by the hash of the image file, the hit box
+algorithm and its settings, so the pixels are only looked at again when
+the image or the settings change.
+
+A hit box can also be simplified down to a vertex budget. Fewer corners
+make every narrowphase check (arcade.check_for_collision) cheaper.
+
+Usage:
+    cache = HitBoxCache()
+    points = cache.get(path, "Simple", 4.5, vertex_budget=6)
+    if points is None:
+        points = simplify(texture.hit_box_points, 6)
+        cache.put(path, "Simple", 4.5, 6, points)
+    cache.save()
+"""
+
+import hashlib
+import json
+import os
+
+CACHE_FILE = ".cache/hit_boxes.json"
+# bump this when the way hit boxes are stored or simplified changes
+CACHE_VERSION = 1
+
+
+def triangle_area(a, b, c):
+    """ Area of the triangle a, b, c. """
+    return abs((b[0] - a[0]) * (c[1] - a[1]) - (c[0] - a[0]) * (b[1] - a[1])) / 2
+
+
+def simplify(points, vertex_budget):
+    """
+    Drop corners of a polygon until at most vertex_budget are left.
+
+    Every round removes the corner whose triangle with its two neighbours
+    has the smallest area, i.e. the one that changes the shape least
+    (Visvalingam-Whyatt). A convex polygon stays convex.
+    """
+    points = [tuple(point) for point in points]
+    vertex_budget = max(3, vertex_budget)
+    while len(points) > vertex_budget:
+        count = len(points)
+        smallest = min(range(count), key=lambda i: triangle_area(
+            points[i - 1], points[i], points[(i + 1) % count]))
+        del points[smallest]
+    return tuple(points)
+
+
+def file_hash(path):
+    """ sha1 of the content of a file. """
+    with open(path, "rb") as file:
+        return hashlib.sha1(file.read()).hexdigest()
+
+
+class HitBoxCache:
+    """ Hit boxes of image files, loaded from and saved to CACHE_FILE. """
+
+    def __init__(self, path=CACHE_FILE):
+        self.path = path
+        self.entries = {}
+        self.changed = False
+        # path -> hash, so every file is only hashed once per run
+        self.hashes = {}
+        if os.path.exists(path):
+            try:
+                with open(path) as file:
+                    data = json.load(file)
+                if data.get("version") == CACHE_VERSION:
+                    self.entries = data["hit_boxes"]
+            except (OSError, ValueError, KeyError):
+                # a broken cache is just built again
+                self.entries = {}
+
+    def key(self, image_path, algorithm, detail, vertex_budget):
+        if image_path not in self.hashes:
+            self.hashes[image_path] = file_hash(image_path)
+        return f"{self.hashes[image_path]}:{algorithm}:{detail}:{vertex_budget}"
+
+    def get(self, image_path, algorithm, detail, vertex_budget=None):
+        """ Cached hit box points of an image, None if there are none yet. """
+        points = self.entries.get(self.key(image_path, algorithm, detail, vertex_budget))
+        if points is None:
+            return None
+        return tuple(tuple(point) for point in points)
+
+    def put(self, image_path, algorithm, detail, vertex_budget, points):
+        """ Remember the hit box points of an image. """
+        key = self.key(image_path, algorithm, detail, vertex_budget)
+        self.entries[key] = [list(point) for point in points]
+        self.changed = True
+
+    def save(self):
+        """ Write the cache to disk if something new was added. """
+        if not self.changed:
+            return
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        # write to a temporary file first, so a crash never leaves half a cache
+        temporary = f"{self.path}.{os.getpid()}.tmp"
+        with open(temporary, "w") as file:
+            json.dump({"version": CACHE_VERSION, "hit_boxes": self.entries}, file)
+        os.replace(temporary, self.path)
+        self.changed = False
@@ -0,0 +1,46 @@
+"""
+Head-up display of the game: score, asteroid count and level.
+
+arcade.draw_text lays out its text again on every call. The HUD keeps one
+pyglet label per line instead and only changes its text when the value
+behind it changed. All labels live in one pyglet batch, so the whole text
+of the HUD is drawn with a single call.
+"""
+
+import arcade
+import pyglet
+
+# Same look as arcade.draw_text(output, 10, y, arcade.color.BLACK, 13)
+HUD_FONT = ("calibri", "arial")
+HUD_FONT_SIZE = 13
+HUD_COLOR = arcade.color.BLACK + (255,)
+
+
+class Hud:
+    """ Prebuilt text of the HUD that is only rebuilt when a value changes. """
+
+    def __init__(self):
+        self.batch = pyglet.graphics.Batch()
+        # name -> [label, format, last value]
+        self.lines = {}
+        self.add_line("score", "Score: {}", 10, 110)
+        self.add_line("asteroids", "Asteroid Count: {}", 10, 80)
+        self.add_line("level", "Level: {}", 10, 50)
+
+    def add_line(self, name, text_format, x, y):
+        label = pyglet.text.Label("", x=x, y=y, font_name=HUD_FONT, font_size=HUD_FONT_SIZE,
+                                  color=HUD_COLOR, batch=self.batch)
+        self.lines[name] = [label, text_format, None]
+
+    def set(self, name, value):
+        """ Show a new value, the label is only laid out again if it changed. """
+        line = self.lines[name]
+        if line[2] != value:
+            line[2] = value
+            line[0].text = line[1].format(value)
+
+    def draw(self):
+        """ Draw all text of the HUD. """
+        # raw pyglet drawing needs this inside arcade
+        with arcade.get_window().ctx.pyglet_rendering():
+            self.batch.draw()
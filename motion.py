@@ -0,0 +1,208 @@
+"""
+Optional NumPy motion engine for asteroids, bullets and items.
+
+Without it every sprite is moved by its own update() method through
+SpriteList.update(). The engine instead keeps positions, velocities, angles
+and sizes of all of them in contiguous NumPy arrays and moves each group
+with a few vectorized operations per tick. The sprites only get the new
+positions written back afterwards (for collisions and drawing).
+
+NumPy is not needed to play the game, only to use this engine:
+GameView(numpy_motion=True) or "python headless.py --numpy". It is
+imported when the first engine is made, not with this module.
+"""
+
+# numpy, once the first MotionEngine imported it
+np = None
+
+# Start size of the arrays of a group, they grow when needed
+START_CAPACITY = 256
+
+
+class MotionGroup:
+    """ Structure of arrays for all sprites of one kind. """
+
+    def __init__(self, capacity=START_CAPACITY):
+        self.count = 0
+        self.sprites = []
+        self.index = {}
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.change_x = np.zeros(capacity)
+        self.change_y = np.zeros(capacity)
+        self.angle = np.zeros(capacity)
+        self.change_angle = np.zeros(capacity)
+        # asteroids: their size (4 to 1), bullets: max(width, height),
+        # items: distance from center to top
+        self.size = np.zeros(capacity)
+
+    def _grow(self):
+        capacity = len(self.x) * 2
+        for name in ("x", "y", "change_x", "change_y", "angle", "change_angle", "size"):
+            old = getattr(self, name)
+            new = np.zeros(capacity)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def add(self, sprite, size):
+        """ Copy the state of a sprite into the arrays. """
+        if self.count == len(self.x):
+            self._grow()
+        i = self.count
+        self.x[i], self.y[i] = sprite.position
+        self.change_x[i] = sprite.change_x
+        self.change_y[i] = sprite.change_y
+        self.angle[i] = sprite.angle
+        self.change_angle[i] = sprite.change_angle
+        self.size[i] = size
+        self.sprites.append(sprite)
+        self.index[sprite] = i
+        self.count += 1
+
+    def load(self, sprite):
+        """ Copy the state of a sprite that is already in the group into its slot again. """
+        i = self.index[sprite]
+        self.x[i], self.y[i] = sprite.position
+        self.change_x[i] = sprite.change_x
+        self.change_y[i] = sprite.change_y
+        self.angle[i] = sprite.angle
+        self.change_angle[i] = sprite.change_angle
+
+    def remove(self, sprite):
+        """ Remove a sprite by moving the last one into its slot. """
+        i = self.index.pop(sprite)
+        last = self.count - 1
+        if i != last:
+            for array in (self.x, self.y, self.change_x, self.change_y,
+                          self.angle, self.change_angle, self.size):
+                array[i] = array[last]
+            moved = self.sprites[last]
+            self.sprites[i] = moved
+            self.index[moved] = i
+        self.sprites.pop()
+        self.count = last
+
+    def sync(self, angles=True):
+        """ Write positions (and angles) back to the sprites. """
+        n = self.count
+        xs = self.x[:n].tolist()
+        ys = self.y[:n].tolist()
+        if angles:
+            for sprite, x, y, angle in zip(self.sprites, xs, ys, self.angle[:n].tolist()):
+                sprite.position = (x, y)
+                sprite.angle = angle
+        else:
+            for sprite, x, y in zip(self.sprites, xs, ys):
+                sprite.position = (x, y)
+
+
+class MotionEngine:
+    """ Moves asteroids, bullets and items of a GameView in one step per group. """
+
+    def __init__(self, screen_size, limits):
+        """
+        screen_size is (width, height) for culling bullets,
+        limits is (left, right, bottom, top) for wrapping asteroids.
+        """
+        global np
+        if np is None:
+            try:
+                import numpy
+            except ImportError:
+                raise ImportError("The NumPy motion engine needs numpy: pip install numpy") from None
+            np = numpy
+        self.screen_width, self.screen_height = screen_size
+        self.left_limit, self.right_limit, self.bottom_limit, self.top_limit = limits
+        self.groups = {
+            "asteroids": MotionGroup(),
+            "bullets": MotionGroup(),
+            "items": MotionGroup(),
+        }
+        self.sprite_group = {}
+
+    def add(self, sprite, kind):
+        """ Let the engine move this sprite from now on. """
+        if kind == "bullets":
+            size = max(sprite.width, sprite.height)
+        elif kind == "items":
+            size = sprite.top - sprite.center_y
+        else:
+            size = sprite.size
+        self.groups[kind].add(sprite, size)
+        self.sprite_group[sprite] = kind
+
+    def refresh(self, sprite):
+        """ Take over the position and velocity that were set on a sprite from outside. """
+        self.groups[self.sprite_group[sprite]].load(sprite)
+
+    def remove(self, sprite):
+        """ Stop moving this sprite. Unknown sprites are ignored. """
+        kind = self.sprite_group.pop(sprite, None)
+        if kind is not None:
+            self.groups[kind].remove(sprite)
+
+    def step_asteroids(self, focus=None, radius=0):
+        """
+        Same as AsteroidSprite.update for every asteroid.
+
+        With focus, a list of (x, y) points, fragments farther than radius
+        from all of them don't turn.
+        """
+        group = self.groups["asteroids"]
+        n = group.count
+        x, y = group.x[:n], group.y[:n]
+        if focus:
+            turning = group.size[:n] == 4
+            for focus_x, focus_y in focus:
+                turning |= (x - focus_x) ** 2 + (y - focus_y) ** 2 <= radius * radius
+            group.angle[:n] += np.where(turning, group.change_angle[:n], 0)
+        else:
+            group.angle[:n] += group.change_angle[:n]
+        x += group.change_x[:n]
+        y += group.change_y[:n]
+
+        # Wrap around the screen, the same order as in AsteroidSprite.update
+        x[x < self.left_limit] = self.right_limit
+        x[x > self.right_limit] = self.left_limit
+        y[y > self.top_limit] = self.bottom_limit
+        y[y < self.bottom_limit] = self.top_limit
+
+    def step_bullets(self):
+        """
+        Same as TurningSprite.update for every bullet.
+
+        Returns the bullets that left the screen, the caller removes them.
+        """
+        group = self.groups["bullets"]
+        n = group.count
+        x, y = group.x[:n], group.y[:n]
+        change_x, change_y = group.change_x[:n], group.change_y[:n]
+        x += change_x
+        y += change_y
+        group.angle[:n] = np.degrees(np.arctan2(change_y, change_x))
+
+        size = group.size[:n]
+        gone = ((x < -size) | (x > self.screen_width + size) |
+                (y < -size) | (y > self.screen_height + size))
+        return [group.sprites[i] for i in np.flatnonzero(gone).tolist()]
+
+    def step_items(self):
+        """ Same as Item.update for every item, including Item.reset_pos. """
+        group = self.groups["items"]
+        n = group.count
+        y = group.y[:n]
+        y += group.change_y[:n]
+
+        fallen = np.flatnonzero(y + group.size[:n] < 0).tolist()
+        for i in fallen:
+            sprite = group.sprites[i]
+            sprite.reset_pos()
+            group.x[i], group.y[i] = sprite.position
+
+    def sync(self):
+        """ Write the new state of all groups back to their sprites. """
+        self.groups["asteroids"].sync()
+        self.groups["bullets"].sync()
+        # items never turn
+        self.groups["items"].sync(angles=False)
+
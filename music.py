@@ -0,0 +1,59 @@
+"""
+Background music of Trump Smasher.
+
+The tracks are streamed: pyglet decodes them piece by piece from disk
+while they play, instead of decoding the whole mp3 into memory first.
+There is one music player for the whole program. It keeps playing when
+the view changes, so starting a new game neither reloads nor restarts
+the music. The tracks are played one after the other in a loop.
+
+Usage:
+    from music import music
+    music.play()
+"""
+
+import arcade
+
+MUSIC_TRACKS = ["Sound/Trump.mp3", "Sound/1918.mp3"]
+MUSIC_VOLUME = 0.05
+
+
+class MusicPlayer:
+    """ Streams the music tracks one after the other, one instance for all games. """
+
+    def __init__(self, tracks=MUSIC_TRACKS, volume=MUSIC_VOLUME):
+        self.tracks = list(tracks)
+        self.volume = volume
+        self.track_index = 0
+        self.sound = None
+        self.player = None
+
+    def play(self):
+        """ Start the music, does nothing if it is already playing. """
+        if self.player is None:
+            self.play_track(self.track_index)
+
+    def play_track(self, index):
+        # A streaming source can only be played once, so every track gets
+        # a fresh one. Only a small buffer of it is decoded at a time.
+        self.track_index = index % len(self.tracks)
+        self.sound = arcade.load_sound(self.tracks[self.track_index], streaming=True)
+        self.player = self.sound.play(self.volume)
+        self.player.push_handlers(on_player_eos=self.next_track)
+
+    def next_track(self):
+        """ Called by pyglet at the end of a track, continues with the next one. """
+        self.player.pop_handlers()
+        self.player.delete()
+        self.play_track(self.track_index + 1)
+
+    def stop(self):
+        """ Stop the music, play() starts the current track again. """
+        if self.player is not None:
+            self.sound.stop(self.player)
+            self.player = None
+            self.sound = None
+
+
+# The one music player the whole game uses
+music = MusicPlayer()
@@ -0,0 +1,123 @@
+"""
+Measures the network traffic of the two player mode on this computer.
+
+Starts server.py in endless mode, once with delta compression and once
+without, connects two bots that fly around and fire all the time and
+reports the bytes each client receives per tick (by number of asteroids)
+and the round trip times of the inputs.
+
+Example:
+python net_benchmark.py --ticks 1200 --asteroids 8 --output net.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import arcade
+
+from client import NetClient
+from profiler import percentile
+from server import DEFAULT_PORT
+from asteroids import TICK_RATE
+
+# asteroid counts are put together in buckets of this size
+BUCKET_SIZE = 10
+
+
+def bot_keys(client, tick):
+    """ Turn, fly and fire in a pattern that differs a bit between the bots. """
+    if tick % 120 == 0:
+        client.release(arcade.key.LEFT if client.player % 2 else arcade.key.RIGHT)
+        client.press(arcade.key.RIGHT if client.player % 2 else arcade.key.LEFT)
+        client.press(arcade.key.UP)
+    elif tick % 120 == 40:
+        client.release(arcade.key.UP)
+    if tick % 6 == 0:
+        client.press(arcade.key.A if tick % 24 else arcade.key.D)
+
+
+def run(ticks, asteroids, delta, port):
+    """ One run of the server and two bots, returns the statistics. """
+    command = [sys.executable, "server.py", "--port", str(port), "--endless",
+               "--seed", "1", "--ticks", str(ticks + TICK_RATE * 5)]
+    if asteroids:
+        command += ["--asteroids", str(asteroids)]
+    if not delta:
+        command.append("--no-delta")
+    server = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+    clients = [NetClient("127.0.0.1", port) for i in range(2)]
+    try:
+        for client in clients:
+            client.connect()
+        tick_time = 1 / TICK_RATE
+        next_tick = time.perf_counter()
+        for tick in range(ticks):
+            for client in clients:
+                client.receive()
+                bot_keys(client, tick)
+                client.tick()
+            next_tick += tick_time
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        time.sleep(0.1)
+        for client in clients:
+            client.receive()
+    finally:
+        for client in clients:
+            client.close()
+        server.terminate()
+        server.wait()
+
+    buckets = {}
+    for client in clients:
+        for tick, size, asteroid_count in client.tick_sizes:
+            bucket = asteroid_count // BUCKET_SIZE * BUCKET_SIZE
+            buckets.setdefault(bucket, []).append(size)
+    round_trips = [seconds * 1000 for client in clients for seconds in client.round_trips]
+    states = sum(len(client.tick_sizes) for client in clients)
+    total_bytes = sum(client.bytes_received for client in clients)
+    return {
+        "delta": delta,
+        "states_received": states,
+        "bytes_per_tick": total_bytes / states if states else 0.0,
+        "bytes_per_tick_by_asteroids": {
+            f"{bucket}-{bucket + BUCKET_SIZE - 1}": {
+                "states": len(sizes),
+                "mean": statistics.mean(sizes),
+                "max": max(sizes),
+            } for bucket, sizes in sorted(buckets.items())
+        },
+        "rtt_ms_p50": percentile(round_trips, 50),
+        "rtt_ms_p99": percentile(round_trips, 99),
+    }
+
+
+def main():
+    """ Main method """
+    parser = argparse.ArgumentParser(description="Measure the traffic of the network game")
+    parser.add_argument("--ticks", type=int, default=1200, help="ticks per run")
+    parser.add_argument("--asteroids", type=int, default=8, help="big asteroids at the start")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--output", help="write the results to this .json file")
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output) if args.output else None
+    # The game loads its images relative to this folder
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    results = [run(args.ticks, args.asteroids, delta, args.port) for delta in (True, False)]
+    text = json.dumps(results, indent=2)
+    if output:
+        with open(output, "w") as file:
+            file.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Network protocol of the two player mode (see server.py and client.py).
+
+Everything goes over UDP. The packets of a client:
+
+    HELLO   join the game, answered with WELCOME (player number, tick and tick rate)
+    INPUT   the held keys and how often each weapon was fired so far,
+            sent every tick. Packets may get lost, the counters make sure
+            no shot is lost with them. It also confirms the newest state
+            the client has received completely.
+
+The server sends a STATE packet to every client after every tick. The
+asteroids, bullets and items in it are quantized (positions in 1/8
+pixels, angles in 256 steps) and delta compressed: only entities that
+appeared, disappeared or changed since the last state the client
+confirmed (its "baseline") are sent, small moves as one byte per axis.
+Without a confirmed baseline the full state is sent. A state that does
+not fit into one datagram is split into parts. The ships are always sent
+in full precision, the client predicts its own ship from them.
+"""
+
+import struct
+
+HELLO, WELCOME, INPUT, STATE = 1, 2, 3, 4
+NO_BASELINE = 0xFFFFFFFF
+# datagrams stay below the usual MTU, larger states are split into parts
+MAX_PACKET = 1200
+# ticks of old states the server and the clients keep for delta compression
+HISTORY_TICKS = 64
+
+# type, player
+HELLO_PACKET = struct.Struct("<BB")
+# type, player, server tick, seed, ticks per second
+WELCOME_PACKET = struct.Struct("<BBIqH")
+# type, player, input sequence, newest complete state tick, held keys,
+# lasers fired, votes fired
+INPUT_PACKET = struct.Struct("<BBIIBHH")
+# type, tick, baseline, acknowledged input sequence, score, lives, level,
+# game over, part, parts, number of entity records
+STATE_HEADER = struct.Struct("<BIIIiiB?BBH")
+# ship count, then per ship: player, x, y, angle, speed, respawning
+SHIP_COUNT = struct.Struct("<B")
+SHIP_RECORD = struct.Struct("<BffffH")
+
+# bits of the held keys in an INPUT packet
+HELD_LEFT, HELD_RIGHT, HELD_UP, HELD_DOWN = 1, 2, 4, 8
+
+# entity kinds
+KIND_ASTEROID = {4: 1, 3: 2, 2: 3, 1: 4}
+KIND_LASER, KIND_VOTE, KIND_ITEM = 5, 6, 7
+
+# flags of an entity record, followed by the fields they announce
+NEW = 0x01          # kind, x, y, angle
+REMOVED = 0x02      # nothing
+MOVED_SMALL = 0x04  # dx, dy as signed bytes
+MOVED = 0x08        # x, y
+TURNED = 0x10       # angle
+
+RECORD_HEAD = struct.Struct("<HB")
+NEW_FIELDS = struct.Struct("<BhhB")
+SMALL_MOVE = struct.Struct("<bb")
+POSITION = struct.Struct("<hh")
+ANGLE = struct.Struct("<B")
+
+POSITION_STEPS = 8
+
+
+def quantize(x, y, angle):
+    """ Position in 1/8 pixels and angle in 256 steps. """
+    return (max(-32768, min(32767, round(x * POSITION_STEPS))),
+            max(-32768, min(32767, round(y * POSITION_STEPS))),
+            round(angle * 256 / 360) % 256)
+
+
+def dequantize(qx, qy, qa):
+    return qx / POSITION_STEPS, qy / POSITION_STEPS, qa * 360 / 256
+
+
+def encode_records(state, baseline):
+    """
+    Entity records that turn baseline into state, both dicts of
+    id -> (kind, x, y, angle). Without baseline everything is new.
+    """
+    records = []
+    if baseline is None:
+        baseline = {}
+    for entity_id, (kind, x, y, angle) in state.items():
+        old = baseline.get(entity_id)
+        if old is None or old[0] != kind:
+            records.append(RECORD_HEAD.pack(entity_id, NEW) + NEW_FIELDS.pack(kind, x, y, angle))
+            continue
+        if old == (kind, x, y, angle):
+            continue
+        flags = 0
+        fields = b""
+        dx = x - old[1]
+        dy = y - old[2]
+        if dx or dy:
+            if -128 <= dx <= 127 and -128 <= dy <= 127:
+                flags |= MOVED_SMALL
+                fields += SMALL_MOVE.pack(dx, dy)
+            else:
+                flags |= MOVED
+                fields += POSITION.pack(x, y)
+        if angle != old[3]:
+            flags |= TURNED
+            fields += ANGLE.pack(angle)
+        records.append(RECORD_HEAD.pack(entity_id, flags) + fields)
+    for entity_id in baseline:
+        if entity_id not in state:
+            records.append(RECORD_HEAD.pack(entity_id, REMOVED))
+    return records
+
+
+def decode_records(data, offset, count, state):
+    """ Apply count records from data to state (changed in place), returns the new offset. """
+    for i in range(count):
+        entity_id, flags = RECORD_HEAD.unpack_from(data, offset)
+        offset += RECORD_HEAD.size
+        if flags & REMOVED:
+            state.pop(entity_id, None)
+            continue
+        if flags & NEW:
+            state[entity_id] = NEW_FIELDS.unpack_from(data, offset)
+            offset += NEW_FIELDS.size
+            continue
+        kind, x, y, angle = state[entity_id]
+        if flags & MOVED_SMALL:
+            dx, dy = SMALL_MOVE.unpack_from(data, offset)
+            offset += SMALL_MOVE.size
+            x += dx
+            y += dy
+        if flags & MOVED:
+            x, y = POSITION.unpack_from(data, offset)
+            offset += POSITION.size
+        if flags & TURNED:
+            angle, = ANGLE.unpack_from(data, offset)
+            offset += ANGLE.size
+        state[entity_id] = (kind, x, y, angle)
+    return offset
+
+
+def encode_state(header_values, ships, records):
+    """
+    Datagrams of one STATE. header_values are the fields of STATE_HEADER
+    after the type, without part, parts and record count.
+    """
+    ship_bytes = SHIP_COUNT.pack(len(ships)) + b"".join(SHIP_RECORD.pack(*ship) for ship in ships)
+    room = MAX_PACKET - STATE_HEADER.size - len(ship_bytes)
+    parts = [[]]
+    size = 0
+    for record in records:
+        if size + len(record) > room and parts[-1]:
+            parts.append([])
+            size = 0
+        parts[-1].append(record)
+        size += len(record)
+    packets = []
+    for part, part_records in enumerate(parts):
+        packets.append(STATE_HEADER.pack(STATE, *header_values, part, len(parts),
+                                         len(part_records))
+                       + ship_bytes + b"".join(part_records))
+    return packets
+
+
+def decode_state_header(data):
+    """ Header fields and ships of a STATE datagram, plus where the records start. """
+    header = STATE_HEADER.unpack_from(data)
+    offset = STATE_HEADER.size
+    ship_count, = SHIP_COUNT.unpack_from(data, offset)
+    offset += SHIP_COUNT.size
+    ships = []
+    for i in range(ship_count):
+        ships.append(SHIP_RECORD.unpack_from(data, offset))
+        offset += SHIP_RECORD.size
+    return header, ships, offset
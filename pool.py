@@ -0,0 +1,68 @@
+"""
+Object pools for sprites that are created and thrown away all the time
+(bullets and asteroid fragments).
+
+A pool is filled up front. acquire() hands out a sprite that looks like a
+fresh one, release() takes it out of all sprite lists and keeps it for the
+next acquire(), so rapid fire does not create garbage for every shot.
+"""
+
+# How many sprites every pool creates up front
+BULLET_POOL_CAPACITY = 50
+FRAGMENT_POOL_CAPACITY = 30
+
+
+class SpritePool:
+    """ Pool of sprites that are all built by the same factory function. """
+
+    def __init__(self, factory, capacity=0):
+        self.factory = factory
+        self.free = []
+        self.prewarm(capacity)
+
+    def _create(self):
+        sprite = self.factory()
+        sprite.pool = self
+        sprite.in_pool = False
+        return sprite
+
+    def prewarm(self, capacity):
+        """ Fill the pool until it holds at least capacity free sprites. """
+        while len(self.free) < capacity:
+            sprite = self._create()
+            sprite.in_pool = True
+            self.free.append(sprite)
+
+    def acquire(self):
+        """ Get a sprite with position, velocity, angle and alpha reset. """
+        if self.free:
+            sprite = self.free.pop()
+        else:
+            sprite = self._create()
+        sprite.in_pool = False
+
+        sprite.center_x = 0
+        sprite.center_y = 0
+        sprite.change_x = 0
+        sprite.change_y = 0
+        sprite.angle = 0
+        sprite.change_angle = 0
+        sprite.alpha = 255
+        return sprite
+
+    def release(self, sprite):
+        """ Remove the sprite from its lists and give it back to the pool. """
+        sprite.remove_from_sprite_lists()
+        # Releasing twice must not put the sprite into the free list twice
+        if not sprite.in_pool:
+            sprite.in_pool = True
+            self.free.append(sprite)
+
+
+def release(sprite):
+    """ Give a sprite back to its pool, or just remove it if it has none. """
+    pool = getattr(sprite, "pool", None)
+    if pool is None:
+        sprite.remove_from_sprite_lists()
+    else:
+        pool.release(sprite)
@@ -0,0 +1,156 @@
+"""
+Frame-time profiler for Trump Smasher.
+
+GameView times every phase of a tick (item update, collisions, splitting,
+...) and every draw call of a frame with profiler.phase("name"). When a
+frame is finished, the profiler stores one row with the frame time, all
+phase times and the number of entities. The last rows can be shown live in
+an overlay (F3 in the game). Only a session started with start_session()
+keeps every row, to write them to a CSV or JSON file at the end.
+
+Phases may be nested, e.g. "split_asteroid" runs inside
+"bullet_collisions", so the phase times don't have to add up.
+"""
+
+import csv
+import json
+import time
+from collections import deque
+
+# Frames the overlay looks at for its statistics
+OVERLAY_FRAMES = 300
+
+
+def percentile(values, percent):
+    """ Value below which the given percent of the values lie. """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(len(ordered) * percent / 100))
+    return ordered[index]
+
+
+class _Phase:
+    """ Context manager that adds the time of its block to a phase. """
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        phases = self.profiler.current
+        phases[self.name] = phases.get(self.name, 0.0) + time.perf_counter() - self.start
+
+
+class _NoPhase:
+    """ Does nothing, used while the profiler is switched off. """
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+_NO_PHASE = _NoPhase()
+
+
+class FrameProfiler:
+    """ Collects phase times per frame for one session. """
+
+    def __init__(self):
+        self.enabled = False
+        # True while every frame is kept for export()
+        self.session = False
+        # phase name -> seconds, for the frame that is running
+        self.current = {}
+        # one dict per finished frame of the session
+        self.frames = []
+        self.recent = deque(maxlen=OVERLAY_FRAMES)
+        self.last_frame_end = None
+
+    def start_session(self):
+        """ Profile from now on and keep every frame for export(). """
+        self.session = True
+        self.enabled = True
+
+    def show_overlay(self, shown):
+        """ The overlay needs numbers: profile while it is shown or a session runs. """
+        self.enabled = shown or self.session
+        if not self.enabled:
+            # the next frame time would include all the time switched off
+            self.last_frame_end = None
+            self.current = {}
+
+    def phase(self, name):
+        """ with profiler.phase("name"): ... times the block. """
+        if not self.enabled:
+            return _NO_PHASE
+        return _Phase(self, name)
+
+    def end_frame(self, **counts):
+        """
+        Finish the current frame. counts are the entity counts to store,
+        e.g. end_frame(asteroids=12, bullets=3).
+        """
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self.last_frame_end is not None:
+            row = {"frame_ms": (now - self.last_frame_end) * 1000}
+            for name, seconds in self.current.items():
+                row[name + "_ms"] = seconds * 1000
+            row.update(counts)
+            if self.session:
+                self.frames.append(row)
+            self.recent.append(row)
+        self.last_frame_end = now
+        self.current = {}
+
+    def summary(self, frames=None):
+        """ p50 and p99 of the frame time and every phase, in milliseconds. """
+        frames = self.recent if frames is None else frames
+        columns = {}
+        for row in frames:
+            for name, value in row.items():
+                if name.endswith("_ms"):
+                    columns.setdefault(name, []).append(value)
+        return {name[:-3]: (percentile(values, 50), percentile(values, 99))
+                for name, values in columns.items()}
+
+    def overlay_lines(self):
+        """ Text lines for the on-screen overlay. """
+        lines = []
+        for name, (p50, p99) in self.summary().items():
+            lines.append(f"{name}: p50 {p50:.2f} ms  p99 {p99:.2f} ms")
+        if self.recent:
+            counts = [f"{name} {value}" for name, value in self.recent[-1].items()
+                      if not name.endswith("_ms")]
+            lines.append("counts: " + ", ".join(counts))
+        return lines
+
+    def export(self, path):
+        """ Write all frames of the session, as JSON if path ends with .json, else CSV. """
+        if path.endswith(".json"):
+            with open(path, "w") as file:
+                json.dump({"frames": self.frames, "summary": self.summary(self.frames)},
+                          file, indent=1)
+            return
+
+        columns = []
+        for row in self.frames:
+            for name in row:
+                if name not in columns:
+                    columns.append(name)
+        with open(path, "w", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=columns)
+            writer.writeheader()
+            writer.writerows(self.frames)
+
+
+# The one profiler the whole game uses
+profiler = FrameProfiler()
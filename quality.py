@@ -0,0 +1,99 @@
+"""
+Adaptive quality for the windowed game.
+
+A split cascade or heavy fire can push the work of a frame (on_update
+plus on_draw) over the time one frame may take, and the game slows down.
+The governor adds up that work for every frame and looks at the mean of
+every WINDOW_FRAMES frames:
+
+    - above DOWN_THRESHOLD of the budget it steps the quality down one level
+    - below UP_THRESHOLD for UP_WINDOWS windows in a row it steps back up
+
+The gap between the two thresholds and the extra windows before stepping
+up keep it from jumping back and forth. What every level saves:
+
+    1  items are drawn at their tick positions, without interpolation
+    2  fragments far away from every ship stop turning
+    3  small fragments above MAX_SMALL_FRAGMENTS are merged into their
+       nearest neighbour
+
+Usage:
+    governor = QualityGovernor()
+    governor.add_work(seconds)   # from on_update and on_draw
+    governor.end_frame()         # after drawing
+    if governor.level >= STILL_FRAGMENTS: ...
+"""
+
+TARGET_FRAME_TIME = 1 / 60
+# frames the governor averages before it decides anything
+WINDOW_FRAMES = 30
+# share of the budget the mean work of a window has to pass
+DOWN_THRESHOLD = 0.9
+UP_THRESHOLD = 0.5
+# windows in a row with headroom before the quality goes up again
+UP_WINDOWS = 4
+
+# the level at which each saving starts
+PLAIN_ITEMS = 1
+STILL_FRAGMENTS = 2
+MERGE_FRAGMENTS = 3
+MAX_LEVEL = MERGE_FRAGMENTS
+
+# fragments closer than this to a ship keep turning
+FOCUS_RADIUS = 300
+# size 1 fragments allowed at the lowest quality
+MAX_SMALL_FRAGMENTS = 24
+
+
+class QualityGovernor:
+    """ Steps the quality level down and up to keep the frame time in budget. """
+
+    def __init__(self, target_frame_time=TARGET_FRAME_TIME):
+        self.budget = target_frame_time
+        # 0 is full quality, MAX_LEVEL the lowest
+        self.level = 0
+        # seconds of work of the frame that is running
+        self.work = 0.0
+        self.window_work = 0.0
+        self.window_frames = 0
+        self.headroom_windows = 0
+        # how often the level went down and up, for the stats
+        self.steps_down = 0
+        self.steps_up = 0
+
+    def add_work(self, seconds):
+        """ Count time spent on the current frame. """
+        self.work += seconds
+
+    def end_frame(self):
+        """ Finish a frame, returns True if the level changed. """
+        self.window_work += self.work
+        self.window_frames += 1
+        self.work = 0.0
+        if self.window_frames < WINDOW_FRAMES:
+            return False
+
+        mean = self.window_work / self.window_frames
+        self.window_work = 0.0
+        self.window_frames = 0
+        if mean > self.budget * DOWN_THRESHOLD:
+            self.headroom_windows = 0
+            if self.level < MAX_LEVEL:
+                self.level += 1
+                self.steps_down += 1
+                return True
+        elif mean < self.budget * UP_THRESHOLD:
+            self.headroom_windows += 1
+            if self.headroom_windows >= UP_WINDOWS and self.level > 0:
+                self.headroom_windows = 0
+                self.level -= 1
+                self.steps_up += 1
+                return True
+        else:
+            self.headroom_windows = 0
+        return False
+
+    def stats_line(self):
+        """ Text for the performance overlay. """
+        return (f"quality: level {self.level}/{MAX_LEVEL}  "
+                f"(down {self.steps_down}, up {self.steps_up})")
@@ -0,0 +1,63 @@
+"""
+Records a game session so it can be replayed tick for tick.
+
+A replay file is a key script for headless.py with a small header:
+
+    # Trump Smasher replay
+    # seed 1234567
+    # tick_rate 60
+    0 press UP
+    12 press A
+    14 release UP
+
+The number in front of every key event is the tick (GameView.frame_count)
+before which it has to be fed into the game. Together with the seed that
+is all that is needed to repeat a session exactly, see replay.py.
+"""
+
+import os
+import time
+
+import arcade
+
+# key code -> name in arcade.key, used to write readable key names
+KEY_NAMES = {}
+for _name, _value in vars(arcade.key).items():
+    if _name.isupper() and isinstance(_value, int):
+        KEY_NAMES.setdefault(_value, _name)
+
+
+class Recorder:
+    """ Writes the seed and every key event of one game into a file. """
+
+    def __init__(self, path, seed, tick_rate):
+        self.path = path
+        # line buffered, so a crashed kiosk still leaves a usable replay
+        self.file = open(path, "w", buffering=1)
+        self.file.write("# Trump Smasher replay\n")
+        self.file.write(f"# seed {seed}\n")
+        self.file.write(f"# tick_rate {tick_rate}\n")
+
+    def record(self, tick, action, key):
+        """ Write one key event, action is "press" or "release". """
+        # The pause screen doesn't change the game, so it isn't replayed
+        if key == arcade.key.P:
+            return
+        name = KEY_NAMES.get(key)
+        if name is not None:
+            self.file.write(f"{tick} {action} {name}\n")
+
+    def close(self):
+        self.file.close()
+
+
+def new_replay_path(directory):
+    """ File name for the next recorded game in a directory. """
+    os.makedirs(directory, exist_ok=True)
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    path = os.path.join(directory, f"replay-{stamp}.txt")
+    number = 1
+    while os.path.exists(path):
+        number += 1
+        path = os.path.join(directory, f"replay-{stamp}-{number}.txt")
+    return path
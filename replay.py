@@ -0,0 +1,149 @@
+"""
+Play back a game recorded with "python asteroids.py --record <folder>".
+
+The replay repeats the session tick for tick, either in a window or
+headless, and measures how long every tick of the simulation took.
+That way a slow session of a player becomes a repeatable performance test.
+
+Examples:
+python replay.py replays/replay-20261018-201500.txt
+python replay.py replays/replay-20261018-201500.txt --headless --csv ticks.csv
+"""
+
+import argparse
+import os
+import time
+
+import arcade
+
+from asteroids import SCREEN_HEIGHT, SCREEN_TITLE, SCREEN_WIDTH, TICK_RATE, GameView
+from assets import assets
+from headless import load_script
+from profiler import percentile
+
+
+def read_replay(path):
+    """ Read a replay file, returns (seed, tick_rate, script). """
+    seed = None
+    tick_rate = None
+    with open(path) as file:
+        for line in file:
+            parts = line.split()
+            if len(parts) == 3 and parts[0] == "#":
+                if parts[1] == "seed":
+                    seed = int(parts[2])
+                elif parts[1] == "tick_rate":
+                    tick_rate = int(parts[2])
+    if seed is None:
+        raise ValueError(f"{path}: no seed found, is this a replay file?")
+    # The keys are recorded per tick, so the game has to run at the same rate
+    if tick_rate is None:
+        tick_rate = TICK_RATE
+    elif tick_rate <= 0:
+        raise ValueError(f"{path}: tick rate {tick_rate} in the header is no tick rate")
+    return seed, tick_rate, load_script(path)
+
+
+def timing_report(tick_times):
+    """ Summary of a list of tick times in seconds, in milliseconds. """
+    total = sum(tick_times)
+    return {
+        "ticks": len(tick_times),
+        "total_ms": total * 1000,
+        "mean_ms": total / len(tick_times) * 1000 if tick_times else 0.0,
+        "p50_ms": percentile(tick_times, 50) * 1000,
+        "p99_ms": percentile(tick_times, 99) * 1000,
+        "max_ms": max(tick_times, default=0.0) * 1000,
+    }
+
+
+class ReplayGameView(GameView):
+    """ GameView that takes its key events from a replay instead of the keyboard. """
+
+    def __init__(self, script, **kwargs):
+        super().__init__(**kwargs)
+        self.script = script
+        self.tick_times = []
+
+    def tick(self):
+        """ Feed the recorded keys of this tick, then time the tick itself. """
+        for action, key in self.script.get(self.frame_count, ()):
+            if action == "press":
+                GameView.on_key_press(self, key, 0)
+            else:
+                GameView.on_key_release(self, key, 0)
+        start = time.perf_counter()
+        super().tick()
+        self.tick_times.append(time.perf_counter() - start)
+
+    def on_key_press(self, symbol, modifiers):
+        """ The keyboard only ends the playback, the replay steers the ship. """
+        if symbol == arcade.key.ESCAPE:
+            arcade.close_window()
+
+    def on_key_release(self, symbol, modifiers):
+        pass
+
+
+def play_headless(path, numpy_motion=False, max_ticks=1000000):
+    """ Replay a file without a window, returns the view after the game ended. """
+    seed, tick_rate, script = read_replay(path)
+    game_view = ReplayGameView(script, headless=True, numpy_motion=numpy_motion,
+                               tick_rate=tick_rate)
+    game_view.start_new_game(seed)
+    while game_view.frame_count < max_ticks:
+        game_view.tick()
+        if game_view.game_over or game_view.level == 3:
+            break
+    return game_view
+
+
+def play_rendered(path):
+    """ Replay a file in a window, returns the view when the window is closed. """
+    seed, tick_rate, script = read_replay(path)
+    window = arcade.Window(SCREEN_WIDTH, SCREEN_HEIGHT, SCREEN_TITLE + " - Replay")
+    assets.load()
+    game_view = ReplayGameView(script, tick_rate=tick_rate)
+    game_view.start_new_game(seed)
+    window.show_view(game_view)
+    arcade.run()
+    return game_view
+
+
+def main():
+    """ Main method """
+    parser = argparse.ArgumentParser(description="Play back a recorded game")
+    parser.add_argument("replay", help="replay file written by asteroids.py --record")
+    parser.add_argument("--headless", action="store_true", help="replay without a window")
+    parser.add_argument("--numpy", action="store_true",
+                        help="headless only: use the NumPy motion engine")
+    parser.add_argument("--csv", help="write the time of every tick into this file")
+    args = parser.parse_args()
+
+    replay_path = os.path.abspath(args.replay)
+    csv_path = os.path.abspath(args.csv) if args.csv else None
+    # The game loads its images relative to this folder
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    if args.headless:
+        game_view = play_headless(replay_path, args.numpy)
+    else:
+        game_view = play_rendered(replay_path)
+
+    if csv_path:
+        with open(csv_path, "w") as file:
+            file.write("tick,ms\n")
+            for tick, seconds in enumerate(game_view.tick_times):
+                file.write(f"{tick},{seconds * 1000:.4f}\n")
+
+    for name, value in timing_report(game_view.tick_times).items():
+        if isinstance(value, float):
+            value = f"{value:.3f}"
+        print(f"{name}: {value}")
+    print(f"score: {game_view.score}")
+    print(f"level: {game_view.level}")
+    print(f"game_over: {game_view.game_over}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+"""
+Server of the two player mode.
+
+The server runs the only real simulation: a headless GameView with one
+ship per player. Clients (client.py) send their keys, the server sends
+every client the state after every tick, see netcode.py.
+
+Examples:
+python server.py
+python server.py --port 50007 --players 2 --seed 42
+"""
+
+import argparse
+import os
+import random
+import socket
+import time
+
+import arcade
+
+from asteroids import (ASTEROID_SPEED, SCALE, SCREEN_HEIGHT, SCREEN_WIDTH, TICK_RATE, GameView,
+                       ShipSprite)
+from assets import assets
+from netcode import (HELD_DOWN, HELD_LEFT, HELD_RIGHT, HELD_UP, HELLO,
+                     HISTORY_TICKS, INPUT, INPUT_PACKET, KIND_ASTEROID, KIND_ITEM,
+                     KIND_LASER, KIND_VOTE, NO_BASELINE, WELCOME, WELCOME_PACKET,
+                     encode_records, encode_state, quantize)
+
+DEFAULT_PORT = 50007
+# held key bit -> arcade key
+HELD_KEYS = {HELD_LEFT: arcade.key.LEFT, HELD_RIGHT: arcade.key.RIGHT,
+             HELD_UP: arcade.key.UP, HELD_DOWN: arcade.key.DOWN}
+# most shots a single INPUT packet may fire
+MAX_SHOTS_PER_INPUT = 3
+# seconds before a new game starts after the last one ended
+RESTART_DELAY = 3
+# seconds without a packet after which a client is dropped and its slot freed
+CLIENT_TIMEOUT = 5
+
+
+class ArenaView(GameView):
+    """ Headless GameView with one ship per player and ids for the network. """
+
+    def __init__(self, players=2, endless=False, **kwargs):
+        super().__init__(headless=True, **kwargs)
+        self.players = players
+        # endless games never run out of lives, used by the benchmark
+        self.endless = endless
+        self.ships = []
+        self.next_net_id = players
+        self.net_ids = set()
+
+    def start_new_game(self, seed=None):
+        self.net_ids = set()
+        super().start_new_game(seed)
+        self.ships = [self.player_sprite]
+        for i in range(1, self.players):
+            ship = ShipSprite(assets.texture("ship"), assets.sprite_scale("ship", SCALE),
+                              self.tick_time)
+            self.player_sprite_list.append(ship)
+            self.ships.append(ship)
+
+    def add_sprite(self, sprite, kind):
+        super().add_sprite(sprite, kind)
+        # ids below the number of players belong to the ships
+        while self.next_net_id in self.net_ids or self.next_net_id < self.players:
+            self.next_net_id = (self.next_net_id + 1) % 65536
+        sprite.net_id = self.next_net_id
+        self.net_ids.add(sprite.net_id)
+        self.next_net_id = (self.next_net_id + 1) % 65536
+
+    def flush_removals(self):
+        for sprite in self.kill_set:
+            self.net_ids.discard(sprite.net_id)
+        super().flush_removals()
+
+    def tick(self):
+        super().tick()
+        if self.endless and self.lives < 3:
+            self.lives = 3
+            self.show_lives()
+
+    def net_state(self):
+        """ Quantized state of all asteroids, bullets and items: id -> (kind, x, y, angle). """
+        state = {}
+        for asteroid in self.asteroid_list:
+            state[asteroid.net_id] = (KIND_ASTEROID[asteroid.size],
+                                      *quantize(asteroid.center_x, asteroid.center_y,
+                                                asteroid.angle))
+        laser_pool = self.laser_pool
+        for bullet in self.bullet_list:
+            kind = KIND_LASER if bullet.pool is laser_pool else KIND_VOTE
+            state[bullet.net_id] = (kind, *quantize(bullet.center_x, bullet.center_y,
+                                                    bullet.angle))
+        for item in self.item_list:
+            state[item.net_id] = (KIND_ITEM, *quantize(item.center_x, item.center_y, item.angle))
+        return state
+
+    def net_ships(self):
+        """ Full state of every ship, as SHIP_RECORD values. """
+        return [(player, ship.center_x, ship.center_y, ship.angle, ship.speed,
+                 min(ship.respawning, 65535))
+                for player, ship in enumerate(self.ships)]
+
+
+class RemotePlayer:
+    """ What the server knows about one connected client. """
+
+    def __init__(self, player, address):
+        self.player = player
+        self.address = address
+        self.input_seq = 0
+        self.held = 0
+        self.lasers = None
+        self.votes = None
+        # newest state tick the client has completely, the delta baseline
+        self.state_ack = NO_BASELINE
+        self.last_heard = time.perf_counter()
+
+
+class GameServer:
+    """ Runs the game and talks to the clients over one UDP socket. """
+
+    def __init__(self, port=DEFAULT_PORT, players=2, seed=None, delta=True, endless=False,
+                 start_asteroids=None, tick_rate=TICK_RATE, client_timeout=CLIENT_TIMEOUT):
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind(("", port))
+        self.socket.setblocking(False)
+        self.delta = delta
+        self.tick_rate = tick_rate
+        self.tick_time = 1 / tick_rate
+        self.client_timeout = client_timeout
+        self.rng = random.Random(seed)
+        self.view = ArenaView(players, endless, tick_rate=tick_rate)
+        self.start_asteroids = start_asteroids
+        self.new_game()
+        # address -> RemotePlayer
+        self.clients = {}
+        # tick -> net_state() of that tick
+        self.history = {}
+        self.tick = 0
+        self.bytes_sent = 0
+        self.game_end_time = None
+
+    def new_game(self):
+        self.view.start_new_game(self.rng.randrange(2 ** 32))
+        if self.start_asteroids:
+            # more big asteroids for the benchmark
+            for i in range(self.start_asteroids - len(self.view.asteroid_list)):
+                asteroid = self.view.new_asteroid(4)
+                asteroid.center_x = self.rng.randrange(SCREEN_WIDTH)
+                asteroid.center_y = self.rng.randrange(SCREEN_HEIGHT)
+                self.view.launch_asteroid(asteroid, ASTEROID_SPEED, self.rng)
+                self.view.add_sprite(asteroid, "asteroids")
+
+    def receive(self):
+        """ Handle every packet that arrived since the last tick. """
+        while True:
+            try:
+                data, address = self.socket.recvfrom(2048)
+            except BlockingIOError:
+                return
+            except ConnectionResetError:
+                # Windows reports an unreachable client like this
+                continue
+            if not data:
+                continue
+            if data[0] == HELLO:
+                self.join(address)
+            elif data[0] == INPUT and len(data) == INPUT_PACKET.size:
+                client = self.clients.get(address)
+                if client is not None:
+                    client.last_heard = time.perf_counter()
+                    self.apply_input(client, INPUT_PACKET.unpack(data))
+
+    def join(self, address):
+        client = self.clients.get(address)
+        if client is None:
+            taken = {other.player for other in self.clients.values()}
+            free = [player for player in range(self.view.players) if player not in taken]
+            if not free:
+                return
+            client = RemotePlayer(free[0], address)
+            self.clients[address] = client
+            print(f"player {client.player} joined from {address[0]}:{address[1]}")
+        client.last_heard = time.perf_counter()
+        self.socket.sendto(WELCOME_PACKET.pack(WELCOME, client.player, self.tick,
+                                               self.view.seed, self.tick_rate), address)
+
+    def apply_input(self, client, packet):
+        (packet_type, player, seq, state_ack, held, lasers, votes) = packet
+        if seq <= client.input_seq:
+            # old or repeated packet
+            return
+        client.input_seq = seq
+        if state_ack != NO_BASELINE and (client.state_ack == NO_BASELINE
+                                         or state_ack > client.state_ack):
+            client.state_ack = state_ack
+
+        view = self.view
+        ship = view.ships[client.player]
+        for bit, key in HELD_KEYS.items():
+            if held & bit and not client.held & bit:
+                view.ship_key_press(ship, key)
+            elif client.held & bit and not held & bit:
+                view.ship_key_release(ship, key)
+        client.held = held
+
+        if client.lasers is None:
+            client.lasers, client.votes = lasers, votes
+        for count, last, key in ((lasers, client.lasers, arcade.key.A),
+                                 (votes, client.votes, arcade.key.D)):
+            shots = min((count - last) % 65536, MAX_SHOTS_PER_INPUT)
+            for i in range(shots):
+                view.ship_key_press(ship, key)
+        client.lasers, client.votes = lasers, votes
+
+    def drop_silent_clients(self):
+        """
+        Forget the clients that sent nothing for client_timeout seconds.
+        Their slot is free for the next HELLO and their ship stops steering.
+        """
+        now = time.perf_counter()
+        for address, client in list(self.clients.items()):
+            if now - client.last_heard <= self.client_timeout:
+                continue
+            del self.clients[address]
+            ship = self.view.ships[client.player]
+            for bit, key in HELD_KEYS.items():
+                if client.held & bit:
+                    self.view.ship_key_release(ship, key)
+            print(f"player {client.player} timed out")
+
+    def send_states(self):
+        """ Send every client the state of this tick, delta compressed. """
+        view = self.view
+        state = view.net_state()
+        self.history[self.tick] = state
+        self.history.pop(self.tick - HISTORY_TICKS, None)
+        ships = view.net_ships()
+
+        for client in self.clients.values():
+            baseline = NO_BASELINE
+            if self.delta and client.state_ack in self.history:
+                baseline = client.state_ack
+            records = encode_records(state, self.history.get(baseline))
+            header = (self.tick, baseline, client.input_seq, view.score, view.lives,
+                      view.level, view.game_over)
+            for packet in encode_state(header, ships, records):
+                self.bytes_sent += len(packet)
+                self.socket.sendto(packet, client.address)
+
+    def step(self):
+        """ One tick: read inputs, simulate, send the states. """
+        self.receive()
+        self.drop_silent_clients()
+        view = self.view
+        if view.game_over or view.level == 3:
+            # show the end for a moment, then start again
+            if self.game_end_time is None:
+                self.game_end_time = time.perf_counter()
+            elif time.perf_counter() - self.game_end_time > RESTART_DELAY:
+                self.game_end_time = None
+                self.new_game()
+        else:
+            view.tick()
+        self.tick += 1
+        self.send_states()
+
+    def run(self, ticks=None):
+        """ Run at the tick rate, forever or for a number of ticks. """
+        next_tick = time.perf_counter()
+        while ticks is None or self.tick < ticks:
+            self.step()
+            next_tick += self.tick_time
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            elif delay < -self.tick_time * 5:
+                # far behind, don't try to catch up
+                next_tick = time.perf_counter()
+
+    def close(self):
+        self.socket.close()
+
+
+def main():
+    """ Main method """
+    parser = argparse.ArgumentParser(description="Server of the Trump Smasher network game")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--players", type=int, default=2)
+    parser.add_argument("--seed", type=int, help="seed of the games, random if not given")
+    parser.add_argument("--ticks", type=int, help="stop after this many ticks")
+    parser.add_argument("--no-delta", action="store_true", help="always send the full state")
+    parser.add_argument("--endless", action="store_true", help="the ships never run out of lives")
+    parser.add_argument("--asteroids", type=int, help="number of big asteroids at the start")
+    parser.add_argument("--tick-rate", type=int, default=TICK_RATE,
+                        help=f"simulation ticks per second (default {TICK_RATE})")
+    parser.add_argument("--timeout", type=float, default=CLIENT_TIMEOUT,
+                        help=f"seconds before a silent client is dropped (default {CLIENT_TIMEOUT})")
+    args = parser.parse_args()
+
+    # The game loads its images relative to this folder
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    assets.load(sounds=False)
+
+    server = GameServer(args.port, args.players, args.seed, not args.no_delta, args.endless,
+                        args.asteroids, args.tick_rate, args.timeout)
+    print(f"server running on port {args.port}")
+    try:
+        server.run(args.ticks)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        print(f"{server.tick} ticks, {server.bytes_sent} bytes sent")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+Compact binary snapshots of a running game.
+
+capture() packs everything that decides how a game goes on into a small
+bytes object: tick, score, lives, level, the state of the random
+generator, the ship and every asteroid, bullet and item. restore() puts
+a GameView back into exactly that state. It writes the values back into
+the sprites that are still in the game and only removes or adds the ones
+that differ, from and to their pools, so little has to be built again.
+A restored game continues tick for tick like the original one did.
+
+Snapshots can only be taken between two ticks. SnapshotRing keeps the
+most recent ones for rewinding.
+
+Usage:
+    data = game_view.snapshot()
+    ...
+    game_view.restore_snapshot(data)
+"""
+
+import struct
+from array import array
+from collections import deque
+
+MAGIC = b"TSS1"
+# magic, tick, seed, score, lives, level, game over, asteroids, bullets, items
+HEADER = struct.Struct("<4sIqiii?III")
+# version, 625 words of the Mersenne Twister, has gauss_next, gauss_next
+RNG = struct.Struct("<i625I?d")
+# x, y, angle, change_x, change_y, change_angle, thrust, speed, respawning, alpha
+SHIP = struct.Struct("<8dii")
+# x, y, angle, change_x, change_y, change_angle
+ASTEROID_VALUES = 6
+BULLET_VALUES = 6
+ITEM_VALUES = 2
+# bullet kinds, in the order of GameView.bullet_pools()
+LASER, VOTE = 0, 1
+
+
+def _pack_rng(rng):
+    version, words, gauss_next = rng.getstate()
+    return RNG.pack(version, *words, gauss_next is not None, gauss_next or 0.0)
+
+
+def _unpack_rng(data, offset):
+    values = RNG.unpack_from(data, offset)
+    gauss_next = values[-1] if values[-2] else None
+    return values[0], tuple(values[1:626]), gauss_next
+
+
+def capture(game_view):
+    """ Snapshot of the game as bytes. """
+    ship = game_view.player_sprite
+    asteroids = game_view.asteroid_list
+    bullets = game_view.bullet_list
+    items = game_view.item_list
+    laser_pool = game_view.laser_pool
+
+    sizes = array("B")
+    asteroid_values = array("d")
+    for asteroid in asteroids:
+        sizes.append(asteroid.size)
+        asteroid_values.extend((asteroid.center_x, asteroid.center_y, asteroid.angle,
+                                asteroid.change_x, asteroid.change_y, asteroid.change_angle))
+
+    kinds = array("B")
+    bullet_values = array("d")
+    for bullet in bullets:
+        kinds.append(LASER if bullet.pool is laser_pool else VOTE)
+        bullet_values.extend((bullet.center_x, bullet.center_y, bullet.angle,
+                              bullet.change_x, bullet.change_y, bullet.change_angle))
+
+    item_values = array("d")
+    for item in items:
+        item_values.extend((item.center_x, item.center_y))
+
+    return b"".join((
+        HEADER.pack(MAGIC, game_view.frame_count, game_view.seed, game_view.score,
+                    game_view.lives, game_view.level, game_view.game_over,
+                    len(asteroids), len(bullets), len(items)),
+        _pack_rng(game_view.rng),
+        SHIP.pack(ship.center_x, ship.center_y, ship.angle, ship.change_x, ship.change_y,
+                  ship.change_angle, ship.thrust, ship.speed, ship.respawning, ship.alpha),
+        sizes.tobytes(),
+        asteroid_values.tobytes(),
+        kinds.tobytes(),
+        bullet_values.tobytes(),
+        item_values.tobytes(),
+    ))
+
+
+def _read(typecode, data, offset, count):
+    values = array(typecode)
+    end = offset + count * values.itemsize
+    values.frombytes(data[offset:end])
+    return values, end
+
+
+def _keep(game_view, sprite_list, wanted, fits):
+    """
+    The sprites at the start of sprite_list that fit the wanted entries
+    of a snapshot one by one. All the others are removed from the game.
+    """
+    sprites = list(sprite_list)
+    kept = 0
+    for sprite, entry in zip(sprites, wanted):
+        if not fits(sprite, entry):
+            break
+        kept += 1
+    for sprite in sprites[kept:]:
+        game_view.remove_sprite(sprite)
+    return sprites[:kept]
+
+
+def _put(game_view, sprite, kept, kind):
+    """ Hand a sprite with restored values back to the game. """
+    if not kept:
+        game_view.add_sprite(sprite, kind)
+    elif game_view.motion:
+        game_view.motion.refresh(sprite)
+
+
+def restore(game_view, data):
+    """ Put the game back into the state of a snapshot made by capture(). """
+    (magic, frame_count, seed, score, lives, level, game_over,
+     asteroid_count, bullet_count, item_count) = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("not a Trump Smasher snapshot")
+    offset = HEADER.size
+    game_view.rng.setstate(_unpack_rng(data, offset))
+    offset += RNG.size
+    ship_values = SHIP.unpack_from(data, offset)
+    offset += SHIP.size
+    sizes, offset = _read("B", data, offset, asteroid_count)
+    asteroid_values, offset = _read("d", data, offset, asteroid_count * ASTEROID_VALUES)
+    kinds, offset = _read("B", data, offset, bullet_count)
+    bullet_values, offset = _read("d", data, offset, bullet_count * BULLET_VALUES)
+    item_values, offset = _read("d", data, offset, item_count * ITEM_VALUES)
+
+    game_view.frame_count = frame_count
+    game_view.seed = seed
+    game_view.score = score
+    game_view.level = level
+    game_view.game_over = game_over
+    game_view.lives = lives
+    game_view.show_lives()
+
+    ship = game_view.player_sprite
+    (ship.center_x, ship.center_y, ship.angle, ship.change_x, ship.change_y,
+     ship.change_angle, ship.thrust, ship.speed, ship.respawning, ship.alpha) = ship_values
+
+    # The sprites that are still in the game take over the values of the
+    # snapshot in place, as long as they are of the same kind in the same
+    # position of their list. Only the rest leaves the game and the missing
+    # ones are added at the end, so all lists keep the order of the snapshot
+    # and the game goes on exactly the same way.
+    bullet_pools = game_view.bullet_pools()
+    asteroids = _keep(game_view, game_view.asteroid_list, sizes,
+                      lambda asteroid, size: asteroid.size == size)
+    bullets = _keep(game_view, game_view.bullet_list, kinds,
+                    lambda bullet, kind: bullet.pool is bullet_pools[kind])
+    # items are all alike and never pooled, the ones that leave are put back in
+    spare_items = list(game_view.item_list)[item_count:]
+    items = _keep(game_view, game_view.item_list, range(item_count), lambda item, i: True)
+    game_view.flush_removals()
+
+    for i, size in enumerate(sizes):
+        if i < len(asteroids):
+            asteroid = asteroids[i]
+        else:
+            asteroid = game_view.new_asteroid(size)
+        values = asteroid_values[i * ASTEROID_VALUES:(i + 1) * ASTEROID_VALUES]
+        (asteroid.center_x, asteroid.center_y, asteroid.angle,
+         asteroid.change_x, asteroid.change_y, asteroid.change_angle) = values
+        _put(game_view, asteroid, i < len(asteroids), "asteroids")
+
+    for i, kind in enumerate(kinds):
+        if i < len(bullets):
+            bullet = bullets[i]
+        else:
+            bullet = bullet_pools[kind].acquire()
+        values = bullet_values[i * BULLET_VALUES:(i + 1) * BULLET_VALUES]
+        (bullet.center_x, bullet.center_y, bullet.angle,
+         bullet.change_x, bullet.change_y, bullet.change_angle) = values
+        _put(game_view, bullet, i < len(bullets), "bullets")
+
+    for i in range(item_count):
+        if i < len(items):
+            item = items[i]
+        else:
+            item = spare_items.pop() if spare_items else game_view.new_item()
+        item.center_x = item_values[i * ITEM_VALUES]
+        item.center_y = item_values[i * ITEM_VALUES + 1]
+        _put(game_view, item, i < len(items), "items")
+
+    # Nothing to interpolate from anymore
+    game_view.previous_state = {}
+    game_view.time_accumulator = 0.0
+
+
+class SnapshotRing:
+    """ The last snapshots of a game, the oldest ones are dropped. """
+
+    def __init__(self, capacity):
+        self.snapshots = deque(maxlen=capacity)
+
+    def __len__(self):
+        return len(self.snapshots)
+
+    def push(self, data):
+        self.snapshots.append(data)
+
+    def pop(self):
+        """ Newest snapshot, None if there is none. """
+        return self.snapshots.pop() if self.snapshots else None
+
+    def clear(self):
+        self.snapshots.clear()
@@ -0,0 +1,176 @@
+"""
+Soak test for memory leaks across game restarts.
+
+Plays many games in a row the way a kiosk does: every game is a new
+GameView, the old one is simply dropped like GameOverView and
+WinnerView do. A bot presses random keys. The memory telemetry (see
+telemetry.py) records every restart. The test fails if, from the game
+after the warmup to the last one, the traced memory or RSS grew more
+than allowed or more GameViews stayed alive.
+
+By default the games run headless, without anything that draws. With
+--windowed they run in an invisible window with an offscreen OpenGL
+context, so the HUD, the GPU buffers of the sprite lists, the texture
+atlas and the sound players are part of the test. Every game is drawn
+each tick and restarted through GameOverView and ENTER like in the game.
+
+Example:
+python soak.py --restarts 20 --ticks 1200 --output memory.json
+python soak.py --restarts 20 --windowed
+"""
+
+import argparse
+import os
+import random
+import sys
+
+import pyglet
+
+# The windowed soak draws offscreen, pyglet has to know that before
+# arcade is imported
+if __name__ == "__main__" and "--windowed" in sys.argv[1:]:
+    pyglet.options["headless"] = True
+
+import arcade  # noqa: E402
+
+from asteroids import (SCREEN_HEIGHT, SCREEN_TITLE, SCREEN_WIDTH, GameOverView,  # noqa: E402
+                       GameView, WinnerView, show_new_game)
+from assets import assets  # noqa: E402
+from telemetry import telemetry  # noqa: E402
+
+# keys the bot presses and releases
+BOT_KEYS = (arcade.key.LEFT, arcade.key.RIGHT, arcade.key.UP, arcade.key.DOWN,
+            arcade.key.A, arcade.key.D)
+
+
+def play_game(game_view, ticks, rng, window=None):
+    """
+    Random keys until the game ends or ticks have passed. With a window
+    every tick goes through on_update and is drawn, until the game shows
+    another view.
+    """
+    for tick in range(ticks):
+        if rng.random() < 0.2:
+            key = rng.choice(BOT_KEYS)
+            if rng.random() < 0.6:
+                game_view.on_key_press(key, 0)
+            else:
+                game_view.on_key_release(key, 0)
+        if window is None:
+            game_view.tick()
+            if game_view.game_over or game_view.level == 3:
+                break
+        else:
+            game_view.on_update(game_view.tick_time)
+            if window.current_view is not game_view:
+                break
+            game_view.on_draw()
+
+
+def restart_windowed(window, game_view):
+    """ Start the next game like a player: through GameOverView (or WinnerView) and ENTER. """
+    if not isinstance(window.current_view, (GameOverView, WinnerView)):
+        # the bot survived all ticks, lose the game
+        window.show_view(GameOverView(game_view))
+    window.current_view.on_draw()
+    window.current_view.on_key_press(arcade.key.ENTER, 0)
+
+
+def soak(restarts, ticks, seed=0, warmup=2, interval=600, numpy_motion=False):
+    """ Play restarts headless games and return the growth measured by the telemetry. """
+    rng = random.Random(seed)
+    telemetry.start(interval)
+    game_view = None
+    for i in range(restarts):
+        # the old game is still referenced while the new one starts, like
+        # the game over view holds it until ENTER was handled
+        new_view = GameView(headless=True, numpy_motion=numpy_motion)
+        new_view.start_new_game(rng.randrange(2 ** 32))
+        game_view = new_view
+        play_game(game_view, ticks, rng)
+    return telemetry.growth(warmup)
+
+
+def soak_windowed(restarts, ticks, seed=0, warmup=2, interval=600):
+    """
+    Play restarts drawn games in an invisible window and return the growth
+    measured by the telemetry. Without a display pyglet.options["headless"]
+    has to be set before arcade is imported.
+    """
+    rng = random.Random(seed)
+    # new games take their seed from the random module
+    random.seed(seed)
+    window = arcade.Window(SCREEN_WIDTH, SCREEN_HEIGHT, SCREEN_TITLE, visible=False)
+    # the intro would load them on a thread, the soak has nothing to show meanwhile
+    assets.load()
+    telemetry.start(interval)
+    try:
+        show_new_game(window)
+        for i in range(restarts):
+            game_view = window.current_view
+            play_game(game_view, ticks, rng, window)
+            if i < restarts - 1:
+                restart_windowed(window, game_view)
+    finally:
+        window.close()
+    return telemetry.growth(warmup)
+
+
+def main():
+    """ Main method """
+    parser = argparse.ArgumentParser(description="Restart the game many times and look for leaks")
+    parser.add_argument("--restarts", type=int, default=20, help="number of games")
+    parser.add_argument("--ticks", type=int, default=1200, help="most ticks per game")
+    parser.add_argument("--warmup", type=int, default=2,
+                        help="games before the memory is compared (caches fill up)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--interval", type=int, default=600,
+                        help="ticks between two memory snapshots")
+    parser.add_argument("--max-growth", type=int, default=256, metavar="KIB",
+                        help="allowed growth of the traced memory in KiB")
+    parser.add_argument("--max-rss-growth", type=int, default=32, metavar="MIB",
+                        help="allowed growth of the resident memory in MiB")
+    parser.add_argument("--numpy", action="store_true",
+                        help="move the sprites with the NumPy motion engine")
+    parser.add_argument("--windowed", action="store_true",
+                        help="draw every game in an offscreen window and restart through "
+                             "the game over view")
+    parser.add_argument("--output", help="write the telemetry to this .json file")
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output) if args.output else None
+    # The game loads its images relative to this folder
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    if args.windowed:
+        growth = soak_windowed(args.restarts, args.ticks, args.seed, args.warmup, args.interval)
+    else:
+        growth = soak(args.restarts, args.ticks, args.seed, args.warmup, args.interval,
+                      args.numpy)
+    if output:
+        telemetry.export(output)
+    if growth is None:
+        print(f"need more than {args.warmup + 1} restarts to compare")
+        sys.exit(2)
+
+    for row in telemetry.restarts:
+        rss = f"{row['rss'] / 2 ** 20:.1f} MiB" if row["rss"] else "unknown"
+        print(f"game {row['game']:3}: traced {row['traced'] / 2 ** 10:9.1f} KiB, rss {rss}, "
+              f"live game views {row['live']['GameView']}, sprites {row['live']['Sprite']}")
+
+    failures = []
+    if growth["traced"] > args.max_growth * 2 ** 10:
+        failures.append(f"traced memory grew by {growth['traced'] / 2 ** 10:.1f} KiB")
+    if growth["rss"] is not None and growth["rss"] > args.max_rss_growth * 2 ** 20:
+        failures.append(f"resident memory grew by {growth['rss'] / 2 ** 20:.1f} MiB")
+    if growth["game_views"] > 0:
+        failures.append(f"{growth['game_views']} more game views stay alive")
+    if failures:
+        print(f"FAILED over {growth['games']} games: " + ", ".join(failures))
+        sys.exit(1)
+    print(f"passed over {growth['games']} games: traced memory "
+          f"{growth['traced'] / 2 ** 10:+.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
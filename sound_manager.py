@@ -0,0 +1,148 @@
+"""
+Voice manager for the sound effects of Trump Smasher.
+
+Every call of arcade.play_sound starts a new pyglet player. A split
+cascade or rapid fire could start dozens of them in one frame. The sound
+manager plays every effect on one of a fixed number of voices instead.
+Every voice has one pyglet player for the whole game, a new effect is
+queued on it and replaces what it played before:
+
+    - at most MAX_VOICES effects play at the same time
+    - every effect has its own cap of voices playing at once
+    - an effect is not started again within its minimum interval
+    - when all voices are busy, a new effect takes the voice of an older
+      effect with the same or a lower priority, or is dropped
+
+So the work of play() is bounded, no matter how many collisions there are.
+
+Usage:
+    from sound_manager import sound_manager
+    sound_manager.play("laser", 0.03)
+"""
+
+import time
+
+from pyglet import media
+
+from assets import assets
+
+MAX_VOICES = 8
+
+# name -> (voices at most, seconds between two starts, priority)
+EFFECTS = {
+    "laser": (3, 0.03, 2),
+    "laser2": (3, 0.05, 2),
+    "hit1": (2, 0.05, 1),
+    "hit2": (3, 0.05, 1),
+    "hit3": (3, 0.05, 1),
+    "hit4": (2, 0.05, 1),
+}
+DEFAULT_EFFECT = (2, 0.05, 0)
+
+
+class Voice:
+    """ One slot of the voice pool, its player and the effect that plays on it. """
+
+    def __init__(self):
+        self.name = None
+        # made on the first play, headless games never need one
+        self.player = None
+        self.priority = 0
+        self.start_time = 0.0
+        self.end_time = 0.0
+
+    def start(self, sound, volume):
+        """ Play a sound (arcade.Sound or PackSound) on the player of this voice. """
+        player = self.player
+        if player is None:
+            player = self.player = media.Player()
+            # centered, like arcade plays its sounds
+            player.position = (0.0, 0.0, 1.0)
+        player.volume = volume
+        # a source that is still there, playing or not, is skipped
+        replace = player.source is not None
+        player.queue(sound.source)
+        if replace:
+            player.next_source()
+        player.play()
+
+    def stop(self):
+        if self.name is not None:
+            self.player.pause()
+        self.name = None
+
+
+class SoundManager:
+    """ Plays sound effects on a fixed pool of voices. """
+
+    def __init__(self, voice_count=MAX_VOICES, effects=EFFECTS):
+        self.voices = [Voice() for i in range(voice_count)]
+        self.effects = effects
+        # name -> time the effect was last started
+        self.last_start = {}
+        # how many calls of play() were dropped or took over a voice
+        self.dropped = 0
+        self.stolen = 0
+
+    def play(self, name, volume):
+        """ Play an effect if the limits allow it, returns its voice or None. """
+        max_voices, min_interval, priority = self.effects.get(name, DEFAULT_EFFECT)
+        now = time.perf_counter()
+        if now - self.last_start.get(name, -min_interval) < min_interval:
+            self.dropped += 1
+            return None
+
+        # one pass over the fixed pool: a free voice, the voices of this
+        # effect and the voice that can be taken over most easily
+        free = None
+        same_effect = 0
+        oldest_same = None
+        victim = None
+        for voice in self.voices:
+            if voice.name is not None and voice.end_time <= now:
+                # finished playing
+                voice.stop()
+            if voice.name is None:
+                if free is None:
+                    free = voice
+                continue
+            if voice.name == name:
+                same_effect += 1
+                if oldest_same is None or voice.start_time < oldest_same.start_time:
+                    oldest_same = voice
+            if voice.priority <= priority and (
+                    victim is None or (voice.priority, voice.start_time)
+                    < (victim.priority, victim.start_time)):
+                victim = voice
+
+        if same_effect >= max_voices:
+            # restart the oldest voice of this effect
+            voice = oldest_same
+        elif free is not None:
+            voice = free
+        elif victim is not None:
+            voice = victim
+        else:
+            self.dropped += 1
+            return None
+        if voice.name is not None:
+            self.stolen += 1
+            voice.stop()
+
+        sound = assets.sound(name)
+        voice.start(sound, volume)
+        voice.name = name
+        voice.priority = priority
+        voice.start_time = now
+        voice.end_time = now + sound.get_length()
+        self.last_start[name] = now
+        return voice
+
+    def active_voices(self):
+        """ Number of voices that are playing right now. """
+        now = time.perf_counter()
+        return sum(1 for voice in self.voices if voice.name is not None and voice.end_time > now)
+
+
+# The one sound manager the whole game uses
+sound_manager = SoundManager()
@@ -0,0 +1,191 @@
+"""
+Memory telemetry for long sessions.
+
+A kiosk runs the game for hours and every restart through GameOverView
+or WinnerView builds a new GameView with new sprite lists, pools and
+HUD. If anything keeps the old games alive, memory grows a little with
+every restart until the kiosk goes down. While the telemetry is switched
+on it records:
+
+    every tick        how much the traced memory grew (or shrank) during the
+                      tick and how far its peak rose above the start (tracemalloc)
+    every interval    a tracemalloc snapshot: traced memory, RSS, the
+                      sprites in every list, texture and sound handles
+                      and the lines whose memory grew most since the
+                      last snapshot
+    every new game    the same after a full garbage collection, plus the
+                      number of live GameViews, sprite lists and sprites
+
+All of it can be written to a JSON file. soak.py restarts the game many
+times and fails if the memory keeps growing across the restarts.
+
+Usage:
+    from telemetry import telemetry
+    telemetry.start(interval=600)
+    ...
+    telemetry.export("memory.json")
+"""
+
+import gc
+import json
+import tracemalloc
+from collections import deque
+
+import arcade
+
+from asset_pack import resident_memory
+
+# ticks between two tracemalloc snapshots
+SNAPSHOT_INTERVAL = 600
+# stack frames tracemalloc keeps per allocation, more is slower
+TRACE_FRAMES = 1
+# lines with the largest growth listed per snapshot
+TOP_GROWTH = 10
+
+# classes whose live instances are counted at every new game
+LIVE_CLASSES = ("GameView", "SpriteList", "LayeredSpriteList", "Sprite", "TurningSprite",
+                "AsteroidSprite", "ShipSprite", "Item", "Hud")
+
+
+def live_objects(class_names=LIVE_CLASSES):
+    """ Number of live objects of every class name, by walking all objects of the gc. """
+    counts = dict.fromkeys(class_names, 0)
+    for obj in gc.get_objects():
+        name = type(obj).__name__
+        if name in counts:
+            counts[name] += 1
+    return counts
+
+
+def handle_counts():
+    """ Textures and sounds the game and arcade hold on to. """
+    # imported here, assets needs asset_pack which this module uses too
+    from assets import assets
+    return {
+        "textures": len(assets.textures),
+        "sounds": len(assets.sounds),
+        "arcade_texture_cache": len(getattr(arcade.load_texture, "texture_cache", {})),
+    }
+
+
+class MemoryTelemetry:
+    """ Collects memory statistics of a session. """
+
+    def __init__(self):
+        self.enabled = False
+        self.interval = SNAPSHOT_INTERVAL
+        self.ticks = 0
+        self.games = 0
+        self.last_traced = 0
+        # net growth of the traced memory in each of the ticks since the last
+        # snapshot, what was allocated and freed again in the tick cancels out
+        self.tick_growth = deque(maxlen=SNAPSHOT_INTERVAL)
+        # highest traced memory during each of the ticks, above its start
+        self.tick_peaks = deque(maxlen=SNAPSHOT_INTERVAL)
+        self.last_snapshot = None
+        # one row per snapshot and one per new game
+        self.intervals = []
+        self.restarts = []
+
+    def start(self, interval=SNAPSHOT_INTERVAL):
+        """ Switch the telemetry on, starts tracemalloc if it isn't tracing yet. """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACE_FRAMES)
+        self.enabled = True
+        self.interval = interval
+        self.tick_growth = deque(maxlen=interval)
+        self.tick_peaks = deque(maxlen=interval)
+        self.last_traced = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        self.last_snapshot = self._snapshot()
+
+    def stop(self):
+        self.enabled = False
+        self.last_snapshot = None
+        tracemalloc.stop()
+
+    def _snapshot(self):
+        # what the telemetry keeps itself is no leak of the game
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ))
+
+    def _row(self, game_view, snapshot):
+        return {
+            "tick": self.ticks,
+            "game": self.games,
+            "traced": sum(stat.size for stat in snapshot.statistics("filename")),
+            "rss": resident_memory(),
+            "sprites": game_view.sprite_counts(),
+            "handles": handle_counts(),
+        }
+
+    def tick(self, game_view):
+        """ Called at the end of every tick. """
+        if not self.enabled:
+            return
+        traced, peak = tracemalloc.get_traced_memory()
+        self.tick_growth.append(traced - self.last_traced)
+        self.tick_peaks.append(peak - self.last_traced)
+        tracemalloc.reset_peak()
+        self.last_traced = traced
+        self.ticks += 1
+        if self.ticks % self.interval == 0:
+            self.take_snapshot(game_view)
+
+    def take_snapshot(self, game_view):
+        """ Store a row for the ticks since the last snapshot. """
+        snapshot = self._snapshot()
+        row = self._row(game_view, snapshot)
+        growth = list(self.tick_growth)
+        row["net_bytes_per_tick"] = sum(growth) / len(growth) if growth else 0.0
+        row["max_bytes_per_tick"] = max(growth, default=0)
+        row["max_peak_bytes_per_tick"] = max(self.tick_peaks, default=0)
+        row["top_growth"] = [str(stat) for stat in
+                             snapshot.compare_to(self.last_snapshot, "lineno")[:TOP_GROWTH]]
+        self.intervals.append(row)
+        self.tick_growth.clear()
+        self.tick_peaks.clear()
+        self.last_snapshot = snapshot
+        self.last_traced = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+
+    def game_started(self, game_view):
+        """ Called when a game starts, the old ones should be gone by now. """
+        if not self.enabled:
+            return
+        self.games += 1
+        gc.collect()
+        row = self._row(game_view, self._snapshot())
+        row["live"] = live_objects()
+        self.restarts.append(row)
+        self.last_traced = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+
+    def growth(self, warmup=1):
+        """
+        How much traced memory, RSS and live GameViews grew from the game
+        after the warmup games to the last game, None without enough games.
+        """
+        if len(self.restarts) <= warmup + 1:
+            return None
+        first = self.restarts[warmup]
+        last = self.restarts[-1]
+        return {
+            "games": len(self.restarts) - warmup,
+            "traced": last["traced"] - first["traced"],
+            "rss": (last["rss"] - first["rss"]) if first["rss"] and last["rss"] else None,
+            "game_views": last["live"]["GameView"] - first["live"]["GameView"],
+        }
+
+    def export(self, path):
+        """ Write all rows of the session to a JSON file. """
+        with open(path, "w") as file:
+            json.dump({"interval": self.interval, "restarts": self.restarts,
+                       "intervals": self.intervals, "growth": self.growth()},
+                      file, indent=1)
+
+
+# The one telemetry the whole game uses
+telemetry = MemoryTelemetry()
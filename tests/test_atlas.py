@@ -0,0 +1,81 @@
+"""
+Tests for LayeredSpriteList: the index buffer on the GPU has to hold the
+sprites in layer order, also after a sprite was inserted below others.
+
+Run with: python -m pytest tests
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pyglet  # noqa: E402
+
+# no display needed, arcade draws into an offscreen context
+pyglet.options["headless"] = True
+
+import arcade  # noqa: E402
+from PIL import Image  # noqa: E402
+
+from atlas import LayeredSpriteList  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def window():
+    try:
+        window = arcade.Window(64, 64, visible=False)
+    except Exception as error:
+        pytest.skip(f"no OpenGL context: {error}")
+    yield window
+    window.close()
+
+
+def make_sprite(name):
+    return arcade.Sprite(texture=arcade.Texture(name, image=Image.new("RGBA", (4, 4), "white")))
+
+
+def gpu_index(sprite_list):
+    """ Slots in the index buffer on the GPU, after the list was drawn. """
+    data = sprite_list._sprite_index_buf.read(size=len(sprite_list) * 4)
+    return list(memoryview(data).cast("i"))
+
+
+def expected_index(sprite_list):
+    return [sprite_list.sprite_slot[sprite] for sprite in sprite_list]
+
+
+def test_insert_updates_gpu_index(window):
+    batch = LayeredSpriteList()
+    ship = make_sprite("ship")
+    item = make_sprite("item")
+    batch.add(ship, "player")
+    batch.add(item, "items")
+    batch.draw()
+    assert gpu_index(batch) == expected_index(batch)
+
+    # lands below the ship and the item, so it is inserted and not appended
+    asteroid = make_sprite("asteroid")
+    batch.add(asteroid, "asteroids")
+    assert list(batch) == [asteroid, ship, item]
+    batch.draw()
+    assert gpu_index(batch) == expected_index(batch)
+
+
+def test_remove_after_insert_keeps_layer_order(window):
+    batch = LayeredSpriteList()
+    ship = make_sprite("ship")
+    batch.add(ship, "player")
+    bullets = [make_sprite(f"bullet{i}") for i in range(3)]
+    for bullet in bullets:
+        batch.add(bullet, "bullets")
+    batch.draw()
+    bullets[1].remove_from_sprite_lists()
+    asteroid = make_sprite("asteroid")
+    batch.add(asteroid, "asteroids")
+    assert list(batch) == [asteroid, bullets[0], bullets[2], ship]
+    assert batch.layer_counts[:3] == [1, 2, 1]
+    batch.draw()
+    assert gpu_index(batch) == expected_index(batch)
@@ -0,0 +1,96 @@
+"""
+Tests for the collision broadphase and the deferred removal: the grid
+has to find exactly the pairs arcade finds by testing every pair, and a
+removed sprite must not be hit again before the end of the tick.
+
+Run with: python -m pytest tests
+"""
+
+import os
+import random
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import arcade  # noqa: E402
+from PIL import Image  # noqa: E402
+
+from asteroids import GameView  # noqa: E402
+from collision import SpatialGrid  # noqa: E402
+
+
+@pytest.fixture
+def game_folder(monkeypatch):
+    # the game loads its images relative to its folder
+    monkeypatch.chdir(ROOT)
+
+
+def random_sprites(rng, count, size, name):
+    texture = arcade.Texture(name, image=Image.new("RGBA", (size, size), "white"))
+    sprites = arcade.SpriteList()
+    for i in range(count):
+        # also around and beyond the edges, where sprites wrap around
+        sprites.append(arcade.Sprite(texture=texture, angle=rng.uniform(0, 360),
+                                     center_x=rng.uniform(-80, 880),
+                                     center_y=rng.uniform(-80, 680)))
+    return sprites
+
+
+def brute_force(sprite, others):
+    """ Every pair tested with arcade's exact check. """
+    return [other for other in others if arcade.check_for_collision(sprite, other)]
+
+
+def test_grid_finds_the_same_pairs_as_brute_force():
+    rng = random.Random(1)
+    asteroids = random_sprites(rng, 80, 60, "asteroid")
+    bullets = random_sprites(rng, 200, 12, "bullet")
+    grid = SpatialGrid()
+    grid.rebuild(asteroids=asteroids)
+
+    pairs = 0
+    for bullet in bullets:
+        expected = brute_force(bullet, asteroids)
+        found = grid.check_for_collision(bullet, "asteroids")
+        assert set(found) == set(expected)
+        pairs += len(expected)
+    # the sprites are dense enough to collide at all
+    assert pairs > 20
+
+
+def test_grid_add_and_remove_match_rebuild():
+    rng = random.Random(2)
+    asteroids = random_sprites(rng, 40, 60, "asteroid")
+    bullets = random_sprites(rng, 100, 12, "bullet")
+    grid = SpatialGrid()
+    grid.rebuild(asteroids=asteroids[:20])
+    for asteroid in asteroids[20:]:
+        grid.add(asteroid, "asteroids")
+    for asteroid in asteroids[::3]:
+        grid.remove(asteroid)
+    # unknown sprites are ignored
+    grid.remove(bullets[0])
+
+    left = [asteroid for i, asteroid in enumerate(asteroids) if i % 3]
+    for bullet in bullets:
+        assert set(grid.check_for_collision(bullet, "asteroids")) == set(brute_force(bullet, left))
+
+
+def test_removed_sprite_leaves_grid_at_once_and_list_at_flush(game_folder):
+    game_view = GameView(headless=True)
+    game_view.start_new_game(1)
+    asteroid = game_view.asteroid_list[0]
+    game_view.collision_grid.rebuild(asteroids=game_view.asteroid_list)
+
+    game_view.remove_sprite(asteroid)
+    # removing twice in one tick is fine
+    game_view.remove_sprite(asteroid)
+    assert asteroid in game_view.asteroid_list
+    assert asteroid not in game_view.collision_grid.check_for_collision(asteroid, "asteroids")
+
+    game_view.flush_removals()
+    assert asteroid not in game_view.asteroid_list
+    assert not game_view.kill_set
@@ -0,0 +1,82 @@
+"""
+Tests for ViewportCuller: a culled list has to look exactly like the
+same list drawn in full, in the order of its layers.
+
+Run with: python -m pytest tests
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pyglet  # noqa: E402
+
+# no display needed, arcade draws into an offscreen context
+pyglet.options["headless"] = True
+
+import arcade  # noqa: E402
+from PIL import Image  # noqa: E402
+
+import culling  # noqa: E402
+from atlas import LayeredSpriteList  # noqa: E402
+from culling import ViewportCuller  # noqa: E402
+
+SIZE = 64
+
+
+@pytest.fixture(scope="module")
+def window():
+    try:
+        window = arcade.Window(SIZE, SIZE, visible=False)
+    except Exception as error:
+        pytest.skip(f"no OpenGL context: {error}")
+    yield window
+    window.close()
+
+
+def make_sprite(name, color, x, y, size=16):
+    texture = arcade.Texture(name, image=Image.new("RGBA", (size, size), color))
+    return arcade.Sprite(texture=texture, center_x=x, center_y=y)
+
+
+def make_batch():
+    """ Overlapping sprites in three layers, some outside the window. """
+    batch = LayeredSpriteList()
+    batch.add(make_sprite("red", "red", 20, 20, 24), "asteroids")
+    batch.add(make_sprite("far", "red", 300, 30), "asteroids")
+    # half outside at the right edge
+    batch.add(make_sprite("edge", "yellow", SIZE + 4, 40), "asteroids")
+    batch.add(make_sprite("blue", "blue", 28, 28), "player")
+    batch.add(make_sprite("above", "blue", 30, SIZE + 100), "items")
+    # lands below the blue sprite in drawing order, although it is added later
+    batch.add(make_sprite("green", "green", 24, 24), "bullets")
+    return batch
+
+
+def render(window, draw):
+    window.clear()
+    draw()
+    return arcade.get_image(0, 0, SIZE, SIZE).tobytes()
+
+
+def test_culled_draw_matches_full_draw(window):
+    batch = make_batch()
+    full = render(window, batch.draw)
+    culler = ViewportCuller()
+    culled = render(window, lambda: culler.draw_visible(batch))
+    assert culled == full
+    assert (culler.drawn, culler.culled) == (4, 2)
+    # the full index buffer is back for the next plain draw
+    assert render(window, batch.draw) == full
+
+
+def test_unsupported_arcade_draws_everything(window, monkeypatch):
+    batch = make_batch()
+    full = render(window, batch.draw)
+    monkeypatch.setattr(culling, "SUPPORTED", False)
+    culler = ViewportCuller()
+    assert render(window, lambda: culler.draw_visible(batch)) == full
+    assert (culler.drawn, culler.culled) == (6, 0)
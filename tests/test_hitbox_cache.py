@@ -0,0 +1,64 @@
+"""
+Tests for the hit box cache: simplify() keeps the shape within its vertex
+budget, and a cached hit box is only used while the image, the algorithm
+and the budget stay the same.
+
+Run with: python -m pytest tests
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from hitbox_cache import HitBoxCache, simplify  # noqa: E402
+
+SQUARE = ((0, 0), (10, 0), (10, 10), (0, 10))
+BOX = ((1, 1), (2, 2))
+
+
+def test_simplify_drops_the_corners_that_matter_least():
+    # a square with a tiny dent and a corner in the middle of an edge
+    points = ((0, 0), (5, 0), (10, 0), (10, 10), (5, 9.9), (0, 10))
+    assert simplify(points, 4) == SQUARE
+    assert simplify(SQUARE, 8) == SQUARE
+    # never less than a triangle
+    assert len(simplify(SQUARE, 1)) == 3
+
+
+def test_cache_survives_a_restart(tmp_path):
+    image = tmp_path / "image.png"
+    image.write_bytes(b"pixels")
+    path = str(tmp_path / "cache" / "hit_boxes.json")
+
+    cache = HitBoxCache(path)
+    assert cache.get(str(image), "Simple", 4.5) is None
+    cache.put(str(image), "Simple", 4.5, None, BOX)
+    cache.save()
+    assert HitBoxCache(path).get(str(image), "Simple", 4.5) == BOX
+
+
+def test_cache_is_invalidated_by_changes(tmp_path):
+    image = tmp_path / "image.png"
+    image.write_bytes(b"pixels")
+    path = str(tmp_path / "hit_boxes.json")
+    cache = HitBoxCache(path)
+    cache.put(str(image), "Simple", 4.5, 6, BOX)
+    cache.save()
+
+    cache = HitBoxCache(path)
+    assert cache.get(str(image), "Simple", 4.5, 6) == BOX
+    assert cache.get(str(image), "Detailed", 4.5, 6) is None
+    assert cache.get(str(image), "Simple", 2.0, 6) is None
+    assert cache.get(str(image), "Simple", 4.5, None) is None
+
+    # a new image is only looked at in the next run, files are hashed once per run
+    image.write_bytes(b"other pixels")
+    assert HitBoxCache(path).get(str(image), "Simple", 4.5, 6) is None
+
+
+def test_broken_cache_file_is_ignored(tmp_path):
+    path = tmp_path / "hit_boxes.json"
+    path.write_text("{not json")
+    assert HitBoxCache(str(path)).entries == {}
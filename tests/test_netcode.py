@@ -0,0 +1,101 @@
+"""
+Tests for the network protocol: states have to come out of the packets
+exactly as they went in, as full states and as deltas to a baseline.
+
+Run with: python -m pytest tests
+"""
+
+import os
+import random
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from netcode import (KIND_ASTEROID, KIND_ITEM, KIND_LASER, MAX_PACKET, NO_BASELINE,  # noqa: E402
+                     RECORD_HEAD, decode_records, decode_state_header, dequantize,
+                     encode_records, encode_state, quantize)
+
+SHIPS = [(0, 400.0, 300.0, 90.0, 2.5, 0), (1, 120.25, 80.5, 270.0, 0.0, 30)]
+
+
+def random_state(rng, count, first_id=1):
+    kinds = list(KIND_ASTEROID.values()) + [KIND_LASER, KIND_ITEM]
+    return {entity_id: (rng.choice(kinds),) + quantize(rng.uniform(-50, 850),
+                                                       rng.uniform(-50, 650),
+                                                       rng.uniform(0, 360))
+            for entity_id in range(first_id, first_id + count)}
+
+
+def move(rng, state):
+    """ The next tick: most entities move a little, some far, some are gone or new. """
+    new_state = {}
+    for entity_id, (kind, x, y, angle) in state.items():
+        roll = rng.random()
+        if roll < 0.1:
+            continue
+        if roll < 0.2:
+            x, y, angle = quantize(rng.uniform(0, 800), rng.uniform(0, 600), rng.uniform(0, 360))
+        elif roll < 0.8:
+            x += rng.randint(-40, 40)
+            y += rng.randint(-40, 40)
+            angle = (angle + rng.randint(-3, 3)) % 256
+        new_state[entity_id] = (kind, x, y, angle)
+    new_state.update(random_state(rng, 5, max(state) + 1))
+    return new_state
+
+
+def send(state, baseline=None):
+    """ Encode a state against a baseline (of tick 9) and decode it the way the client does. """
+    header_values = (10, NO_BASELINE if baseline is None else 9, 3, 7, 2, 1, False)
+    packets = encode_state(header_values, SHIPS, encode_records(state, baseline))
+    received = dict(baseline or {})
+    for packet in packets:
+        assert len(packet) <= MAX_PACKET
+        header, ships, offset = decode_state_header(packet)
+        assert header[1:8] == header_values
+        assert ships == SHIPS
+        part, parts, count = header[8:]
+        assert (part, parts) == (packets.index(packet), len(packets))
+        assert decode_records(packet, offset, count, received) == len(packet)
+    return received, packets
+
+
+def test_quantize_round_trip():
+    for x, y, angle in ((0, 0, 0), (123.4, -20.06, 359.0), (799.875, 599.5, 181.4)):
+        qx, qy, qa = quantize(x, y, angle)
+        back_x, back_y, back_angle = dequantize(qx, qy, qa)
+        assert abs(back_x - x) <= 1 / 16 and abs(back_y - y) <= 1 / 16
+        assert abs((back_angle - angle + 180) % 360 - 180) <= 360 / 512
+        assert quantize(back_x, back_y, back_angle) == (qx, qy, qa)
+
+
+def test_full_state_round_trip_over_several_packets():
+    state = random_state(random.Random(1), 300)
+    received, packets = send(state)
+    assert received == state
+    assert len(packets) > 1
+
+
+def test_delta_round_trip_is_smaller_than_full_state():
+    rng = random.Random(2)
+    baseline = random_state(rng, 80)
+    for tick in range(20):
+        state = move(rng, baseline)
+        delta = encode_records(state, baseline)
+        full = encode_records(state, None)
+        assert sum(map(len, delta)) < sum(map(len, full))
+        received, packets = send(state, baseline)
+        assert received == state
+        baseline = state
+
+
+def test_unchanged_entities_are_not_sent():
+    state = random_state(random.Random(3), 20)
+    assert encode_records(state, state) == []
+    moved = dict(state)
+    kind, x, y, angle = moved[5]
+    moved[5] = (kind, x + 3, y - 2, angle)
+    del moved[6]
+    records = encode_records(moved, state)
+    assert sorted(RECORD_HEAD.unpack_from(record)[0] for record in records) == [5, 6]
@@ -0,0 +1,61 @@
+"""
+Tests for SpritePool: released sprites are handed out again, reset like
+new ones, and never twice.
+
+Run with: python -m pytest tests
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import arcade  # noqa: E402
+
+from pool import SpritePool, release  # noqa: E402
+
+
+def test_released_sprite_is_reused_and_reset():
+    pool = SpritePool(arcade.Sprite, capacity=2)
+    sprites = arcade.SpriteList()
+    sprite = pool.acquire()
+    sprites.append(sprite)
+    sprite.center_x, sprite.change_y, sprite.angle, sprite.alpha = 50, 3, 90, 10
+
+    release(sprite)
+    assert sprite not in sprites
+    again = pool.acquire()
+    assert again is sprite
+    assert (again.center_x, again.change_y, again.angle, again.alpha) == (0, 0, 0, 255)
+
+
+def test_pool_grows_when_empty():
+    created = []
+
+    def factory():
+        created.append(arcade.Sprite())
+        return created[-1]
+
+    pool = SpritePool(factory, capacity=2)
+    sprites = [pool.acquire() for i in range(3)]
+    assert len(created) == 3
+    assert all(sprite.pool is pool for sprite in sprites)
+
+
+def test_release_twice_keeps_one_free_copy():
+    pool = SpritePool(arcade.Sprite)
+    sprite = pool.acquire()
+    pool.release(sprite)
+    pool.release(sprite)
+    assert pool.free == [sprite]
+    assert pool.acquire() is sprite
+    assert pool.acquire() is not sprite
+
+
+def test_release_without_pool_only_removes():
+    sprites = arcade.SpriteList()
+    sprite = arcade.Sprite()
+    sprites.append(sprite)
+    release(sprite)
+    assert sprite not in sprites
@@ -0,0 +1,89 @@
+"""
+Tests for game snapshots: a restored game has to go on tick for tick
+like the original, with the plain and with the NumPy motion engine.
+
+Run with: python -m pytest tests
+"""
+
+import os
+import random
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import arcade  # noqa: E402
+
+from asteroids import GameView  # noqa: E402
+from snapshot import SnapshotRing  # noqa: E402
+
+KEYS = (arcade.key.LEFT, arcade.key.RIGHT, arcade.key.UP, arcade.key.DOWN,
+        arcade.key.A, arcade.key.D)
+
+
+@pytest.fixture(autouse=True)
+def game_folder(monkeypatch):
+    # the game loads its images relative to its folder
+    monkeypatch.chdir(ROOT)
+
+
+def key_script(seed, ticks):
+    """ Random key presses and releases, the same ones for every run. """
+    rng = random.Random(seed)
+    script = {}
+    for tick in range(ticks):
+        if rng.random() < 0.3:
+            action = "press" if rng.random() < 0.7 else "release"
+            script[tick] = (action, rng.choice(KEYS))
+    return script
+
+
+def play(game_view, script, start, end):
+    for tick in range(start, end):
+        if tick in script:
+            action, key = script[tick]
+            if action == "press":
+                game_view.on_key_press(key, 0)
+            else:
+                game_view.on_key_release(key, 0)
+        game_view.tick()
+
+
+@pytest.mark.parametrize("numpy_motion", [False, True])
+def test_restored_game_goes_on_the_same_way(numpy_motion):
+    if numpy_motion:
+        pytest.importorskip("numpy")
+    script = key_script(3, 1200)
+    game_view = GameView(headless=True, numpy_motion=numpy_motion)
+    game_view.start_new_game(7)
+    play(game_view, script, 0, 300)
+
+    # every restore jumps back over splits, shots and picked up items
+    for start in range(300, 1100, 200):
+        data = game_view.snapshot()
+        play(game_view, script, start, start + 100)
+        original = game_view.snapshot()
+        game_view.restore_snapshot(data)
+        assert game_view.snapshot() == data
+        play(game_view, script, start, start + 100)
+        assert game_view.snapshot() == original
+        play(game_view, script, start + 100, start + 200)
+
+
+def test_restore_rejects_other_data():
+    game_view = GameView(headless=True)
+    game_view.start_new_game(1)
+    with pytest.raises(ValueError):
+        game_view.restore_snapshot(b"\0" * 64)
+
+
+def test_ring_keeps_the_newest_snapshots():
+    ring = SnapshotRing(2)
+    for data in (b"a", b"b", b"c"):
+        ring.push(data)
+    assert len(ring) == 2
+    assert ring.pop() == b"c"
+    assert ring.pop() == b"b"
+    assert ring.pop() is None
@@ -0,0 +1,85 @@
+"""
+Tests for the fixed timestep: the game has to play at the same speed at
+every tick rate, only more or less smoothly.
+
+Run with: python -m pytest tests
+"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import arcade  # noqa: E402
+
+from asteroids import ITEM_SPEED, RESPAWN_TIME, GameView  # noqa: E402
+
+TICK_RATES = (30, 60, 120)
+
+
+@pytest.fixture(autouse=True)
+def game_folder(monkeypatch):
+    # the game loads its images relative to its folder
+    monkeypatch.chdir(ROOT)
+
+
+def new_game(tick_rate):
+    game_view = GameView(headless=True, tick_rate=tick_rate)
+    game_view.start_new_game(1)
+    # out of the way of the asteroids and done respawning
+    game_view.asteroid_list.clear()
+    game_view.collision_grid.rebuild(asteroids=game_view.asteroid_list,
+                                     items=game_view.item_list)
+    game_view.player_sprite.respawning = 0
+    return game_view
+
+
+def run_seconds(game_view, seconds):
+    for i in range(round(seconds / game_view.tick_time)):
+        game_view.tick()
+
+
+def test_ship_flies_as_far_at_every_tick_rate():
+    distances = []
+    for tick_rate in TICK_RATES:
+        game_view = new_game(tick_rate)
+        ship = game_view.player_sprite
+        start = ship.center_y
+        game_view.on_key_press(arcade.key.UP, 0)
+        run_seconds(game_view, 0.5)
+        distances.append(ship.center_y - start)
+    assert min(distances) > 0
+    assert max(distances) / min(distances) < 1.1
+
+
+def test_ship_turns_as_far_at_every_tick_rate():
+    for tick_rate in TICK_RATES:
+        game_view = new_game(tick_rate)
+        game_view.on_key_press(arcade.key.LEFT, 0)
+        run_seconds(game_view, 0.5)
+        assert game_view.player_sprite.angle == pytest.approx(90)
+
+
+def test_items_fall_at_the_same_speed():
+    for tick_rate in TICK_RATES:
+        game_view = new_game(tick_rate)
+        item = game_view.item_list[0]
+        # high up, so it doesn't reach the bottom and start again
+        item.center_y = 10000
+        run_seconds(game_view, 1)
+        assert item.center_y == pytest.approx(10000 - ITEM_SPEED)
+
+
+def test_respawn_takes_the_same_time():
+    for tick_rate in TICK_RATES:
+        game_view = new_game(tick_rate)
+        ship = game_view.player_sprite
+        ship.respawn()
+        run_seconds(game_view, RESPAWN_TIME - 0.1)
+        assert ship.respawning
+        run_seconds(game_view, 0.2)
+        assert not ship.respawning
+        assert ship.alpha == 255
@@ -0,0 +1,307 @@
+"""
+Threaded mode: the simulation runs on a worker thread.
+
+Normally GameView.on_update (movement, collisions, split_asteroid) and
+GameView.on_draw take turns in the one loop of arcade, so a slow tick
+delays the next frame and the other way around. In this mode
+
+    - SimulationThread runs a headless GameView at the fixed tick rate
+      and after every tick publishes a RenderState: a compact, immutable
+      copy of where every entity is
+    - ThreadedGameView only reads the two newest RenderStates, draws its
+      own sprites between them and never touches the simulation
+    - key events go to the simulation and sound effects come back over
+      queue.SimpleQueue, which needs no lock of ours
+
+Publishing swaps a (previous, latest) pair in one assignment, so the
+render thread always sees two complete states and the simulation never
+waits for drawing. Python only runs one thread at a time, but arcade
+lets the GIL go while it waits for the GPU and the display, and so does
+NumPy while the motion engine moves the sprites, so ticks and frames
+overlap there.
+
+Example:
+python asteroids.py --threaded
+"""
+
+import queue
+import threading
+import time
+from array import array
+
+import arcade
+
+from asteroids import (BATCH_DRAW, SCALE, SCALE_LIVES, SCREEN_HEIGHT, SCREEN_WIDTH, GameOverView,
+                       GameView, PauseView, WinnerView)
+from assets import assets
+from atlas import LayeredSpriteList, game_atlas
+from client import KIND_TEXTURES
+from hud import Hud
+from music import music
+from netcode import KIND_ASTEROID, KIND_ITEM, KIND_LASER, KIND_VOTE
+from sound_manager import sound_manager
+
+# drawing layer of every entity kind
+KIND_LAYERS = {kind: "asteroids" for kind in KIND_ASTEROID.values()}
+KIND_LAYERS.update({KIND_LASER: "bullets", KIND_VOTE: "bullets", KIND_ITEM: "items"})
+
+
+class RenderState:
+    """ Everything the render thread needs of one tick, never changed after publishing. """
+
+    __slots__ = ("tick", "time", "ids", "kinds", "transforms", "ship", "score", "lives",
+                 "level", "asteroid_count", "game_over")
+
+    def __init__(self, game_view, tick, publish_time):
+        ids = array("Q")
+        kinds = bytearray()
+        # x, y and angle of every entity
+        transforms = array("f")
+        for asteroid in game_view.asteroid_list:
+            ids.append(asteroid.spawn_id)
+            kinds.append(KIND_ASTEROID[asteroid.size])
+            transforms.extend((asteroid.center_x, asteroid.center_y, asteroid.angle))
+        laser_pool = game_view.laser_pool
+        for bullet in game_view.bullet_list:
+            ids.append(bullet.spawn_id)
+            kinds.append(KIND_LASER if bullet.pool is laser_pool else KIND_VOTE)
+            transforms.extend((bullet.center_x, bullet.center_y, bullet.angle))
+        for item in game_view.item_list:
+            ids.append(item.spawn_id)
+            kinds.append(KIND_ITEM)
+            transforms.extend((item.center_x, item.center_y, item.angle))
+
+        ship = game_view.player_sprite
+        self.tick = tick
+        self.time = publish_time
+        self.ids = ids
+        self.kinds = bytes(kinds)
+        self.transforms = transforms
+        self.ship = (ship.center_x, ship.center_y, ship.angle, ship.alpha)
+        self.score = game_view.score
+        self.lives = game_view.lives
+        self.level = game_view.level
+        self.asteroid_count = len(game_view.asteroid_list)
+        self.game_over = game_view.game_over
+
+
+class SimulationView(GameView):
+    """
+    Headless GameView whose sound effects are played by the render thread.
+    Being headless its sprite lists are LogicSpriteLists, so the worker
+    thread never adds a texture to an atlas or makes any other GL call.
+    """
+
+    def __init__(self, sound_events, **kwargs):
+        # id of the last sprite added, see add_sprite
+        self.next_spawn_id = 0
+        super().__init__(headless=True, **kwargs)
+        self.sound_events = sound_events
+
+    def add_sprite(self, sprite, kind):
+        super().add_sprite(sprite, kind)
+        # Pooled bullets and fragments come back as the same objects, so
+        # id(sprite) can't tell a new bullet from the old one. Every spawn
+        # gets a new id instead and the render thread starts it fresh.
+        self.next_spawn_id += 1
+        sprite.spawn_id = self.next_spawn_id
+
+    def play_sound(self, name, volume):
+        self.sound_events.put((name, volume))
+
+
+class SimulationThread(threading.Thread):
+    """ Runs one game at the tick rate and publishes a RenderState after every tick. """
+
+    def __init__(self, seed=None, numpy_motion=False, tick_rate=None):
+        super().__init__(name="simulation", daemon=True)
+        # ("press" or "release", key) from the render thread
+        self.inputs = queue.SimpleQueue()
+        # (name, volume) of the sound effects to play
+        self.sound_events = queue.SimpleQueue()
+        self.game_view = SimulationView(self.sound_events, numpy_motion=numpy_motion,
+                                        tick_rate=tick_rate)
+        self.tick_time = self.game_view.tick_time
+        self.game_view.start_new_game(seed)
+        self.ticks = 0
+        state = RenderState(self.game_view, 0, time.perf_counter())
+        # the two newest states, replaced as a whole
+        self.published = (state, state)
+        self.paused = False
+        self.running = True
+
+    def press(self, key):
+        self.inputs.put(("press", key))
+
+    def release(self, key):
+        self.inputs.put(("release", key))
+
+    def stop(self):
+        self.running = False
+
+    def handle_inputs(self):
+        game_view = self.game_view
+        while True:
+            try:
+                action, key = self.inputs.get_nowait()
+            except queue.Empty:
+                return
+            if action == "press":
+                game_view.on_key_press(key, 0)
+            else:
+                game_view.on_key_release(key, 0)
+
+    def run(self):
+        game_view = self.game_view
+        next_tick = time.perf_counter()
+        while self.running:
+            if not self.paused:
+                self.handle_inputs()
+                game_view.tick()
+                self.ticks += 1
+                state = RenderState(game_view, self.ticks, time.perf_counter())
+                self.published = (self.published[1], state)
+                if game_view.game_over or game_view.level == 3:
+                    # the render thread shows the end screen
+                    return
+
+            next_tick += self.tick_time
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            elif delay < -self.tick_time * 5:
+                # far behind, don't try to catch up
+                next_tick = time.perf_counter()
+
+
+class ThreadedGameView(arcade.View):
+    """ Draws the game of a SimulationThread and sends it the keys. """
+
+    def __init__(self, numpy_motion=False):
+        super().__init__()
+        self.numpy_motion = numpy_motion
+        self.simulation = None
+        # entity id -> sprite
+        self.sprites = {}
+        self.draw_batch = LayeredSpriteList(atlas=game_atlas() if BATCH_DRAW else None)
+        self.ship = arcade.Sprite(texture=assets.texture("ship"),
+                                  scale=assets.sprite_scale("ship", SCALE))
+        self.draw_batch.add(self.ship, "player")
+        self.life_sprites = []
+        self.hud = Hud()
+        self.window.set_mouse_visible(False)
+        arcade.set_background_color(arcade.color.LIGHT_BLUE)
+        music.play()
+
+    @property
+    def player_sprite(self):
+        # PauseView draws the ship of the view it pauses
+        return self.ship
+
+    def start_new_game(self, seed=None):
+        self.simulation = SimulationThread(seed, self.numpy_motion)
+        self.simulation.start()
+
+    def on_show_view(self):
+        if self.simulation is not None:
+            self.simulation.paused = False
+
+    def on_hide_view(self):
+        if self.simulation is not None:
+            self.simulation.paused = True
+
+    def on_update(self, delta_time):
+        simulation = self.simulation
+        while True:
+            try:
+                name, volume = simulation.sound_events.get_nowait()
+            except queue.Empty:
+                break
+            sound_manager.play(name, volume)
+
+        latest = simulation.published[1]
+        if latest.game_over or latest.level == 3:
+            simulation.stop()
+            self.window.show_view(GameOverView() if latest.game_over else WinnerView())
+
+    def show_lives(self, lives):
+        while len(self.life_sprites) > max(lives, 0):
+            self.life_sprites.pop().remove_from_sprite_lists()
+        while len(self.life_sprites) < lives:
+            life = arcade.Sprite(texture=assets.texture("life"),
+                                 scale=assets.sprite_scale("life", SCALE_LIVES))
+            life.center_x = 8 + len(self.life_sprites) * life.width + life.width
+            life.center_y = life.height
+            self.life_sprites.append(life)
+            self.draw_batch.add(life, "lives")
+
+    def sync_sprites(self, previous, latest, blend):
+        """ Put a sprite where every entity is between the two states. """
+        # entity id -> its index in the previous state
+        old_positions = {entity_id: i for i, entity_id in enumerate(previous.ids)}
+        seen = set()
+        transforms = latest.transforms
+        old_transforms = previous.transforms
+        for i, entity_id in enumerate(latest.ids):
+            kind = latest.kinds[i]
+            seen.add(entity_id)
+            sprite = self.sprites.get(entity_id)
+            if sprite is not None and sprite.kind != kind:
+                sprite.remove_from_sprite_lists()
+                sprite = None
+            if sprite is None:
+                name, scale = KIND_TEXTURES[kind]
+                sprite = arcade.Sprite(texture=assets.texture(name),
+                                       scale=assets.sprite_scale(name, scale))
+                sprite.kind = kind
+                self.sprites[entity_id] = sprite
+                self.draw_batch.add(sprite, KIND_LAYERS[kind])
+            x, y, angle = transforms[i * 3:i * 3 + 3]
+            j = old_positions.get(entity_id)
+            if j is not None:
+                old_x, old_y, old_angle = old_transforms[j * 3:j * 3 + 3]
+                # Don't slide across the screen when something wrapped around
+                if abs(x - old_x) < SCREEN_WIDTH / 2 and abs(y - old_y) < SCREEN_HEIGHT / 2:
+                    x = old_x + (x - old_x) * blend
+                    y = old_y + (y - old_y) * blend
+                    angle = old_angle + (angle - old_angle) * blend
+            sprite.position = (x, y)
+            sprite.angle = angle
+        for entity_id in [entity_id for entity_id in self.sprites if entity_id not in seen]:
+            self.sprites.pop(entity_id).remove_from_sprite_lists()
+
+        x, y, angle, alpha = latest.ship
+        old_x, old_y, old_angle, old_alpha = previous.ship
+        if abs(x - old_x) < SCREEN_WIDTH / 2 and abs(y - old_y) < SCREEN_HEIGHT / 2:
+            x = old_x + (x - old_x) * blend
+            y = old_y + (y - old_y) * blend
+            angle = old_angle + (angle - old_angle) * blend
+        self.ship.position = (x, y)
+        self.ship.angle = angle
+        self.ship.alpha = alpha
+
+    def on_draw(self):
+        arcade.start_render()
+        # one read, the simulation may publish a new pair any time
+        previous, latest = self.simulation.published
+        blend = 1.0
+        if not self.simulation.paused and latest is not previous:
+            blend = min(max((time.perf_counter() - latest.time) / self.simulation.tick_time,
+                            0.0), 1.0)
+        self.sync_sprites(previous, latest, blend)
+        self.show_lives(latest.lives)
+        self.draw_batch.draw()
+
+        self.hud.set("score", latest.score)
+        self.hud.set("asteroids", latest.asteroid_count)
+        self.hud.set("level", latest.level)
+        self.hud.draw()
+
+    def on_key_press(self, symbol, modifiers):
+        if symbol == arcade.key.P:
+            self.window.show_view(PauseView(self))
+        else:
+            self.simulation.press(symbol)
+
+    def on_key_release(self, symbol, modifiers):
+        self.simulation.release(symbol)
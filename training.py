@@ -0,0 +1,281 @@
+"""
+Training environment for bots that play Trump Smasher.
+
+TrumpSmasherEnv wraps one headless GameView in a gym-style API:
+
+    env = TrumpSmasherEnv(seed=42)
+    observation = env.reset()
+    observation, reward, done, info = env.step(action)
+
+The rules are the ones of the real game: the ship flies with
+ShipSprite.update, the weapons fire through GameView.on_key_press and
+asteroids split in GameView.split_asteroid. The reward is the score the
+step gained, done is set on game over or when level 3 is reached.
+
+VectorEnv steps many independent games at once. The games are spread over
+worker processes (one per CPU core by default) and the observations come
+back as one NumPy array with a row per game.
+
+Needs NumPy. Example (measures environment steps per second):
+python training.py --envs 32 --steps 2000
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import time
+
+import arcade
+import numpy as np
+
+from asteroids import SCREEN_HEIGHT, SCREEN_WIDTH, SHIP_MAX_SPEED, GameView
+
+# Every action is one combination of turning, thrust and weapon
+TURN_KEYS = (None, arcade.key.LEFT, arcade.key.RIGHT)
+THRUST_KEYS = (None, arcade.key.UP, arcade.key.DOWN)
+FIRE_KEYS = (None, arcade.key.A, arcade.key.D)
+ACTIONS = [(turn, thrust, fire) for turn in TURN_KEYS
+           for thrust in THRUST_KEYS for fire in FIRE_KEYS]
+
+# The observation shows the ship and this many of the nearest asteroids
+NEAREST_ASTEROIDS = 8
+SHIP_VALUES = 8
+ASTEROID_VALUES = 5
+OBSERVATION_SIZE = SHIP_VALUES + NEAREST_ASTEROIDS * ASTEROID_VALUES
+
+
+class TrumpSmasherEnv:
+    """ One headless game with a gym-style reset() and step(). """
+
+    action_count = len(ACTIONS)
+    observation_size = OBSERVATION_SIZE
+
+    def __init__(self, seed=None, frame_skip=4, max_ticks=20000, numpy_motion=False):
+        """
+        frame_skip is the number of game ticks one step() runs with the
+        same action, max_ticks ends a game that takes too long.
+        """
+        self.rng = random.Random(seed)
+        self.frame_skip = frame_skip
+        self.max_ticks = max_ticks
+        self.numpy_motion = numpy_motion
+        self.game_view = None
+        self.held_keys = set()
+
+    def reset(self, seed=None):
+        """ Start a new game and return its first observation. """
+        if seed is None:
+            seed = self.rng.randrange(2 ** 32)
+        self.game_view = GameView(headless=True, numpy_motion=self.numpy_motion)
+        self.game_view.start_new_game(seed)
+        self.held_keys = set()
+        return self.observe()
+
+    def press_keys(self, action):
+        """ Translate an action number into key presses and releases. """
+        turn, thrust, fire = ACTIONS[action]
+        keys = {key for key in (turn, thrust) if key is not None}
+        for key in self.held_keys - keys:
+            self.game_view.on_key_release(key, 0)
+        for key in keys - self.held_keys:
+            self.game_view.on_key_press(key, 0)
+        self.held_keys = keys
+        # every press of a weapon key is one shot
+        if fire is not None:
+            self.game_view.on_key_press(fire, 0)
+            self.game_view.on_key_release(fire, 0)
+
+    def step(self, action):
+        """ Run one action, returns (observation, reward, done, info). """
+        game_view = self.game_view
+        score = game_view.score
+        self.press_keys(action)
+
+        done = False
+        for i in range(self.frame_skip):
+            game_view.tick()
+            if game_view.game_over or game_view.level == 3:
+                done = True
+                break
+        timeout = not done and game_view.frame_count >= self.max_ticks
+
+        info = {
+            "score": game_view.score,
+            "level": game_view.level,
+            "lives": game_view.lives,
+            "ticks": game_view.frame_count,
+            "seed": game_view.seed,
+            "timeout": timeout,
+        }
+        return self.observe(), game_view.score - score, done or timeout, info
+
+    def observe(self):
+        """ The state of the game as a flat float32 array of OBSERVATION_SIZE. """
+        game_view = self.game_view
+        ship = game_view.player_sprite
+        observation = np.zeros(OBSERVATION_SIZE, dtype=np.float32)
+        angle = np.radians(ship.angle)
+        observation[:SHIP_VALUES] = (
+            ship.center_x / SCREEN_WIDTH,
+            ship.center_y / SCREEN_HEIGHT,
+            np.sin(angle),
+            np.cos(angle),
+            ship.speed / ship.max_speed,
+            1.0 if ship.respawning else 0.0,
+            game_view.lives / 3,
+            game_view.level / 3,
+        )
+
+        # nearest asteroids first, positions relative to the ship
+        asteroids = []
+        for asteroid in game_view.asteroid_list:
+            if asteroid in game_view.kill_set:
+                continue
+            dx = (asteroid.center_x - ship.center_x) / SCREEN_WIDTH
+            dy = (asteroid.center_y - ship.center_y) / SCREEN_HEIGHT
+            asteroids.append((dx * dx + dy * dy, dx, dy, asteroid))
+        asteroids.sort(key=lambda entry: entry[0])
+
+        # how far the ship moves per tick at full speed
+        step = SHIP_MAX_SPEED * game_view.tick_time
+        index = SHIP_VALUES
+        for distance, dx, dy, asteroid in asteroids[:NEAREST_ASTEROIDS]:
+            observation[index:index + ASTEROID_VALUES] = (
+                dx, dy, asteroid.change_x / step, asteroid.change_y / step, asteroid.size / 4)
+            index += ASTEROID_VALUES
+        return observation
+
+
+def _worker(connection, seeds, env_kwargs):
+    """ Runs in a worker process and steps its share of the games. """
+    # The game loads its images relative to this folder
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    envs = [TrumpSmasherEnv(seed=seed, **env_kwargs) for seed in seeds]
+    while True:
+        command, data = connection.recv()
+        if command == "reset":
+            connection.send([env.reset() for env in envs])
+        elif command == "step":
+            results = []
+            for env, action in zip(envs, data):
+                observation, reward, done, info = env.step(action)
+                if done:
+                    # start the next game right away, the last observation
+                    # of the finished one is still in info
+                    info["final_observation"] = observation
+                    observation = env.reset()
+                results.append((observation, reward, done, info))
+            connection.send(results)
+        elif command == "close":
+            connection.close()
+            return
+
+
+class VectorEnv:
+    """
+    Many TrumpSmasherEnv games stepped in parallel in worker processes.
+
+    step() takes one action per game and returns batched arrays. A game
+    that ends is reset right away, its last observation is in
+    info["final_observation"].
+    """
+
+    def __init__(self, env_count, processes=None, seed=0, **env_kwargs):
+        self.env_count = env_count
+        processes = min(processes or os.cpu_count() or 1, env_count)
+
+        # spread the games as evenly as possible over the processes
+        seeds = [seed + i for i in range(env_count)]
+        self.slices = []
+        start = 0
+        for i in range(processes):
+            end = start + (env_count - start) // (processes - i)
+            self.slices.append((start, end))
+            start = end
+
+        self.connections = []
+        self.processes = []
+        for start, end in self.slices:
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=_worker, daemon=True,
+                                              args=(child, seeds[start:end], env_kwargs))
+            process.start()
+            child.close()
+            self.connections.append(parent)
+            self.processes.append(process)
+
+    def reset(self):
+        """ Start new games everywhere, returns observations of shape (env_count, size). """
+        for connection in self.connections:
+            connection.send(("reset", None))
+        observations = []
+        for connection in self.connections:
+            observations.extend(connection.recv())
+        return np.stack(observations)
+
+    def step(self, actions):
+        """ One action per game, returns (observations, rewards, dones, infos). """
+        for connection, (start, end) in zip(self.connections, self.slices):
+            connection.send(("step", list(actions[start:end])))
+        results = []
+        for connection in self.connections:
+            results.extend(connection.recv())
+        observations, rewards, dones, infos = zip(*results)
+        return (np.stack(observations), np.array(rewards, dtype=np.float32),
+                np.array(dones, dtype=bool), list(infos))
+
+    def close(self):
+        """ Stop all worker processes. """
+        for connection in self.connections:
+            connection.send(("close", None))
+        for process in self.processes:
+            process.join()
+
+
+def measure(env_count, processes, steps, seed, **env_kwargs):
+    """ Step random actions and return the environment steps per second. """
+    rng = random.Random(seed)
+    vector_env = VectorEnv(env_count, processes, seed, **env_kwargs)
+    vector_env.reset()
+    start = time.perf_counter()
+    episodes = 0
+    for i in range(steps):
+        actions = [rng.randrange(TrumpSmasherEnv.action_count) for env in range(env_count)]
+        observations, rewards, dones, infos = vector_env.step(actions)
+        episodes += int(dones.sum())
+    seconds = time.perf_counter() - start
+    vector_env.close()
+    return {
+        "envs": env_count,
+        "processes": len(vector_env.processes),
+        "steps": steps * env_count,
+        "episodes": episodes,
+        "seconds": seconds,
+        "steps_per_second": steps * env_count / seconds,
+        "ticks_per_second": steps * env_count * env_kwargs.get("frame_skip", 4) / seconds,
+    }
+
+
+def main():
+    """ Main method """
+    parser = argparse.ArgumentParser(description="Measure the throughput of the training environment")
+    parser.add_argument("--envs", type=int, default=os.cpu_count() or 1, help="number of games")
+    parser.add_argument("--processes", type=int, help="worker processes, default one per core")
+    parser.add_argument("--steps", type=int, default=1000, help="steps of every game")
+    parser.add_argument("--frame-skip", type=int, default=4, help="game ticks per step")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--numpy", action="store_true",
+                        help="move the sprites with the NumPy motion engine")
+    args = parser.parse_args()
+
+    result = measure(args.envs, args.processes, args.steps, args.seed,
+                     frame_skip=args.frame_skip, numpy_motion=args.numpy)
+    for name, value in result.items():
+        if isinstance(value, float):
+            value = f"{value:.2f}"
+        print(f"{name}: {value}")
+
+
+if __name__ == "__main__":
+    main()